@@ -0,0 +1,211 @@
+"""
+Camada de adaptadores para os servicos externos usados pelos produtos: S3, API de trading (HTTP),
+Airflow e mensageria.
+
+O perfil ativo (ADAPTERS_PROFILE) decide a implementacao:
+- live: middle.s3, requests, middle.airflow e middle.message;
+- offline: S3 em diretorio local, stub HTTP que devolve respostas gravadas e sinks que apenas registram
+  os triggers e mensagens. Permite rodar e medir um workflow sem acesso a nenhum servico.
+
+Nos dois perfis, ADAPTERS_LATENCY injeta atraso artificial por servico (ex.: "http=0.5,s3=2"), e os
+downloads com s3Key passam pelo cache local de artefatos (app.artifacts).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from ..logs import get_logger
+from .. import artifacts, ledger, metrics
+from ..settings import settings
+from ..tracing import span
+
+logger = get_logger(__name__)
+
+PROFILE_LIVE = "live"
+PROFILE_OFFLINE = "offline"
+LATENCY_SERVICES = ("s3", "http", "airflow", "message")
+
+
+@dataclass
+class AdapterProfile:
+    name: str
+    s3: Any
+    http: Any
+    airflow: Any
+    messaging: Any
+    latency: Dict[str, float] = field(default_factory=dict)
+    recorder: Any = None
+
+    def delay(self, service: str):
+        seconds = self.latency.get(service, 0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+def parse_latency(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Converte "http=0.5,s3=2" em {"http": 0.5, "s3": 2.0}.
+    """
+    latency = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        service, _, seconds = item.partition("=")
+        if service not in LATENCY_SERVICES:
+            raise ValueError(f"Servico de latencia desconhecido: {service} (use {', '.join(LATENCY_SERVICES)})")
+        latency[service] = float(seconds)
+    return latency
+
+
+def build_profile(name: str, latency: Optional[Dict[str, float]] = None) -> AdapterProfile:
+    latency = parse_latency(settings.ADAPTERS_LATENCY) if latency is None else latency
+    if name == PROFILE_LIVE:
+        from .live import LiveAirflow, LiveHttp, LiveMessaging, LiveS3
+        return AdapterProfile(name, LiveS3(), LiveHttp(), LiveAirflow(), LiveMessaging(), latency)
+    if name == PROFILE_OFFLINE:
+        from .offline import CallRecorder, LocalDirectoryS3, NullAirflow, NullMessaging, RecordingHttpStub
+        recorder = CallRecorder(settings.OFFLINE_RECORD_FILE)
+        return AdapterProfile(
+            name,
+            LocalDirectoryS3(settings.OFFLINE_S3_DIR, recorder),
+            RecordingHttpStub(settings.OFFLINE_HTTP_FIXTURES, recorder),
+            NullAirflow(recorder),
+            NullMessaging(recorder),
+            latency,
+            recorder,
+        )
+    raise ValueError(f"Perfil de adaptadores desconhecido: {name}")
+
+
+_profile: Optional[AdapterProfile] = None
+_profile_lock = threading.Lock()
+
+
+def get_profile() -> AdapterProfile:
+    global _profile
+    with _profile_lock:
+        if _profile is None:
+            _profile = build_profile(settings.ADAPTERS_PROFILE)
+            if _profile.name != PROFILE_LIVE or _profile.latency:
+                logger.warning(f"Adaptadores no perfil {_profile.name} com latencia {_profile.latency}")
+        return _profile
+
+
+def set_profile(profile: AdapterProfile):
+    global _profile
+    with _profile_lock:
+        _profile = profile
+
+
+@contextmanager
+def use_profile(profile: AdapterProfile) -> Iterator[AdapterProfile]:
+    global _profile
+    with _profile_lock:
+        previous, _profile = _profile, profile
+    try:
+        yield profile
+    finally:
+        with _profile_lock:
+            _profile = previous
+
+
+def _payload_field(payload: Any, name: str) -> Any:
+    return payload.get(name) if isinstance(payload, dict) else getattr(payload, name, None)
+
+
+def _through_cache(
+    profile: AdapterProfile, s3_key: Optional[str], directory: str, download: Callable[[str], str], current: Any, tree: bool = False
+) -> Tuple[str, bool]:
+    """
+    Chama `download(diretorio)` pelo cache local de artefatos quando ha s3Key e o cache esta ligado.
+    Retorna (caminho, veio do cache).
+    """
+    cache = artifacts.get_artifact_cache() if s3_key else None
+    if cache is None:
+        return download(directory), False
+
+    def etag() -> Optional[str]:
+        profile.delay("s3")
+        return profile.s3.get_etag(s3_key)
+
+    key = artifacts.tree_key(s3_key) if tree else s3_key
+    filepath, cached = cache.fetch(key, directory, download, etag, tree=tree)
+    if current is not None:
+        current.set_attribute("cache", artifacts.CACHE_HIT if cached else artifacts.CACHE_MISS)
+    return filepath, cached
+
+
+def download_from_s3(webhook_id: str, filename: str, path_to_send: str, s3_key: Optional[str] = None) -> str:
+    with span("s3.download_from_s3", webhook_id=webhook_id, filename=filename) as current:
+        profile = get_profile()
+
+        def download(directory: str) -> str:
+            profile.delay("s3")
+            return profile.s3.download_from_s3(webhook_id, filename, directory)
+
+        filepath, cached = _through_cache(profile, s3_key, path_to_send, download, current)
+        if not cached:
+            metrics.observe_download(filepath)
+        ledger.note_input(filepath)
+        return filepath
+
+
+def handle_webhook_file(payload: Any, path: str) -> str:
+    filename = _payload_field(payload, "filename")
+    with span("s3.handle_webhook_file", filename=filename) as current:
+        profile = get_profile()
+
+        def handle(directory: str) -> str:
+            # A extracao e o layout do resultado sao do middle; o cache so guarda e recria o que ele deixou
+            profile.delay("s3")
+            return profile.s3.handle_webhook_file(payload, directory)
+
+        base_path, cached = _through_cache(profile, _payload_field(payload, "s3Key"), path, handle, current, tree=True)
+        if not cached:
+            metrics.observe_download(base_path)
+        ledger.note_input(base_path)
+        return base_path
+
+
+def get_latest_webhook_product(product_name: str) -> list:
+    with span("s3.get_latest_webhook_product", produto=product_name):
+        profile = get_profile()
+        profile.delay("s3")
+        return profile.s3.get_latest_webhook_product(product_name)
+
+
+def list_webhook_objects(product_key: str) -> list:
+    with span("s3.list_webhook_objects", produto=product_key):
+        profile = get_profile()
+        profile.delay("s3")
+        return profile.s3.list_webhook_objects(product_key)
+
+
+def trigger_dag(*args: Any, **kwargs: Any) -> Any:
+    dag_id = kwargs.get("dag_id", args[0] if args else None)
+    with span("airflow.trigger_dag", dag_id=dag_id):
+        profile = get_profile()
+        profile.delay("airflow")
+        result = profile.airflow.trigger_dag(*args, **kwargs)
+        ledger.note_dag(dag_id)
+        return result
+
+
+def send_whatsapp_message(*args: Any, **kwargs: Any) -> Any:
+    with span("message.send_whatsapp_message"):
+        profile = get_profile()
+        profile.delay("message")
+        result = profile.messaging.send_whatsapp_message(*args, **kwargs)
+        ledger.note_notified()
+        return result
+
+
+def send_email_message(*args: Any, **kwargs: Any) -> Any:
+    with span("message.send_email_message"):
+        profile = get_profile()
+        profile.delay("message")
+        result = profile.messaging.send_email_message(*args, **kwargs)
+        ledger.note_notified()
+        return result
+
+
+from . import http  # noqa: E402
@@ -0,0 +1,132 @@
+"""
+Chamadas HTTP dos produtos com a mesma assinatura de requests.get/post/put/delete,
+roteadas pelo perfil de adaptadores ativo.
+
+Cada chamada e medida por endpoint: o nome da constante de middle.utils.Constants com a mesma URL
+(ex.: POST_RODADAS_CHUVA_PREVISAO_MODELOS) ou, para URLs montadas nos produtos, host + caminho com os
+trechos numericos trocados por {}. Latencia, bytes enviados/recebidos, status e retentativas vao para as
+metricas webhook_http_* e para o span da chamada.
+
+Metodos idempotentes (GET, PUT, DELETE...) sao repetidos ate HTTP_RETRIES vezes em erro de conexao,
+timeout ou 502/503/504; POST nunca e repetido para nao duplicar dados na API.
+"""
+import re
+import time
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from middle.utils import Constants
+from .. import ledger, metrics
+from ..settings import settings
+from ..tracing import span
+from . import get_profile
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {502, 503, 504}
+
+
+@lru_cache(maxsize=1)
+def _known_endpoints() -> List[Tuple[str, str]]:
+    constants = Constants()
+    endpoints = []
+    for name in dir(constants):
+        if name.startswith("_"):
+            continue
+        value = getattr(constants, name, None)
+        if isinstance(value, str) and value.startswith(("http://", "https://")):
+            endpoints.append((value.split("?", 1)[0].rstrip("/"), name))
+    return endpoints
+
+
+@lru_cache(maxsize=4096)
+def endpoint_name(url: str) -> str:
+    base = url.split("?", 1)[0].rstrip("/")
+    for known, name in _known_endpoints():
+        if base == known:
+            return name
+    parts = urlsplit(base)
+    # Datas e ids no caminho viram {} para nao criar uma serie por valor (a versao da API, como v2, fica)
+    path = "/".join(
+        "{}" if re.search(r"\d", segment) and not re.fullmatch(r"v\d+", segment) else segment
+        for segment in parts.path.split("/")
+    )
+    return f"{parts.netloc}{path}"
+
+
+def retry_attempts(method: str, retries: Optional[int] = None) -> int:
+    if method not in IDEMPOTENT_METHODS:
+        return 1
+    return 1 + (settings.HTTP_RETRIES if retries is None else retries)
+
+
+def retry_delay(attempt: int) -> float:
+    return settings.HTTP_RETRY_BACKOFF * 2 ** (attempt - 1)
+
+
+def body_size(body: Any) -> int:
+    return len(body) if isinstance(body, (bytes, str)) else 0
+
+
+def response_size(response: requests.Response, stream: bool = False) -> int:
+    # Com stream=True o corpo ainda nao foi lido: usa o Content-Length para nao consumir o stream
+    if stream:
+        return int(response.headers.get("Content-Length") or 0)
+    return len(response.content)
+
+
+def request(method: str, url: str, endpoint: Optional[str] = None, retries: Optional[int] = None, **kwargs: Any) -> requests.Response:
+    """
+    Como requests.request, com `endpoint` para nomear a chamada nas metricas e `retries` para
+    sobrescrever HTTP_RETRIES.
+    """
+    method = method.upper()
+    name = endpoint or endpoint_name(url)
+    attempts = retry_attempts(method, retries)
+    with span(f"http {method}", **{"http.method": method, "http.url": url, "http.endpoint": name}) as http_span:
+        profile = get_profile()
+        for attempt in range(1, attempts + 1):
+            profile.delay("http")
+            start = time.perf_counter()
+            try:
+                response = profile.http.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.observe_http(name, method, type(e).__name__, time.perf_counter() - start)
+                if attempt == attempts:
+                    raise
+            else:
+                request_bytes = body_size(response.request.body) if response.request is not None else 0
+                response_bytes = response_size(response, kwargs.get("stream", False))
+                metrics.observe_http(
+                    name, method, str(response.status_code), time.perf_counter() - start,
+                    request_bytes, response_bytes,
+                )
+                if response.status_code not in RETRY_STATUSES or attempt == attempts:
+                    break
+            metrics.observe_http_retry(name, method)
+            time.sleep(retry_delay(attempt))
+        if http_span is not None:
+            http_span.set_attribute("http.status_code", response.status_code)
+            http_span.set_attribute("http.attempts", attempt)
+            http_span.set_attribute("http.request_bytes", request_bytes)
+            http_span.set_attribute("http.response_bytes", response_bytes)
+        if method in ("POST", "PUT") and response.ok:
+            metrics.observe_posted(kwargs.get("json"))
+            ledger.note_posted(kwargs.get("json"))
+        return response
+
+
+def get(url: str, params: Any = None, **kwargs: Any) -> requests.Response:
+    return request("GET", url, params=params, **kwargs)
+
+
+def post(url: str, data: Any = None, json: Any = None, **kwargs: Any) -> requests.Response:
+    return request("POST", url, data=data, json=json, **kwargs)
+
+
+def put(url: str, data: Any = None, **kwargs: Any) -> requests.Response:
+    return request("PUT", url, data=data, **kwargs)
+
+
+def delete(url: str, **kwargs: Any) -> requests.Response:
+    return request("DELETE", url, **kwargs)
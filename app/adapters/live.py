@@ -0,0 +1,84 @@
+from typing import Any, List, Optional
+import requests
+from middle import s3
+from middle.airflow import trigger_dag
+from middle.message import send_whatsapp_message, send_email_message
+from middle.utils import sanitize_string
+from ..backfill import WEBHOOK_PREFIX, WebhookObject
+from ..logs import get_logger
+from ..settings import settings
+
+logger = get_logger(__name__)
+
+
+class LiveS3:
+    """
+    S3 real, via middle.s3.
+    """
+
+    def __init__(self):
+        self._client = None
+
+    def download_from_s3(self, webhook_id: str, filename: str, path_to_send: str) -> str:
+        return s3.download_from_s3(webhook_id, filename, path_to_send)
+
+    def handle_webhook_file(self, payload: Any, path: str) -> str:
+        return s3.handle_webhook_file(payload, path)
+
+    def get_latest_webhook_product(self, product_name: str) -> list:
+        return s3.get_latest_webhook_product(product_name)
+
+    def get_etag(self, s3_key: str) -> Optional[str]:
+        """
+        ETag do objeto no bucket de webhooks (HEAD); None sem S3_WEBHOOK_BUCKET ou se a consulta falhar.
+        """
+        if not settings.S3_WEBHOOK_BUCKET:
+            return None
+        try:
+            return self._s3_client().head_object(Bucket=settings.S3_WEBHOOK_BUCKET, Key=s3_key)["ETag"]
+        except Exception as e:
+            logger.warning("Nao foi possivel consultar o ETag de %s: %s", s3_key, e)
+            return None
+
+    def list_webhook_objects(self, product_key: str) -> List[WebhookObject]:
+        """
+        Objetos do bucket de webhooks cuja pasta (webhooks/<nome do produto>/), sanitizada, e `product_key`.
+        """
+        if not settings.S3_WEBHOOK_BUCKET:
+            raise RuntimeError("Configure S3_WEBHOOK_BUCKET para listar os webhooks do S3")
+        paginator = self._s3_client().get_paginator("list_objects_v2")
+        objects = []
+        for page in paginator.paginate(Bucket=settings.S3_WEBHOOK_BUCKET, Prefix=WEBHOOK_PREFIX):
+            for item in page.get("Contents", []):
+                folder = item["Key"][len(WEBHOOK_PREFIX):].split("/", 1)[0]
+                if sanitize_string(folder, space_char="_") == product_key:
+                    objects.append(WebhookObject(item["Key"], item["LastModified"].replace(tzinfo=None), item["Size"]))
+        return objects
+
+    def _s3_client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client("s3")
+        return self._client
+
+
+class LiveHttp:
+    """
+    Chamadas HTTP reais com requests.
+    """
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        return requests.request(method, url, **kwargs)
+
+
+class LiveAirflow:
+    def trigger_dag(self, *args: Any, **kwargs: Any) -> Any:
+        return trigger_dag(*args, **kwargs)
+
+
+class LiveMessaging:
+    def send_whatsapp_message(self, *args: Any, **kwargs: Any) -> Any:
+        return send_whatsapp_message(*args, **kwargs)
+
+    def send_email_message(self, *args: Any, **kwargs: Any) -> Any:
+        return send_email_message(*args, **kwargs)
@@ -0,0 +1,179 @@
+import json
+import os
+import shutil
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
+import requests
+from middle.utils import sanitize_string
+from ..logs import get_logger
+from ..backfill import WEBHOOK_PREFIX, WebhookObject, build_payload
+
+logger = get_logger(__name__)
+
+
+class CallRecorder:
+    """
+    Guarda em memoria (e opcionalmente em JSONL) as chamadas recebidas por um stand-in offline.
+    """
+
+    def __init__(self, record_path: Optional[str] = None):
+        self.calls: List[Dict[str, Any]] = []
+        self._record_path = record_path
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, **details: Any):
+        entry = {"kind": kind, "timestamp": time.time(), **details}
+        with self._lock:
+            self.calls.append(entry)
+            if self._record_path:
+                os.makedirs(os.path.dirname(self._record_path) or ".", exist_ok=True)
+                with open(self._record_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+
+class LocalDirectoryS3:
+    """
+    S3 local: os arquivos ficam em <root>/webhooks/<nome do produto>/<webhookId>_<filename>,
+    mesmo layout do bucket de webhooks.
+    """
+
+    def __init__(self, root: str, recorder: Optional[CallRecorder] = None):
+        self.root = Path(root)
+        self.recorder = recorder or CallRecorder()
+
+    def download_from_s3(self, webhook_id: str, filename: str, path_to_send: str) -> str:
+        matches = sorted(self.root.glob(f"{WEBHOOK_PREFIX}*/{webhook_id}_{filename}")) or sorted(self.root.rglob(filename))
+        if not matches:
+            raise FileNotFoundError(f"Arquivo {webhook_id}_{filename} nao encontrado no S3 local {self.root}")
+        os.makedirs(path_to_send, exist_ok=True)
+        destination = os.path.join(path_to_send, filename)
+        shutil.copyfile(matches[0], destination)
+        self.recorder.record("s3.download", source=str(matches[0]), destination=destination)
+        return destination
+
+    def handle_webhook_file(self, payload: Any, path: str) -> str:
+        """
+        Baixa o arquivo do payload e, se for um zip, extrai em <path>/<nome do arquivo sem extensao>.
+        """
+        payload = payload if isinstance(payload, dict) else payload.model_dump()
+        filepath = self.download_from_s3(payload["webhookId"], payload["filename"], path)
+        if not zipfile.is_zipfile(filepath):
+            return filepath
+        extract_path = os.path.splitext(filepath)[0]
+        with zipfile.ZipFile(filepath) as zip_file:
+            zip_file.extractall(extract_path)
+        return extract_path
+
+    def get_etag(self, s3_key: str) -> Optional[str]:
+        """
+        ETag sintetico (mtime + tamanho) do arquivo <root>/<s3Key>; None se a chave nao existir no diretorio.
+        """
+        try:
+            stat = (self.root / s3_key).stat()
+        except OSError:
+            return None
+        self.recorder.record("s3.head", key=s3_key)
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def list_webhook_objects(self, product_key: str) -> List[WebhookObject]:
+        """
+        Arquivos de <root>/webhooks/<pasta>/ cuja pasta, sanitizada, e `product_key`; a data e o mtime do arquivo.
+        """
+        objects = []
+        for folder in (self.root / WEBHOOK_PREFIX).glob("*"):
+            if not folder.is_dir() or sanitize_string(folder.name, space_char="_") != product_key:
+                continue
+            for file in folder.iterdir():
+                stat = file.stat()
+                key = f"{WEBHOOK_PREFIX}{folder.name}/{file.name}"
+                objects.append(WebhookObject(key, datetime.fromtimestamp(stat.st_mtime), stat.st_size))
+        return objects
+
+    def get_latest_webhook_product(self, product_name: str) -> List[dict]:
+        """
+        Payloads sinteticos dos arquivos do produto, do mais recente para o mais antigo.
+        """
+        objects = self.list_webhook_objects(sanitize_string(product_name, space_char="_"))
+        self.recorder.record("s3.latest", product=product_name, found=len(objects))
+        objects.sort(key=lambda obj: obj.last_modified, reverse=True)
+        return [build_payload(obj).model_dump(mode="json") for obj in objects]
+
+
+class RecordingHttpStub:
+    """
+    Stub da API: GET devolve a resposta gravada em <fixtures_dir>/<caminho da url>.json (404 se nao existir);
+    POST/PUT/PATCH/DELETE sao aceitos com 200 e `{}`. Todas as chamadas ficam registradas no recorder.
+    """
+
+    def __init__(self, fixtures_dir: str, recorder: Optional[CallRecorder] = None):
+        self.fixtures_dir = Path(fixtures_dir)
+        self.recorder = recorder or CallRecorder()
+
+    def fixture_path(self, url: str) -> Path:
+        return self.fixtures_dir / f"{urlsplit(url).path.strip('/')}.json"
+
+    def respond(self, method: str, url: str, body: Optional[bytes] = None) -> tuple:
+        method = method.upper()
+        if method == "GET":
+            fixture = self.fixture_path(url)
+            if fixture.exists():
+                status, content = 200, fixture.read_bytes()
+            else:
+                logger.warning(f"[offline] sem resposta gravada para GET {url} ({fixture})")
+                status, content = 404, b'{"detail": "fixture nao encontrada"}'
+        else:
+            status, content = 200, b"{}"
+        self.recorder.record("http", method=method, url=url, status=status, request_bytes=len(body or b""))
+        return status, content
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        body = kwargs.get("data")
+        if kwargs.get("json") is not None:
+            body = json.dumps(kwargs["json"], default=str).encode()
+        prepared = requests.Request(method, url, params=kwargs.get("params")).prepare()
+        prepared.body = body
+        status, content = self.respond(method, prepared.url, body if isinstance(body, bytes) else None)
+        response = requests.Response()
+        response.status_code = status
+        response._content = content
+        response.url = prepared.url
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        response.request = prepared
+        return response
+
+    def handle_httpx(self, request: httpx.Request) -> httpx.Response:
+        """
+        Handler para httpx.MockTransport, usado pelo cliente dos produtos assincronos.
+        """
+        status, content = self.respond(request.method, str(request.url), request.content)
+        return httpx.Response(status, content=content, headers={"Content-Type": "application/json"})
+
+
+class NullAirflow:
+    def __init__(self, recorder: Optional[CallRecorder] = None):
+        self.recorder = recorder or CallRecorder()
+
+    def trigger_dag(self, *args: Any, **kwargs: Any) -> None:
+        dag_id = kwargs.get("dag_id", args[0] if args else None)
+        logger.info(f"[offline] trigger da dag {dag_id} ignorado")
+        self.recorder.record("airflow.trigger_dag", dag_id=dag_id, conf=kwargs.get("conf", args[1] if len(args) > 1 else None))
+
+
+class NullMessaging:
+    def __init__(self, recorder: Optional[CallRecorder] = None):
+        self.recorder = recorder or CallRecorder()
+
+    def send_whatsapp_message(self, *args: Any, **kwargs: Any) -> None:
+        logger.info("[offline] envio de WhatsApp ignorado")
+        self.recorder.record("message.whatsapp", destination=args[0] if args else kwargs.get("destinatario"))
+
+    def send_email_message(self, *args: Any, **kwargs: Any) -> None:
+        logger.info("[offline] envio de e-mail ignorado")
+        self.recorder.record("message.email", user=kwargs.get("user"))
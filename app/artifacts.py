@@ -0,0 +1,348 @@
+"""
+Cache local dos arquivos de webhook baixados do S3, para que retentativas, replays e leituras do ultimo
+produto (get_latest_webhook_product + handle_webhook_file) nao baixem de novo o mesmo objeto.
+
+- Chave: s3Key do payload, com o ETag do objeto no momento do download. As chaves levam o webhookId
+  (webhooks/<produto>/<webhookId>_<arquivo>) e nao sao reescritas, entao um acerto e servido sem nenhuma
+  chamada ao S3; com ARTIFACT_CACHE_REVALIDATE o ETag e consultado (HEAD) e um ETag diferente invalida a entrada.
+- Conteudo: guardado uma unica vez pelo sha256 em <dir>/blobs/<2 primeiros>/<sha256>; chaves com o mesmo
+  conteudo compartilham o arquivo. O indice fica em SQLite e pode ser compartilhado entre processos.
+- Tamanho: ao passar de ARTIFACT_CACHE_MAX_BYTES, os conteudos usados ha mais tempo sao removidos (LRU).
+- Downloads simultaneos da mesma chave no processo sao unificados: uma thread baixa e as demais aguardam.
+
+O arquivo e sempre copiado para o diretorio pedido, no mesmo caminho relativo devolvido pelo download, entao
+o produto pode extrair ou alterar a copia sem afetar o cache.
+
+O handle_webhook_file do middle baixa e extrai o arquivo num layout que e so dele. Nesse caso (tree=True) o
+middle roda num diretorio vazio e a arvore inteira que ele deixou e guardada como um zip; um acerto recria a
+mesma arvore no diretorio pedido e devolve o mesmo caminho relativo que o middle devolveu.
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from . import metrics
+from .logs import get_logger
+from .settings import settings
+
+logger = get_logger(__name__)
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+CACHE_STALE = "stale"
+
+_CHUNK = 1024 ** 2
+
+
+@dataclass
+class ArtifactEntry:
+    s3_key: str
+    etag: Optional[str]
+    sha256: str
+    filename: str
+    size: int
+    last_access: float
+    tree: bool = False
+
+
+def tree_key(s3_key: str) -> str:
+    """
+    Chave do indice para a arvore gerada pelo handle_webhook_file, separada do arquivo cru da mesma s3Key.
+    """
+    return f"{s3_key}#handle_webhook_file"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Cache de arquivos do S3 por s3Key + ETag, enderecado pelo conteudo e limitado por tamanho com LRU.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, revalidate: bool = False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        self.index_path = os.path.join(directory, "index.sqlite")
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "staging"), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    s3_key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    sha256 TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS artifacts_sha256 ON artifacts (sha256)")
+            # Indices criados antes das entradas com arvore (handle_webhook_file)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(artifacts)")}
+            if "tree" not in columns:
+                conn.execute("ALTER TABLE artifacts ADD COLUMN tree INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.directory, "blobs", sha256[:2], sha256)
+
+    def get(self, s3_key: str) -> Optional[ArtifactEntry]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT s3_key, etag, sha256, filename, size, last_access, tree FROM artifacts WHERE s3_key = ?", (s3_key,)
+            ).fetchone()
+        return ArtifactEntry(*row[:6], tree=bool(row[6])) if row else None
+
+    def total_bytes(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM artifacts GROUP BY sha256)").fetchone()
+        return row[0]
+
+    def fetch(
+        self,
+        s3_key: str,
+        destination_dir: str,
+        download: Callable[[str], str],
+        etag: Callable[[], Optional[str]],
+        tree: bool = False,
+    ) -> Tuple[str, bool]:
+        """
+        Copia o arquivo da chave para `destination_dir`, baixando com `download(diretorio)` apenas se ele nao
+        estiver no cache. `etag()` consulta o ETag atual do objeto (None se indisponivel).
+        Com `tree`, guarda e recria tudo o que `download` deixou no diretorio, e nao so o caminho devolvido.
+        Retorna (caminho da copia, True se veio do cache).
+        """
+        path = self._serve(s3_key, destination_dir, etag)
+        if path is not None:
+            return path, True
+
+        with self._lock:
+            future = self._inflight.get(s3_key)
+            owner = future is None
+            if owner:
+                future = self._inflight[s3_key] = Future()
+        if not owner:
+            logger.debug("Download de %s ja em andamento, aguardando", s3_key)
+            future.result()
+            path = self._serve(s3_key, destination_dir, None)
+            if path is not None:
+                return path, True
+            # O download concorrente nao entrou no cache (maior que o limite): baixa direto
+            return download(destination_dir), False
+
+        try:
+            path = self._fill(s3_key, destination_dir, download, etag, tree)
+            future.set_result(None)
+            return path, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(s3_key, None)
+
+    def _serve(self, s3_key: str, destination_dir: str, etag: Optional[Callable[[], Optional[str]]]) -> Optional[str]:
+        entry = self.get(s3_key)
+        if entry is None:
+            return None
+        if self.revalidate and etag is not None:
+            current = etag()
+            if current is not None and entry.etag is not None and current != entry.etag:
+                logger.info("ETag de %s mudou (%s -> %s), baixando novamente", s3_key, entry.etag, current)
+                metrics.observe_artifact_cache(CACHE_STALE)
+                return None
+        try:
+            if entry.tree:
+                path = self._unpack(self.blob_path(entry.sha256), destination_dir, entry.filename)
+            else:
+                path = self._materialize(self.blob_path(entry.sha256), destination_dir, entry.filename)
+        except FileNotFoundError:
+            # Conteudo removido por outro processo (eviccao) entre a consulta e a copia
+            self._forget(s3_key)
+            return None
+        with self._connect() as conn:
+            conn.execute("UPDATE artifacts SET last_access = ? WHERE s3_key = ?", (time.time(), s3_key))
+        metrics.observe_artifact_cache(CACHE_HIT)
+        logger.debug("Arquivo %s servido do cache local (%s)", s3_key, entry.sha256)
+        return path
+
+    def _fill(
+        self,
+        s3_key: str,
+        destination_dir: str,
+        download: Callable[[str], str],
+        etag: Callable[[], Optional[str]],
+        tree: bool = False,
+    ) -> str:
+        metrics.observe_artifact_cache(CACHE_MISS)
+        current = etag()
+        staging = tempfile.mkdtemp(dir=os.path.join(self.directory, "staging"))
+        try:
+            downloaded = download(staging)
+            # Caminho relativo ao diretorio do download: a copia fica onde o download direto a deixaria
+            filename = os.path.relpath(downloaded, staging)
+            if filename.startswith(os.pardir):
+                logger.warning("Download de %s fora do diretorio pedido (%s), nao sera guardado", s3_key, downloaded)
+                return downloaded
+            if not tree and not os.path.isfile(downloaded):
+                logger.warning("Download de %s nao e um arquivo (%s), nao sera guardado", s3_key, downloaded)
+                return self._move_tree(staging, destination_dir, filename)
+            source = self._pack(staging) if tree else downloaded
+            size = os.path.getsize(source)
+            if size > self.max_bytes:
+                logger.warning("Arquivo %s (%d bytes) maior que o cache local, nao sera guardado", s3_key, size)
+                if tree:
+                    return self._move_tree(staging, destination_dir, filename)
+                return self._materialize(downloaded, destination_dir, filename)
+            sha256 = file_sha256(source)
+            blob = self.blob_path(sha256)
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            if not os.path.exists(blob):
+                os.replace(source, blob)
+            previous = self.get(s3_key)
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (s3_key, etag, sha256, filename, size, stored_at, last_access, tree) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (s3_key, current, sha256, filename, size, now, now, int(tree)),
+                )
+            if previous is not None and previous.sha256 != sha256:
+                # Conteudo antigo da chave (ETag mudou) sai do disco se nenhuma outra chave o usa
+                self._remove_orphan(previous.sha256)
+            self._evict(keep=sha256)
+            if tree:
+                return self._unpack(blob, destination_dir, filename)
+            return self._materialize(blob, destination_dir, filename)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+            if tree:
+                try:
+                    os.remove(f"{staging}.zip")
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _pack(staging: str) -> str:
+        # Fora do diretorio empacotado; nivel 1: o custo vai para a leitura do disco, nao para a compressao
+        archive = f"{staging}.zip"
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+            for root, dirs, files in os.walk(staging):
+                for name in dirs + files:
+                    path = os.path.join(root, name)
+                    zip_file.write(path, os.path.relpath(path, staging))
+        return archive
+
+    @staticmethod
+    def _unpack(blob: str, destination_dir: str, filename: str) -> str:
+        with zipfile.ZipFile(blob) as zip_file:
+            zip_file.extractall(destination_dir)
+        return os.path.join(destination_dir, filename)
+
+    @staticmethod
+    def _move_tree(staging: str, destination_dir: str, filename: str) -> str:
+        # Entrega sem passar pelo cache: leva o que o download deixou em staging para o diretorio pedido
+        os.makedirs(destination_dir, exist_ok=True)
+        for entry in os.scandir(staging):
+            target = os.path.join(destination_dir, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                shutil.copytree(entry.path, target, symlinks=True, dirs_exist_ok=True)
+            else:
+                shutil.move(entry.path, target)
+        return os.path.join(destination_dir, filename)
+
+    @staticmethod
+    def _materialize(source: str, destination_dir: str, filename: str) -> str:
+        # Copia para um nome temporario e renomeia: leitores do mesmo destino nunca veem o arquivo pela metade
+        destination = os.path.join(destination_dir, filename)
+        parent = os.path.dirname(destination)
+        os.makedirs(parent, exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=parent, prefix=f".{os.path.basename(filename)}.")
+        os.close(fd)
+        try:
+            shutil.copyfile(source, partial)
+            os.replace(partial, destination)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return destination
+
+    def _remove_orphan(self, sha256: str):
+        with self._connect() as conn:
+            referenced = conn.execute("SELECT 1 FROM artifacts WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone()
+        if referenced is None:
+            try:
+                os.remove(self.blob_path(sha256))
+            except FileNotFoundError:
+                pass
+
+    def _forget(self, s3_key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM artifacts WHERE s3_key = ?", (s3_key,))
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        Remove os conteudos usados ha mais tempo (e as chaves que apontam para eles) ate o total caber no limite.
+        """
+        with self._connect() as conn:
+            blobs = conn.execute(
+                "SELECT sha256, MAX(size), MAX(last_access) AS last_access FROM artifacts GROUP BY sha256 ORDER BY last_access"
+            ).fetchall()
+            total = sum(size for _, size, _ in blobs)
+            for sha256, size, _ in blobs:
+                if total <= self.max_bytes:
+                    break
+                if sha256 == keep:
+                    continue
+                conn.execute("DELETE FROM artifacts WHERE sha256 = ?", (sha256,))
+                try:
+                    os.remove(self.blob_path(sha256))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                logger.info("Conteudo %s (%d bytes) removido do cache local", sha256, size)
+        metrics.set_artifact_cache_bytes(total)
+
+
+_cache: Optional[ArtifactCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """
+    Cache do processo, ou None com ARTIFACT_CACHE_ENABLED desligado.
+    """
+    global _cache
+    if not settings.ARTIFACT_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.directory != settings.ARTIFACT_CACHE_DIR:
+            _cache = ArtifactCache(
+                settings.ARTIFACT_CACHE_DIR,
+                settings.ARTIFACT_CACHE_MAX_BYTES,
+                revalidate=settings.ARTIFACT_CACHE_REVALIDATE,
+            )
+        return _cache
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+import httpx
+from middle.utils import get_auth_header
+from .logs import get_logger
+from . import adapters, ledger, metrics
+from .adapters import download_from_s3, send_email_message, send_whatsapp_message, trigger_dag
+from .adapters.http import RETRY_STATUSES, endpoint_name, retry_attempts, retry_delay
+from .settings import settings
+from .tracing import span
+
+logger = get_logger(__name__)
+
+
+class TracedAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient com a mesma instrumentacao de app.adapters.http: span `http <METODO>` filho do span corrente,
+    metricas por endpoint e retentativas dos metodos idempotentes.
+    """
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        name = request.extensions.get("endpoint") or endpoint_name(str(request.url))
+        attempts = retry_attempts(request.method)
+        attributes = {"http.method": request.method, "http.url": str(request.url), "http.endpoint": name}
+        with span(f"http {request.method}", **attributes) as http_span:
+            for attempt in range(1, attempts + 1):
+                start = time.perf_counter()
+                try:
+                    response = await super().send(request, **kwargs)
+                except (httpx.ConnectError, httpx.TimeoutException) as e:
+                    metrics.observe_http(name, request.method, type(e).__name__, time.perf_counter() - start)
+                    if attempt == attempts:
+                        raise
+                else:
+                    # Com stream=True o corpo ainda nao foi lido: usa o Content-Length para nao consumir o stream
+                    response_bytes = (
+                        int(response.headers.get("Content-Length") or 0) if kwargs.get("stream") else len(response.content)
+                    )
+                    metrics.observe_http(
+                        name, request.method, str(response.status_code), time.perf_counter() - start,
+                        len(request.content), response_bytes,
+                    )
+                    if response.status_code not in RETRY_STATUSES or attempt == attempts:
+                        break
+                    await response.aclose()
+                metrics.observe_http_retry(name, request.method)
+                await asyncio.sleep(retry_delay(attempt))
+            if http_span is not None:
+                http_span.set_attribute("http.status_code", response.status_code)
+                http_span.set_attribute("http.attempts", attempt)
+                http_span.set_attribute("http.request_bytes", len(request.content))
+                http_span.set_attribute("http.response_bytes", response_bytes)
+            return response
+
+
+def http_client(**kwargs: Any) -> httpx.AsyncClient:
+    """
+    Cliente HTTP assincrono usado por uma execucao de produto; deve ser fechado pelo chamador (async with).
+    Segue o perfil de app.adapters: no offline as requisicoes vao para o stub, e a latencia de "http" e aplicada.
+    """
+    profile = adapters.get_profile()
+    kwargs.setdefault("timeout", settings.ASYNC_HTTP_TIMEOUT)
+    kwargs.setdefault("limits", httpx.Limits(max_connections=settings.ASYNC_HTTP_MAX_CONNECTIONS))
+    if profile.name == adapters.PROFILE_OFFLINE:
+        kwargs.setdefault("transport", httpx.MockTransport(profile.http.handle_httpx))
+    event_hooks = {"request": [], "response": [_observe_posted]}
+    if profile.latency.get("http"):
+        async def inject_latency(request: httpx.Request):
+            await asyncio.sleep(profile.latency["http"])
+        event_hooks["request"].append(inject_latency)
+    kwargs.setdefault("event_hooks", event_hooks)
+    return TracedAsyncClient(**kwargs)
+
+
+async def _observe_posted(response: httpx.Response):
+    request = response.request
+    if request.method in ("POST", "PUT") and response.is_success and request.headers.get("content-type") == "application/json":
+        body = json.loads(request.content)
+        metrics.observe_posted(body)
+        ledger.note_posted(body)
+
+
+async def auth_header() -> Dict[str, str]:
+    # get_auth_header pode renovar o token na API, por isso nao roda no event loop
+    return await asyncio.to_thread(get_auth_header)
+
+
+async def download_from_s3_async(webhook_id: str, filename: str, path_to_send: str, s3_key: Optional[str] = None) -> str:
+    os.makedirs(path_to_send, exist_ok=True)
+    return await asyncio.to_thread(download_from_s3, webhook_id, filename, path_to_send, s3_key)
+
+
+async def trigger_dag_async(*args: Any, **kwargs: Any) -> Any:
+    return await asyncio.to_thread(trigger_dag, *args, **kwargs)
+
+
+async def send_whatsapp_message_async(*args: Any, **kwargs: Any) -> Any:
+    return await asyncio.to_thread(send_whatsapp_message, *args, **kwargs)
+
+
+async def send_email_message_async(*args: Any, **kwargs: Any) -> Any:
+    return await asyncio.to_thread(send_email_message, *args, **kwargs)
@@ -0,0 +1,88 @@
+import asyncio
+from abc import abstractmethod
+from typing import Any, Dict, Optional
+import httpx
+from middle.utils import Constants
+from .logs import get_logger
+from . import async_adapters
+from .pipeline import timed_stage_async
+from .schema import WebhookSintegreSchema
+from .webhook_products_interface import WebhookProductsInterface
+
+logger = get_logger(__name__)
+constants = Constants()
+
+
+class AsyncWebhookProductsInterface(WebhookProductsInterface):
+    """
+    Variante assincrona da interface dos produtos do webhook.
+    As etapas de rede (fetch, publish, notify, trigger) sao corrotinas e compartilham o cliente `self.http`;
+    extract, parse e transform continuam sincronas e rodam numa thread (ou no pool de processos via app.offload).
+    """
+
+    def __init__(self, payload: Optional[WebhookSintegreSchema] = None):
+        super().__init__(payload)
+        self.http: Optional[httpx.AsyncClient] = None
+
+    @abstractmethod
+    async def run_workflow(self, filepath: Optional[str] = None):
+        """
+        Ponto de entrada assincrono do etl. Em geral apenas `return await self.run_stages(filepath)`.
+        """
+        pass
+
+    async def fetch(self) -> str:
+        filepath = await async_adapters.download_from_s3_async(
+            self.payload.webhookId, self.payload.filename, constants.PATH_TMP, s3_key=self.payload.s3Key
+        )
+        logger.info(f"Arquivo {self.payload.filename} baixado com sucesso para {constants.PATH_TMP}")
+        return filepath
+
+    async def publish(self, data: Any) -> Any:
+        return None
+
+    async def notify(self, data: Any):
+        return None
+
+    async def trigger(self, data: Any):
+        return None
+
+    async def run_stages(self, filepath: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Mesmo pipeline do WebhookProductsInterface.run_stages, intercalando as esperas de rede no event loop.
+        """
+        self.stage_metrics = []
+        try:
+            async with async_adapters.http_client() as self.http:
+                self.filepath = filepath if filepath else await self._run_stage_async("fetch")
+                value = self.filepath
+                for name in ("extract", "parse", "transform"):
+                    if self._stage_implemented(name):
+                        value = await asyncio.to_thread(self._run_stage, name, value)
+                if self._stage_implemented("publish"):
+                    await self._run_stage_async("publish", value)
+                await self._run_final_stages_async(value)
+        finally:
+            self.http = None
+            self._log_stage_metrics()
+        self.run_workflow_results["stages"] = [m.to_dict() for m in self.stage_metrics]
+        return self.run_workflow_results
+
+    def _stage_implemented(self, name: str) -> bool:
+        return getattr(type(self), name) is not getattr(AsyncWebhookProductsInterface, name)
+
+    async def _run_stage_async(self, name: str, *args: Any) -> Any:
+        return await timed_stage_async(self, name, getattr(self, name), *args, record=self.stage_metrics)
+
+    async def _run_final_stages_async(self, data: Any):
+        stages = [name for name in ("notify", "trigger") if self._stage_implemented(name)]
+        concurrent = [name for name in stages if name in self.concurrent_stages]
+        for name in stages:
+            if name not in concurrent:
+                await self._run_stage_async(name, data)
+        results = await asyncio.gather(
+            *(self._run_stage_async(name, data) for name in concurrent), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
@@ -0,0 +1,110 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List
+from . import adapters
+from .logs import get_logger
+from .schema import WebhookSintegreSchema
+
+logger = get_logger(__name__)
+
+WEBHOOK_PREFIX = "webhooks/"
+
+
+@dataclass
+class WebhookObject:
+    key: str
+    last_modified: datetime
+    size: int
+
+
+def list_webhook_objects(product_key: str, start: datetime, end: datetime) -> List[WebhookObject]:
+    """
+    Lista os arquivos de webhook guardados no S3 para o produto (chave do PRODUCT_MAPPING)
+    com data de modificacao no intervalo [start, end].
+    As chaves seguem o formato webhooks/<nome do produto>/<webhookId>_<filename>.
+    A listagem e do S3 do perfil de adaptadores ativo (bucket S3_WEBHOOK_BUCKET no perfil live).
+    """
+    objects = [obj for obj in adapters.list_webhook_objects(product_key) if start <= obj.last_modified <= end]
+    return sorted(objects, key=lambda obj: obj.last_modified)
+
+
+def build_payload(obj: WebhookObject, data_produto_format: str = "%d/%m/%Y") -> WebhookSintegreSchema:
+    """
+    Monta um payload sintetico equivalente ao enviado pelo ONS a partir da chave do objeto no S3.
+    """
+    nome, object_name = obj.key[len(WEBHOOK_PREFIX):].split("/", 1)
+    webhook_id, _, filename = object_name.partition("_")
+    periodicidade = obj.last_modified.replace(hour=0, minute=0, second=0, microsecond=0)
+    return WebhookSintegreSchema(
+        dataProduto=periodicidade.strftime(data_produto_format),
+        filename=filename,
+        macroProcesso="backfill",
+        nome=nome,
+        periodicidade=periodicidade,
+        periodicidadeFinal=periodicidade.replace(hour=23, minute=59, second=59),
+        processo="backfill",
+        s3Key=obj.key,
+        url="",
+        webhookId=webhook_id,
+    )
+
+
+@contextmanager
+def suppress_side_effects() -> Iterator[None]:
+    """
+    Mantem o S3 e a API do perfil de adaptadores ativo e troca o Airflow e a mensageria pelos sinks do perfil
+    offline, que apenas registram as chamadas. A troca vale para todas as threads enquanto o contexto durar.
+    """
+    from .adapters.offline import CallRecorder, NullAirflow, NullMessaging
+
+    recorder = CallRecorder()
+    profile = replace(
+        adapters.get_profile(), airflow=NullAirflow(recorder), messaging=NullMessaging(recorder), recorder=recorder
+    )
+    with adapters.use_profile(profile):
+        yield
+    logger.info(f"[backfill] {len(recorder.calls)} trigger(s) de dag e mensagem(ns) suprimidos")
+
+
+def run_backfill(
+    payloads: List[WebhookSintegreSchema],
+    handler: Callable[[WebhookSintegreSchema], Any],
+    workers: int = 1,
+) -> Dict[str, int]:
+    """
+    Processa os payloads em paralelo, registrando o progresso a cada payload concluido.
+    """
+    total = len(payloads)
+    summary = {"total": total, "succeeded": 0, "failed": 0}
+    lock = threading.Lock()
+    started_at = time.perf_counter()
+
+    def process(payload: WebhookSintegreSchema):
+        payload_started_at = time.perf_counter()
+        handler(payload)
+        return time.perf_counter() - payload_started_at
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="backfill") as executor:
+        futures = {executor.submit(process, payload): payload for payload in payloads}
+        for future in as_completed(futures):
+            payload = futures[future]
+            with lock:
+                try:
+                    duration = future.result()
+                    summary["succeeded"] += 1
+                    status = f"ok em {duration:.1f}s"
+                except Exception as e:
+                    summary["failed"] += 1
+                    status = f"falhou: {e}"
+                done = summary["succeeded"] + summary["failed"]
+                logger.info(f"[backfill {done}/{total}] {payload.filename} ({payload.webhookId}) {status}")
+
+    logger.info(
+        f"Backfill finalizado em {time.perf_counter() - started_at:.1f}s: "
+        f"{summary['succeeded']} ok, {summary['failed']} com falha de {total}"
+    )
+    return summary
@@ -1,40 +1,28 @@
-from .tasks import (
-   RelatorioAcompanhamentoHidrologico,
-   RelatorioLimitesIntercambioDecomp,
-   CargaPatamarDecomp,
-   DecksNewave,
-   DeckDecomp,
-   CargaPatamarNewave,
-   PreciptacaoPrevista,
-   VazoesSemanaisPrevistasPMO,
-   VazoesDiariasPrevistasPDP,
-   NotasTecnicasMedioPrazo,
-   Ipdo,
-   Weol,
-   ArquivosModelosPDP
-)
-from typing import Dict, Type
+from typing import Dict, List, Mapping, Optional, Type
+from .freshness import FreshnessSlo
+from .registry import LazyProductRegistry
+from .scheduler import Lane
 from .webhook_products_interface import WebhookProductsInterface
-PRODUCT_MAPPING: Dict[str, Type[WebhookProductsInterface]]  = {
-   "relatorio_de_acompanhamento_hidrologico": RelatorioAcompanhamentoHidrologico,
-   "modelo_gefs":PreciptacaoPrevista,
-   "modelo_ecmwf":PreciptacaoPrevista,
-   "modelo_eta":PreciptacaoPrevista,
-   "resultados_preliminares_nao_consistidos_vazoes_semanais_pmo": VazoesSemanaisPrevistasPMO,
-   "resultados_preliminares_consistidos_vazoes_semanais_pmo": VazoesSemanaisPrevistasPMO,
-   "resultados_finais_consistidos_vazoes_diarias_pdp": VazoesDiariasPrevistasPDP,
-   "deck_e_resultados_decomp_valor_esperado": DeckDecomp,
-   "arquivos_dos_modelos_de_previsao_de_vazoes_diarias_pdp": ArquivosModelosPDP,
-   "carga_por_patamar_decomp": CargaPatamarDecomp,
-   "deck_preliminar_decomp_valor_esperado": DeckDecomp,
-   "previsoes_de_carga_mensal_e_por_patamar_newave": CargaPatamarNewave,
-   "ipdo_informativo_preliminar_diario_da_operacao": Ipdo,
-   "deck_newave_preliminar": DecksNewave,
-   "deck_newave_definitivo": DecksNewave,
-   "decks_da_previsao_de_geracao_eolica_semanal_weolsm": Weol,
-   "preliminar_relatorio_mensal_de_limites_de_intercambio": RelatorioLimitesIntercambioDecomp,
-   "relatorio_mensal_de_limites_de_intercambio_para_o_modelo_decomp": RelatorioLimitesIntercambioDecomp,
-   "notas_tecnicas_medio_prazo": NotasTecnicasMedioPrazo,
+PRODUCT_MAPPING: Mapping[str, Optional[Type[WebhookProductsInterface]]] = LazyProductRegistry({
+   "relatorio_de_acompanhamento_hidrologico": "app.tasks.relatorio_acompanhamento_hidrologico:RelatorioAcompanhamentoHidrologico",
+   "modelo_gefs": "app.tasks.precipitacao_prevista:PreciptacaoPrevista",
+   "modelo_ecmwf": "app.tasks.precipitacao_prevista:PreciptacaoPrevista",
+   "modelo_eta": "app.tasks.precipitacao_prevista:PreciptacaoPrevista",
+   "resultados_preliminares_nao_consistidos_vazoes_semanais_pmo": "app.tasks.vazoes_semanais_previstas:VazoesSemanaisPrevistasPMO",
+   "resultados_preliminares_consistidos_vazoes_semanais_pmo": "app.tasks.vazoes_semanais_previstas:VazoesSemanaisPrevistasPMO",
+   "resultados_finais_consistidos_vazoes_diarias_pdp": "app.tasks.vazoes_diarias_previstas:VazoesDiariasPrevistasPDP",
+   "deck_e_resultados_decomp_valor_esperado": "app.tasks.deck_decomp:DeckDecomp",
+   "arquivos_dos_modelos_de_previsao_de_vazoes_diarias_pdp": "app.tasks.arquivos_modelo_pdp:ArquivosModelosPDP",
+   "carga_por_patamar_decomp": "app.tasks.carga_patamar_decomp:CargaPatamarDecomp",
+   "deck_preliminar_decomp_valor_esperado": "app.tasks.deck_decomp:DeckDecomp",
+   "previsoes_de_carga_mensal_e_por_patamar_newave": "app.tasks.previsoes_carga_mensal_patamar_newave:CargaPatamarNewave",
+   "ipdo_informativo_preliminar_diario_da_operacao": "app.tasks.ipdo:Ipdo",
+   "deck_newave_preliminar": "app.tasks.decks_newave:DecksNewave",
+   "deck_newave_definitivo": "app.tasks.decks_newave:DecksNewave",
+   "decks_da_previsao_de_geracao_eolica_semanal_weolsm": "app.tasks.weol:Weol",
+   "preliminar_relatorio_mensal_de_limites_de_intercambio": "app.tasks.relatorio_limites_intercambio_modelo_decomp:RelatorioLimitesIntercambioDecomp",
+   "relatorio_mensal_de_limites_de_intercambio_para_o_modelo_decomp": "app.tasks.relatorio_limites_intercambio_modelo_decomp:RelatorioLimitesIntercambioDecomp",
+   "notas_tecnicas_medio_prazo": "app.tasks.notas_tecnicas_medio_prazo:NotasTecnicasMedioPrazo",
    "acomph": None,
    "rdh": None,
    "historico_de_precipitacao_por_satelite_pmo": None,
@@ -44,5 +32,45 @@ PRODUCT_MAPPING: Dict[str, Type[WebhookProductsInterface]]  = {
    "dados_utilizados_na_previsao_de_geracao_eolica": None,
    "arquivos_de_previsao_de_carga_para_o_dessem_prevcargadessem": None,
    
+})
+
+# Faixas de execucao do modo fila (app.scheduler). Produtos leves e sensiveis a latencia
+# (a chuva prevista alimenta a dag pconjunto) nunca esperam atras de uma rajada de decks.
+# Mantenha a soma de max_concurrency das faixas de menor prioridade abaixo de WEBHOOK_WORKERS.
+LANES: List[Lane] = [
+   Lane(name="rapida", max_concurrency=4, priority=0, queue_limit=200),
+   Lane(name="padrao", max_concurrency=2, priority=1, queue_limit=100),
+   Lane(name="pesada", max_concurrency=1, priority=2, queue_limit=50),
+]
+DEFAULT_LANE = "padrao"
+PRODUCT_LANES: Dict[str, str] = {
+   "modelo_gefs": "rapida",
+   "modelo_ecmwf": "rapida",
+   "modelo_eta": "rapida",
+   "ipdo_informativo_preliminar_diario_da_operacao": "rapida",
+   "resultados_finais_consistidos_vazoes_diarias_pdp": "rapida",
+   "relatorio_de_acompanhamento_hidrologico": "rapida",
+   "arquivos_dos_modelos_de_previsao_de_vazoes_diarias_pdp": "rapida",
+   "deck_newave_preliminar": "pesada",
+   "deck_newave_definitivo": "pesada",
+   "deck_e_resultados_decomp_valor_esperado": "pesada",
+   "deck_preliminar_decomp_valor_esperado": "pesada",
+   "previsoes_de_carga_mensal_e_por_patamar_newave": "pesada",
 }
 
+# SLOs de frescor (app.freshness), em segundos desde a chegada do webhook: dados na API (ingest) e
+# WhatsApp/e-mail enviado (notify). Produtos sem entrada usam DEFAULT_FRESHNESS_SLO.
+DEFAULT_FRESHNESS_SLO = FreshnessSlo(ingest=30 * 60, notify=60 * 60)
+FRESHNESS_SLOS: Dict[str, FreshnessSlo] = {
+   "modelo_gefs": FreshnessSlo(ingest=5 * 60, notify=None),
+   "modelo_ecmwf": FreshnessSlo(ingest=5 * 60, notify=None),
+   "modelo_eta": FreshnessSlo(ingest=5 * 60, notify=None),
+   "ipdo_informativo_preliminar_diario_da_operacao": FreshnessSlo(ingest=10 * 60, notify=15 * 60),
+   "resultados_finais_consistidos_vazoes_diarias_pdp": FreshnessSlo(ingest=10 * 60, notify=15 * 60),
+   "relatorio_de_acompanhamento_hidrologico": FreshnessSlo(ingest=10 * 60, notify=15 * 60),
+   "decks_da_previsao_de_geracao_eolica_semanal_weolsm": FreshnessSlo(ingest=10 * 60, notify=20 * 60),
+   "deck_newave_preliminar": FreshnessSlo(ingest=60 * 60, notify=90 * 60),
+   "deck_newave_definitivo": FreshnessSlo(ingest=60 * 60, notify=90 * 60),
+   "deck_e_resultados_decomp_valor_esperado": FreshnessSlo(ingest=60 * 60, notify=90 * 60),
+   "deck_preliminar_decomp_valor_esperado": FreshnessSlo(ingest=60 * 60, notify=90 * 60),
+}
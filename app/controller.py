@@ -1,22 +1,108 @@
-from middle.utils import setup_logger
-from .constants import PRODUCT_MAPPING
+import time
+from typing import Optional
+from .logs import get_logger
 from .schema import WebhookSintegreSchema
-from fastapi import APIRouter, HTTPException
-from middle.utils import sanitize_string
-from .webhook_products_interface import WebhookProductsInterface
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.concurrency import run_in_threadpool
+from .idempotency import run_payload_once, run_payload_once_async
+from .freshness import summarize
+from .jobs import get_job_manager
+from .ledger import get_ledger
+from .metrics import REGISTRY
+from .profiling import get_continuous_profiler, start_continuous_profiler
+from .scheduler import LaneFullError
+from .runner import ProductNotMappedError, is_async_product, resolve_product
+from .settings import settings
 
-logger = setup_logger()
+logger = get_logger(__name__)
 
-router = APIRouter()
+# O profiler continuo sobe com a aplicacao que inclui o router, e nao ao importar o modulo
+router = APIRouter(on_startup=[start_continuous_profiler])
 
 @router.post("/webhook")
-def webhook_handler(payload: WebhookSintegreSchema):
-    payload.nome = sanitize_string(payload.nome, space_char="_")
-    logger.info(f"Nome do produto sanitizado: {payload.nome}")
-    product_handler: WebhookProductsInterface | None = PRODUCT_MAPPING[payload.nome]
-    if not product_handler:
-        logger.error(f"Produto {payload.nome} nao encontrado no mapeamento")
+async def webhook_handler(payload: WebhookSintegreSchema):
+    # resolve_product pode importar o modulo do produto (segundos para os de pandas/pdf) e o submit grava
+    # no SQLite: os dois rodam no threadpool para nao travar o event loop
+    try:
+        product_class = await run_in_threadpool(resolve_product, payload)
+    except ProductNotMappedError:
         raise HTTPException(status_code=404, detail="Produto nao mapeado")
-    product_handler = PRODUCT_MAPPING[payload.nome](payload)
-    result = product_handler.run_workflow()
-    return result
\ No newline at end of file
+    logger.info(f"Nome do produto sanitizado: {payload.nome}")
+    if settings.WEBHOOK_ASYNC_MODE:
+        try:
+            job = await run_in_threadpool(lambda: get_job_manager().submit(payload))
+        except LaneFullError as e:
+            logger.warning(str(e))
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "60"})
+        # Reentrega de um webhook ja concluido volta com o resultado em cache
+        status_code = 200 if job.done else 202
+        return JSONResponse(status_code=status_code, content=jsonable_encoder(job.to_dict()))
+    if is_async_product(product_class):
+        return await run_payload_once_async(payload)
+    # Produtos sincronos bloqueiam: rodam no threadpool para nao travar o event loop
+    return await run_in_threadpool(run_payload_once, payload)
+
+
+@router.get("/webhook/jobs/{job_id}")
+def webhook_job_status(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job nao encontrado")
+    return jsonable_encoder(job.to_dict())
+
+
+@router.get("/metrics")
+def metrics_endpoint():
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+@router.get("/webhook/lanes")
+def webhook_lanes():
+    return get_job_manager().lanes()
+
+
+def _continuous_profiler():
+    profiler = get_continuous_profiler()
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiler continuo desligado (PROFILER_ENABLED)")
+    return profiler
+
+
+@router.get("/profiler/stacks", response_class=PlainTextResponse)
+def profiler_stacks(produto: Optional[str] = None, reset: bool = False):
+    """
+    Pilhas agregadas no formato collapsed (flamegraph.pl, speedscope); `reset` zera a janela apos a leitura.
+    """
+    return "\n".join(_continuous_profiler().collapsed(produto, reset)) + "\n"
+
+
+@router.get("/profiler/top")
+def profiler_top(produto: Optional[str] = None, top: int = Query(20, ge=1, le=500)):
+    return _continuous_profiler().top(produto, top)
+
+
+def _ledger_since(days: float) -> float:
+    return time.time() - days * 86400
+
+
+@router.get("/ledger/slowest")
+def ledger_slowest(days: float = 7, limit: int = Query(20, ge=1, le=1000), produto: Optional[str] = None):
+    return get_ledger().slowest(_ledger_since(days), limit, produto)
+
+
+@router.get("/ledger/p95")
+def ledger_p95(days: float = 7, produto: Optional[str] = None):
+    return get_ledger().duration_percentiles(_ledger_since(days), produto)
+
+
+@router.get("/ledger/runs-per-hour")
+def ledger_runs_per_hour(days: float = 1, produto: Optional[str] = None):
+    return get_ledger().runs_per_hour(_ledger_since(days), produto)
+
+
+@router.get("/ledger/freshness")
+def ledger_freshness(days: float = 7, produto: Optional[str] = None):
+    return summarize(get_ledger().freshness_rows(produto, since=_ledger_since(days)))
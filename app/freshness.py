@@ -0,0 +1,116 @@
+"""
+Frescor dos dados por produto: quanto tempo leva da publicacao do ONS ate os dados estarem na API (ingest)
+e a imagem/mensagem enviada (notify).
+
+Cada execucao registrada no ledger gera quatro latencias:
+- arrival_to_ingest / arrival_to_notify: a partir da chegada do webhook, que o ONS dispara ao publicar;
+- publish_to_ingest / publish_to_notify: a partir da `periodicidade` do payload (data de referencia do produto).
+
+Os SLOs por produto (FRESHNESS_SLOS em app.constants) valem para as latencias a partir da chegada; apos cada
+execucao o p95 das ultimas FRESHNESS_WINDOW execucoes do produto e comparado ao SLO e gera aviso no log
+quando o ultrapassa.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from .logs import get_logger
+from .settings import settings
+
+logger = get_logger(__name__)
+
+LATENCIES = ("arrival_to_ingest", "arrival_to_notify", "publish_to_ingest", "publish_to_notify")
+# Latencia sujeita ao SLO de cada campo do FreshnessSlo
+SLO_LATENCIES = {"ingest": "arrival_to_ingest", "notify": "arrival_to_notify"}
+
+
+@dataclass(frozen=True)
+class FreshnessSlo:
+    """
+    Limites, em segundos a partir da chegada do webhook, para os dados estarem na API (ingest) e para a
+    notificacao ser enviada (notify). None desliga o limite.
+    """
+    ingest: Optional[float] = None
+    notify: Optional[float] = None
+
+
+def slo_for(product_key: str) -> FreshnessSlo:
+    from .constants import DEFAULT_FRESHNESS_SLO, FRESHNESS_SLOS
+
+    return FRESHNESS_SLOS.get(product_key, DEFAULT_FRESHNESS_SLO)
+
+
+def latencies(row: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Latencias de uma execucao a partir dos instantes gravados no ledger (received_at, reference_at,
+    ingested_at, notified_at); as que nao se aplicam ao produto ficam de fora.
+    """
+    result = {}
+    for origin, start in (("arrival", row.get("received_at")), ("publish", row.get("reference_at"))):
+        for target, end in (("ingest", row.get("ingested_at")), ("notify", row.get("notified_at"))):
+            if start is not None and end is not None:
+                result[f"{origin}_to_{target}"] = end - start
+    return result
+
+
+def summarize(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Por produto: execucoes, p50/p95 de cada latencia, SLOs e quantas execucoes ficaram acima deles.
+    """
+    from .ledger import percentile
+
+    by_product: Dict[str, List[Dict[str, float]]] = {}
+    for row in rows:
+        by_product.setdefault(row["produto"], []).append(latencies(row))
+    summary = []
+    for product_key, runs in sorted(by_product.items()):
+        slo = slo_for(product_key)
+        item: Dict[str, Any] = {"produto": product_key, "runs": len(runs)}
+        for name in LATENCIES:
+            values = [run[name] for run in runs if name in run]
+            item[name] = {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+        for field_name, latency in SLO_LATENCIES.items():
+            limit = getattr(slo, field_name)
+            item[f"slo_{field_name}"] = limit
+            item[f"breaches_{field_name}"] = (
+                sum(1 for run in runs if run.get(latency, 0) > limit) if limit is not None else None
+            )
+        summary.append(item)
+    return summary
+
+
+def evaluate_run(ledger: Any, row: Dict[str, Any]):
+    """
+    Registra as latencias da execucao nas metricas e avisa quando a execucao ou o p95 rolante do produto
+    passam do SLO.
+    """
+    from . import metrics
+    from .ledger import percentile
+
+    product_key = row["produto"]
+    run_latencies = latencies(row)
+    for name, seconds in run_latencies.items():
+        metrics.observe_freshness(product_key, name, seconds)
+
+    slo = slo_for(product_key)
+    window = None
+    for field_name, latency in SLO_LATENCIES.items():
+        limit = getattr(slo, field_name)
+        if limit is None or latency not in run_latencies:
+            continue
+        metrics.set_freshness_slo(product_key, latency, limit)
+        if run_latencies[latency] > limit:
+            metrics.observe_freshness_breach(product_key, latency)
+            logger.warning(
+                f"{product_key}: {latency} de {run_latencies[latency]:.1f}s acima do SLO de {limit:.0f}s "
+                f"(webhook {row.get('webhook_id')})"
+            )
+        if window is None:
+            window = [latencies(r) for r in ledger.freshness_rows(product_key, settings.FRESHNESS_WINDOW)]
+        p95 = percentile([r[latency] for r in window if latency in r], 95)
+        if p95 is None:
+            continue
+        metrics.set_freshness_p95(product_key, latency, p95)
+        if p95 > limit:
+            logger.warning(
+                f"{product_key}: p95 de {latency} nas ultimas {len(window)} execucoes ({p95:.1f}s) "
+                f"acima do SLO de {limit:.0f}s"
+            )
@@ -0,0 +1,380 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from middle.utils import sanitize_string
+from .logs import get_logger
+from .resources import pid_alive
+from .runner import run_payload, run_payload_async
+from .schema import WebhookSintegreSchema
+from .settings import settings
+
+logger = get_logger(__name__)
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Devolvido pela espera de uma execucao de outro processo quando o dono morreu: a entrega tenta reservar de novo
+_ABANDONED = object()
+
+
+def process_owner() -> str:
+    """
+    Identifica o processo dono de uma reserva: <host>:<pid>.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def idempotency_key(payload: WebhookSintegreSchema) -> Tuple[str, str]:
+    return payload.webhookId, payload.s3Key
+
+
+@dataclass
+class IdempotencyRecord:
+    webhook_id: str
+    s3_key: str
+    status: str
+    result: Any
+    error: Optional[str]
+    started_at: float
+    finished_at: Optional[float]
+    owner: Optional[str] = None
+    heartbeat_at: Optional[float] = None
+
+
+class IdempotencyStore:
+    """
+    Registro local (SQLite) das entregas do webhook ja processadas, chaveado em webhookId + s3Key.
+    Pode ser compartilhado entre processos (API e workers) apontando para o mesmo arquivo.
+    Cada reserva guarda o processo dono e um heartbeat; uma reserva cujo dono morreu (pid inexistente no
+    mesmo host ou heartbeat sem atualizacao ha mais de `heartbeat_timeout`) pode ser retomada.
+    """
+
+    def __init__(self, path: str, running_ttl: float, heartbeat_timeout: float = 120):
+        self.path = path
+        self.running_ttl = running_ttl
+        self.heartbeat_timeout = heartbeat_timeout
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS webhook_runs (
+                    webhook_id TEXT NOT NULL,
+                    s3_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    started_at REAL NOT NULL,
+                    finished_at REAL,
+                    owner TEXT,
+                    heartbeat_at REAL,
+                    PRIMARY KEY (webhook_id, s3_key)
+                )
+                """
+            )
+            # Bancos criados antes do dono/heartbeat das reservas
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(webhook_runs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE webhook_runs ADD COLUMN {column} {kind}")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def claim(self, key: Tuple[str, str]) -> Tuple[bool, Optional[IdempotencyRecord]]:
+        """
+        Tenta reservar a execucao da chave. Retorna (True, None) quando a execucao foi reservada
+        ou (False, registro) quando a chave ja foi concluida ou esta em execucao em outro lugar.
+        Execucoes que falharam, que estao "em execucao" ha mais de `running_ttl` ou cujo dono morreu sao
+        reservadas de novo.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                record = self._get(conn, key)
+                reclaim = record is not None and (record.status == STATUS_FAILED or self.abandoned(record, now))
+                if record is not None and reclaim and record.status == STATUS_RUNNING:
+                    logger.warning(f"Retomando o webhook {key[0]}: reserva de {record.owner} abandonada")
+                if record is None or reclaim:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO webhook_runs (webhook_id, s3_key, status, started_at, owner, heartbeat_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (*key, STATUS_RUNNING, now, process_owner(), now),
+                    )
+                    conn.execute("COMMIT")
+                    return True, None
+                conn.execute("COMMIT")
+                return False, record
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def abandoned(self, record: IdempotencyRecord, now: Optional[float] = None) -> bool:
+        """
+        True para uma reserva "em execucao" que nao vai terminar: passou do `running_ttl`, o heartbeat parou
+        ou o processo dono (neste host) nao existe mais.
+        """
+        if record.status != STATUS_RUNNING:
+            return False
+        now = now or time.time()
+        if now - record.started_at > self.running_ttl:
+            return True
+        if record.heartbeat_at is not None and now - record.heartbeat_at > self.heartbeat_timeout:
+            return True
+        if record.owner:
+            host, _, pid = record.owner.rpartition(":")
+            if host == socket.gethostname() and pid.isdigit() and not pid_alive(int(pid)):
+                return True
+        return False
+
+    def heartbeat(self, keys: Iterable[Tuple[str, str]]):
+        """
+        Renova o heartbeat das reservas deste processo ainda em execucao.
+        """
+        now, owner = time.time(), process_owner()
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE webhook_runs SET heartbeat_at = ? WHERE webhook_id = ? AND s3_key = ? AND owner = ? AND status = ?",
+                [(now, *key, owner, STATUS_RUNNING) for key in keys],
+            )
+
+    def complete(self, key: Tuple[str, str], result: Any):
+        self._finish(key, STATUS_DONE, json.dumps(result, default=str), None)
+
+    def fail(self, key: Tuple[str, str], error: str):
+        self._finish(key, STATUS_FAILED, None, error)
+
+    def get(self, key: Tuple[str, str]) -> Optional[IdempotencyRecord]:
+        with self._connect() as conn:
+            return self._get(conn, key)
+
+    def _finish(self, key: Tuple[str, str], status: str, result: Optional[str], error: Optional[str]):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE webhook_runs SET status = ?, result = ?, error = ?, finished_at = ? WHERE webhook_id = ? AND s3_key = ?",
+                (status, result, error, time.time(), *key),
+            )
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, key: Tuple[str, str]) -> Optional[IdempotencyRecord]:
+        row = conn.execute(
+            "SELECT webhook_id, s3_key, status, result, error, started_at, finished_at, owner, heartbeat_at "
+            "FROM webhook_runs WHERE webhook_id = ? AND s3_key = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        webhook_id, s3_key, status, result, error, started_at, finished_at, owner, heartbeat_at = row
+        return IdempotencyRecord(
+            webhook_id, s3_key, status, json.loads(result) if result is not None else None, error, started_at, finished_at,
+            owner, heartbeat_at,
+        )
+
+
+class IdempotentRunner:
+    """
+    Executa payloads no maximo uma vez por webhookId + s3Key.
+    - entrega ja concluida: devolve o resultado guardado sem rodar o workflow;
+    - entrega em execucao neste processo: aguarda e devolve o resultado da execucao em andamento;
+    - entrega em execucao em outro processo: aguarda o registro no store ser finalizado, ou retoma a
+      execucao se o processo dono morrer.
+    Enquanto houver execucoes proprias, uma thread renova o heartbeat das reservas a cada `heartbeat_interval`.
+    """
+
+    def __init__(
+        self,
+        store: IdempotencyStore,
+        runner: Callable[[WebhookSintegreSchema], Any] = run_payload,
+        poll_interval: float = 2.0,
+        wait_timeout: float = 3600,
+        heartbeat_interval: float = 30,
+    ):
+        self.store = store
+        self.runner = runner
+        self.poll_interval = poll_interval
+        self.wait_timeout = wait_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def __call__(self, payload: WebhookSintegreSchema) -> Any:
+        key = idempotency_key(payload)
+        while True:
+            action, value = self._enter(payload)
+            if action == "cached":
+                return value
+            if action == "attach":
+                return value.result()
+            if action != "external":
+                break
+            result = self._wait_external(key)
+            if result is not _ABANDONED:
+                return result
+
+        try:
+            result = self.runner(payload)
+        except BaseException as e:
+            # Inclui KeyboardInterrupt/SystemExit, para o webhook nao ficar preso como "running"
+            self._exit(key, value, error=e)
+            raise
+        self._exit(key, value, result=result)
+        return result
+
+    async def call_async(
+        self, payload: WebhookSintegreSchema, runner: Callable[[WebhookSintegreSchema], Awaitable[Any]]
+    ) -> Any:
+        """
+        Mesma deduplicacao do __call__ para um runner awaitable; o acesso ao SQLite e as esperas rodam em threads.
+        """
+        key = idempotency_key(payload)
+        while True:
+            action, value = await asyncio.to_thread(self._enter, payload)
+            if action == "cached":
+                return value
+            if action == "attach":
+                return await asyncio.wrap_future(value)
+            if action != "external":
+                break
+            result = await asyncio.to_thread(self._wait_external, key)
+            if result is not _ABANDONED:
+                return result
+
+        try:
+            result = await runner(payload)
+        except BaseException as e:
+            # Inclui o cancelamento da requisicao, para o webhook nao ficar preso como "running"
+            await asyncio.to_thread(self._exit, key, value, error=e)
+            raise
+        await asyncio.to_thread(self._exit, key, value, result=result)
+        return result
+
+    def _enter(self, payload: WebhookSintegreSchema) -> Tuple[str, Any]:
+        """
+        Decide o que fazer com a entrega: ("cached", resultado), ("external", None),
+        ("attach", future da execucao em andamento) ou ("owner", future a ser resolvido por quem executa).
+        """
+        # Sanitiza antes de decidir: entregas servidas do cache ou anexadas devolvem o mesmo payload que o runner
+        payload.nome = sanitize_string(payload.nome, space_char="_")
+        key = idempotency_key(payload)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                logger.info(f"Webhook {payload.webhookId} ja esta em execucao, anexando a execucao em andamento")
+                return "attach", future
+            claimed, record = self.store.claim(key)
+            if claimed:
+                future = self._inflight[key] = Future()
+                self._start_heartbeat()
+                return "owner", future
+            if record.status == STATUS_DONE:
+                logger.info(f"Webhook {payload.webhookId} ja processado, retornando resultado em cache")
+                return "cached", record.result
+        logger.info(f"Webhook {payload.webhookId} em execucao em outro processo, aguardando conclusao")
+        return "external", None
+
+    def _exit(self, key: Tuple[str, str], future: Future, result: Any = None, error: Optional[BaseException] = None):
+        try:
+            if error is not None:
+                self.store.fail(key, f"{type(error).__name__}: {error}")
+            else:
+                self.store.complete(key, result)
+        except Exception as e:
+            # A reserva fica "em execucao" ate ser considerada abandonada; quem espera neste processo nao pode travar
+            logger.error(f"Falha ao registrar o fim da execucao do webhook {key[0]}: {e}", exc_info=True)
+        finally:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _start_heartbeat(self):
+        # Chamado com self._lock; a thread nao sobrevive a um fork, entao e recriada quando nao esta viva
+        if self._heartbeat is None or not self._heartbeat.is_alive():
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="idempotency-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self._lock:
+                keys = list(self._inflight)
+            if not keys:
+                continue
+            try:
+                self.store.heartbeat(keys)
+            except Exception as e:
+                logger.warning(f"Falha ao renovar o heartbeat das execucoes em andamento: {e}")
+
+    def _wait_external(self, key: Tuple[str, str]) -> Any:
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            record = self.store.get(key)
+            if record is None or record.status == STATUS_FAILED:
+                raise RuntimeError(f"Execucao concorrente do webhook {key[0]} falhou: {record.error if record else 'registro removido'}")
+            if record.status == STATUS_DONE:
+                return record.result
+            if self.store.abandoned(record):
+                logger.warning(f"Dono da execucao do webhook {key[0]} ({record.owner}) nao esta mais ativo, retomando")
+                return _ABANDONED
+        raise TimeoutError(f"Tempo esgotado aguardando a execucao concorrente do webhook {key[0]}")
+
+
+_store: Optional[IdempotencyStore] = None
+_runner: Optional[IdempotentRunner] = None
+_singleton_lock = threading.Lock()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _store
+    with _singleton_lock:
+        if _store is None:
+            _store = IdempotencyStore(
+                settings.IDEMPOTENCY_DB,
+                running_ttl=settings.IDEMPOTENCY_RUNNING_TTL,
+                heartbeat_timeout=settings.IDEMPOTENCY_HEARTBEAT_TIMEOUT,
+            )
+        return _store
+
+
+def get_idempotent_runner() -> IdempotentRunner:
+    global _runner
+    store = get_idempotency_store()
+    with _singleton_lock:
+        if _runner is None:
+            _runner = IdempotentRunner(
+                store,
+                wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+                heartbeat_interval=settings.IDEMPOTENCY_HEARTBEAT_INTERVAL,
+            )
+        return _runner
+
+
+def run_payload_once(payload: WebhookSintegreSchema) -> Any:
+    """
+    Executa o payload passando pela deduplicacao quando IDEMPOTENCY_ENABLED esta ativo.
+    """
+    if settings.IDEMPOTENCY_ENABLED:
+        return get_idempotent_runner()(payload)
+    return run_payload(payload)
+
+
+async def run_payload_once_async(payload: WebhookSintegreSchema) -> Any:
+    """
+    Versao awaitable do run_payload_once, para produtos derivados de AsyncWebhookProductsInterface.
+    """
+    if settings.IDEMPOTENCY_ENABLED:
+        return await get_idempotent_runner().call_async(payload, run_payload_async)
+    return await run_payload_async(payload)
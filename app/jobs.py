@@ -0,0 +1,198 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+from .logs import get_logger
+from .idempotency import STATUS_DONE, IdempotencyStore, get_idempotency_store, get_idempotent_runner, idempotency_key
+from .constants import DEFAULT_LANE, LANES, PRODUCT_LANES
+from .ledger import arrival
+from .metrics import register_lane_stats
+from .pipeline import STAGE_STARTED, StageMetrics, add_stage_listener
+from .runner import run_payload
+from .scheduler import LaneScheduler
+from .schema import WebhookSintegreSchema
+from .settings import settings
+
+logger = get_logger(__name__)
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+@dataclass
+class Job:
+    """
+    Execucao de um payload do webhook em segundo plano.
+    """
+    id: str
+    produto: str
+    webhook_id: str
+    lane: Optional[str] = None
+    status: str = STATUS_QUEUED
+    stage: str = STATUS_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (STATUS_SUCCEEDED, STATUS_FAILED)
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "produto": self.produto,
+            "webhook_id": self.webhook_id,
+            "lane": self.lane,
+            "status": self.status,
+            "stage": self.stage,
+            "created_at": _isoformat(self.created_at),
+            "started_at": _isoformat(self.started_at),
+            "finished_at": _isoformat(self.finished_at),
+            "duration": self.duration,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+_current_job: ContextVar[Optional[Job]] = ContextVar("current_job", default=None)
+
+
+def _track_job_stage(product: Any, event: str, metrics: StageMetrics):
+    # Reflete no job a etapa do pipeline (app.pipeline) em execucao
+    job = _current_job.get()
+    if job is not None and event == STAGE_STARTED:
+        job.stage = metrics.name
+
+
+add_stage_listener(_track_job_stage)
+
+
+class JobManager:
+    """
+    Fila de jobs do webhook executada pelo agendador de faixas (app.scheduler).
+    Mantem em memoria os ultimos `retention` jobs para consulta de status.
+    """
+
+    def __init__(
+        self,
+        scheduler: LaneScheduler,
+        retention: int,
+        runner: Callable[[WebhookSintegreSchema], Any] = run_payload,
+        store: Optional[IdempotencyStore] = None,
+    ):
+        self._scheduler = scheduler
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], Job] = {}
+        self._lock = threading.Lock()
+        self._retention = retention
+        self._runner = runner
+        self._store = store
+
+    def submit(self, payload: WebhookSintegreSchema) -> Job:
+        key = idempotency_key(payload)
+        with self._lock:
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                logger.info(f"Webhook {payload.webhookId} ja enfileirado, anexando ao job {inflight.id}")
+                return inflight
+            job = Job(
+                id=uuid.uuid4().hex,
+                produto=payload.nome,
+                webhook_id=payload.webhookId,
+                lane=self._scheduler.lane_for(payload.nome).name,
+            )
+            cached = self._store.get(key) if self._store is not None else None
+            if cached is not None and cached.status == STATUS_DONE:
+                logger.info(f"Webhook {payload.webhookId} ja processado, job {job.id} criado com o resultado em cache")
+                job.status = job.stage = STATUS_SUCCEEDED
+                job.started_at, job.finished_at = cached.started_at, cached.finished_at
+                job.result = cached.result
+                self._jobs[job.id] = job
+                self._evict()
+                return job
+            # LaneFullError sobe para o chamador antes de o job ser registrado
+            self._scheduler.submit(payload.nome, self._run, job, payload)
+            self._jobs[job.id] = job
+            self._inflight[key] = job
+            self._evict()
+        logger.info(f"Job {job.id} enfileirado na faixa {job.lane} para o produto {job.produto}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def lanes(self) -> Dict[str, Dict[str, int]]:
+        return self._scheduler.stats()
+
+    def shutdown(self, wait: bool = True):
+        self._scheduler.shutdown(wait=wait)
+
+    def _run(self, job: Job, payload: WebhookSintegreSchema):
+        job.status = job.stage = STATUS_RUNNING
+        job.started_at = time.time()
+        token = _current_job.set(job)
+        try:
+            with arrival(job.created_at):
+                job.result = self._runner(payload)
+            job.status = job.stage = STATUS_SUCCEEDED
+            logger.info(f"Job {job.id} ({job.produto}) finalizado em {job.duration:.2f}s")
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = job.stage = STATUS_FAILED
+            logger.error(f"Job {job.id} ({job.produto}) falhou: {e}", exc_info=True)
+        finally:
+            _current_job.reset(token)
+            job.finished_at = time.time()
+            with self._lock:
+                self._inflight.pop(idempotency_key(payload), None)
+
+    def _evict(self):
+        # Descarta os jobs finalizados mais antigos; jobs pendentes nunca sao descartados
+        excess = len(self._jobs) - self._retention
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            if settings.IDEMPOTENCY_ENABLED:
+                runner, store = get_idempotent_runner(), get_idempotency_store()
+            else:
+                runner, store = run_payload, None
+            scheduler = LaneScheduler(
+                LANES, PRODUCT_LANES, default_lane=DEFAULT_LANE, max_workers=settings.WEBHOOK_WORKERS
+            )
+            _job_manager = JobManager(
+                scheduler=scheduler,
+                retention=settings.WEBHOOK_JOBS_RETENTION,
+                runner=runner,
+                store=store,
+            )
+            register_lane_stats(_job_manager.lanes)
+        return _job_manager
@@ -0,0 +1,397 @@
+"""
+Registro local (SQLite) de cada execucao de produto: metadados do payload, duracao, status e erro,
+hash do arquivo de entrada, linhas enviadas a API, dags disparadas, recursos consumidos e o tempo de
+cada etapa. Base para as consultas de capacidade (main.py ledger ... e GET /ledger/...).
+
+Os adaptadores avisam o ledger das chamadas relevantes (note_input, note_posted, note_dag, note_notified); a
+execucao corrente fica num ContextVar, entao threads de etapas e asyncio.to_thread registram na mesma execucao.
+Os instantes de chegada, ingestao e notificacao alimentam o acompanhamento de frescor (app.freshness).
+"""
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+from .logs import get_logger
+from .pipeline import STAGE_FINISHED, STATUS_OK, StageMetrics, add_stage_listener
+from .schema import WebhookSintegreSchema
+from .settings import settings
+
+logger = get_logger(__name__)
+
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+
+_HASH_CHUNK = 1024 ** 2
+
+
+@dataclass
+class RunRecord:
+    payload: WebhookSintegreSchema
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+    inputs: List[str] = field(default_factory=list)
+    rows_posted: int = 0
+    dags: List[str] = field(default_factory=list)
+    stages: List[StageMetrics] = field(default_factory=list)
+    trace_id: Optional[str] = None
+    # app.resources.ResourceUsage, preenchido pelo runner
+    resources: Any = None
+    # Chegada do webhook (criacao do job no modo fila; inicio da execucao nos demais)
+    received_at: Optional[float] = None
+    # Ultimo POST/PUT aceito pela API e ultima mensagem enviada
+    ingested_at: Optional[float] = None
+    notified_at: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.finished_at is None else self.finished_at - self.started_at
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """
+    sha256 do arquivo ou, para diretorios (zips ja extraidos), dos caminhos relativos e conteudos em ordem.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+    elif os.path.isfile(path):
+        files = [path]
+    else:
+        return None
+    for file in files:
+        if len(files) > 1:
+            digest.update(os.path.relpath(file, path).encode())
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Percentil pelo metodo nearest-rank (q entre 0 e 100).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class RunLedger:
+    """
+    Tabelas `runs` (uma linha por execucao) e `run_stages` (uma linha por etapa executada).
+    Pode ser compartilhado entre processos (API e workers) apontando para o mesmo arquivo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    webhook_id TEXT NOT NULL,
+                    s3_key TEXT,
+                    produto TEXT NOT NULL,
+                    filename TEXT,
+                    data_produto TEXT,
+                    periodicidade TEXT,
+                    started_at REAL NOT NULL,
+                    finished_at REAL NOT NULL,
+                    duration REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    input_sha256 TEXT,
+                    rows_posted INTEGER NOT NULL DEFAULT 0,
+                    dags TEXT,
+                    peak_rss INTEGER,
+                    cpu_user REAL,
+                    cpu_system REAL,
+                    trace_id TEXT,
+                    received_at REAL,
+                    reference_at REAL,
+                    ingested_at REAL,
+                    notified_at REAL
+                )
+                """
+            )
+            self._add_missing_columns(conn, "runs", {
+                "received_at": "REAL", "reference_at": "REAL", "ingested_at": "REAL", "notified_at": "REAL",
+            })
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS run_stages (
+                    run_id INTEGER NOT NULL REFERENCES runs(id),
+                    name TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    wall_time REAL,
+                    cpu_time REAL,
+                    rows INTEGER,
+                    memory_bytes INTEGER,
+                    status TEXT,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS runs_produto ON runs (produto, started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS run_stages_run_id ON run_stages (run_id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]):
+        # Ledgers criados por versoes anteriores ganham as colunas novas
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, kind in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+
+    def insert(self, run: RunRecord, input_sha256: Optional[str] = None) -> int:
+        payload = run.payload
+        resources = run.resources
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                run_id = conn.execute(
+                    """
+                    INSERT INTO runs (
+                        webhook_id, s3_key, produto, filename, data_produto, periodicidade, started_at, finished_at,
+                        duration, status, error, input_sha256, rows_posted, dags, peak_rss, cpu_user, cpu_system, trace_id,
+                        received_at, reference_at, ingested_at, notified_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        payload.webhookId, payload.s3Key, payload.nome, payload.filename, payload.dataProduto,
+                        payload.periodicidade.isoformat(), run.started_at, run.finished_at, run.duration, run.status,
+                        run.error, input_sha256, run.rows_posted, json.dumps(run.dags),
+                        resources.peak_rss if resources else None,
+                        resources.user_cpu if resources else None,
+                        resources.system_cpu if resources else None,
+                        run.trace_id, run.received_at, payload.periodicidade.timestamp(), run.ingested_at, run.notified_at,
+                    ),
+                ).lastrowid
+                conn.executemany(
+                    """
+                    INSERT INTO run_stages (run_id, name, started_at, wall_time, cpu_time, rows, memory_bytes, status, error)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (run_id, m.name, m.started_at, m.wall_time, m.cpu_time, m.rows, m.memory_bytes, m.status, m.error)
+                        for m in run.stages
+                    ],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return run_id
+
+    def slowest(self, since: float, limit: int = 20, produto: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM runs WHERE started_at >= ?" + (" AND produto = ?" if produto else "")
+        params = [since] + ([produto] if produto else [])
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(query + " ORDER BY duration DESC LIMIT ?", (*params, limit))]
+            for row in rows:
+                row["dags"] = json.loads(row["dags"] or "[]")
+                row["stages"] = [
+                    dict(stage) for stage in conn.execute(
+                        "SELECT name, wall_time, cpu_time, rows, memory_bytes, status FROM run_stages WHERE run_id = ? ORDER BY started_at",
+                        (row["id"],),
+                    )
+                ]
+        return rows
+
+    def duration_percentiles(self, since: float, produto: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Por produto: execucoes, falhas e p50/p95/max da duracao das execucoes bem-sucedidas.
+        """
+        query = "SELECT produto, status, duration FROM runs WHERE started_at >= ?" + (" AND produto = ?" if produto else "")
+        durations: Dict[str, List[float]] = defaultdict(list)
+        failures: Dict[str, int] = defaultdict(int)
+        with self._connect() as conn:
+            for row in conn.execute(query, [since] + ([produto] if produto else [])):
+                if row["status"] == STATUS_SUCCEEDED:
+                    durations[row["produto"]].append(row["duration"])
+                else:
+                    failures[row["produto"]] += 1
+        return [
+            {
+                "produto": name,
+                "runs": len(durations[name]) + failures[name],
+                "failed": failures[name],
+                "p50": percentile(durations[name], 50),
+                "p95": percentile(durations[name], 95),
+                "max": max(durations[name], default=None),
+            }
+            for name in sorted(set(durations) | set(failures))
+        ]
+
+    def freshness_rows(
+        self, produto: Optional[str] = None, limit: Optional[int] = None, since: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Instantes de frescor das execucoes bem-sucedidas, mais recentes primeiro.
+        """
+        query = (
+            "SELECT webhook_id, produto, received_at, reference_at, ingested_at, notified_at FROM runs"
+            " WHERE status = ? AND started_at >= ?" + (" AND produto = ?" if produto else "")
+            + " ORDER BY started_at DESC" + (" LIMIT ?" if limit else "")
+        )
+        params = [STATUS_SUCCEEDED, since or 0] + ([produto] if produto else []) + ([limit] if limit else [])
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def runs_per_hour(self, since: float, produto: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = (
+            "SELECT strftime('%Y-%m-%d %H:00', started_at, 'unixepoch', 'localtime') AS hour, produto,"
+            " COUNT(*) AS runs, SUM(status != ?) AS failed, SUM(duration) AS busy_seconds"
+            " FROM runs WHERE started_at >= ?" + (" AND produto = ?" if produto else "")
+            + " GROUP BY hour, produto ORDER BY hour, produto"
+        )
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, [STATUS_SUCCEEDED, since] + ([produto] if produto else []))]
+
+
+_ledger: Optional[RunLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> RunLedger:
+    global _ledger
+    with _ledger_lock:
+        # Reabre se LEDGER_DB mudar em tempo de execucao (ex.: replay do corpus com ledger temporario)
+        if _ledger is None or _ledger.path != settings.LEDGER_DB:
+            _ledger = RunLedger(settings.LEDGER_DB)
+        return _ledger
+
+
+_current_run: ContextVar[Optional[RunRecord]] = ContextVar("current_run", default=None)
+_received_at: ContextVar[Optional[float]] = ContextVar("received_at", default=None)
+
+
+def current_run() -> Optional[RunRecord]:
+    return _current_run.get()
+
+
+@contextmanager
+def arrival(received_at: float) -> Iterator[None]:
+    """
+    Informa a chegada do webhook para as execucoes do bloco, quando ela antecede o inicio (fila de jobs).
+    """
+    token = _received_at.set(received_at)
+    try:
+        yield
+    finally:
+        _received_at.reset(token)
+
+
+@contextmanager
+def record_run(payload: WebhookSintegreSchema) -> Iterator[Optional[RunRecord]]:
+    """
+    Registra a execucao do bloco no ledger ao final, com sucesso ou falha. Erros do ledger so geram aviso.
+    """
+    if not settings.LEDGER_ENABLED:
+        yield None
+        return
+    run = RunRecord(payload)
+    run.received_at = _received_at.get() or run.started_at
+    token = _current_run.set(run)
+    try:
+        yield run
+        run.status = STATUS_SUCCEEDED
+    except BaseException as e:
+        run.status = STATUS_FAILED
+        run.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_run.reset(token)
+        run.finished_at = time.time()
+        _write(run)
+
+
+def _stage_end(run: RunRecord, name: str) -> Optional[float]:
+    for metrics in run.stages:
+        if metrics.name == name and metrics.status == STATUS_OK and metrics.wall_time is not None:
+            return metrics.started_at + metrics.wall_time
+    return None
+
+
+def _write(run: RunRecord):
+    # Produtos que publicam/notificam por outros meios caem no fim das etapas publish/notify
+    run.ingested_at = run.ingested_at or _stage_end(run, "publish")
+    run.notified_at = run.notified_at or _stage_end(run, "notify")
+    try:
+        input_sha256 = None
+        if settings.LEDGER_HASH_INPUTS and run.inputs:
+            input_sha256 = file_sha256(run.inputs[0])
+        ledger = get_ledger()
+        ledger.insert(run, input_sha256)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Falha ao registrar a execucao de {run.payload.nome} no ledger: {e}")
+        return
+    if run.status != STATUS_SUCCEEDED:
+        return
+    from .freshness import evaluate_run
+
+    try:
+        evaluate_run(ledger, {
+            "produto": run.payload.nome,
+            "webhook_id": run.payload.webhookId,
+            "received_at": run.received_at,
+            "reference_at": run.payload.periodicidade.timestamp(),
+            "ingested_at": run.ingested_at,
+            "notified_at": run.notified_at,
+        })
+    except sqlite3.Error as e:
+        logger.warning(f"Falha ao avaliar o frescor de {run.payload.nome}: {e}")
+
+
+def note_input(path: str):
+    run = _current_run.get()
+    if run is not None and path:
+        run.inputs.append(path)
+
+
+def note_posted(json_body: Any):
+    run = _current_run.get()
+    if run is not None:
+        run.ingested_at = time.time()
+        if isinstance(json_body, list):
+            run.rows_posted += len(json_body)
+
+
+def note_dag(dag_id: Optional[str]):
+    run = _current_run.get()
+    if run is not None and dag_id:
+        run.dags.append(dag_id)
+
+
+def note_notified():
+    run = _current_run.get()
+    if run is not None:
+        run.notified_at = time.time()
+
+
+def _record_stage(product: Any, event: str, metrics: StageMetrics):
+    run = _current_run.get()
+    if event == STAGE_FINISHED and run is not None:
+        run.stages.append(metrics)
+
+
+add_stage_listener(_record_stage)
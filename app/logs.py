@@ -0,0 +1,119 @@
+"""
+Logging do processo por fila: cada modulo usa um logger proprio (get_logger(__name__), abaixo de "app")
+que apenas coloca o registro numa fila em memoria (QueueHandler); uma unica thread (QueueListener) formata
+e escreve nos handlers configurados pelo setup_logger do middle. Threads de parse nao esperam I/O de log.
+
+Niveis: LOG_LEVEL vale para todos os loggers do app e LOG_LEVELS sobrescreve por modulo
+(ex.: "app.tasks.deck_decomp=DEBUG,app.tasks.rdh=WARNING"). Em loops, use a formatacao % do logging
+(logger.debug("valor %s", x)) e nao f-strings: com o nivel desligado a mensagem nunca e montada.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+from middle.utils import setup_logger
+from .settings import settings
+
+APP_LOGGER = "app"
+DEFAULT_FORMAT = "%(asctime)s %(levelname)s %(name)s %(message)s"
+
+_handlers: List[logging.Handler] = []
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_configured = False
+_lock = threading.Lock()
+
+
+def parse_levels(spec: Optional[str]) -> Dict[str, int]:
+    """
+    Converte "app.tasks.rdh=DEBUG,middle=WARNING" em {"app.tasks.rdh": 10, "middle": 30}.
+    Entradas invalidas (sem "=", sem nome ou com nivel desconhecido) sao ignoradas com um aviso: um ajuste de
+    log errado nao pode impedir a importacao dos modulos.
+    """
+    levels = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, level = item.partition("=")
+        value = logging.getLevelName(level.strip().upper())
+        if not name.strip() or not isinstance(value, int):
+            logging.getLogger(APP_LOGGER).warning("Entrada invalida em LOG_LEVELS ignorada: %r", item)
+            continue
+        levels[name.strip()] = value
+    return levels
+
+
+def _start_listener():
+    global _listener
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _after_fork_in_child():
+    # A thread do listener nao existe no filho criado por fork: sem uma nova, os registros ficariam na fila
+    if _listener is not None:
+        _start_listener()
+
+
+def stop_logging():
+    """
+    Esvazia a fila e para a thread do listener; chamado no encerramento do processo.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def configure_logging():
+    """
+    Configura, uma vez por processo, os loggers "app" e o do middle para escrever pela fila nos handlers
+    do setup_logger (ou num StreamHandler, se ele nao configurar nenhum), com os niveis de LOG_LEVEL/LOG_LEVELS.
+    """
+    global _configured, _queue_handler
+    with _lock:
+        if _configured:
+            return
+        base = setup_logger()
+        _handlers[:] = [handler for handler in base.handlers if not isinstance(handler, QueueHandler)]
+        if not _handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+            _handlers.append(handler)
+
+        if settings.LOG_QUEUE_ENABLED:
+            _queue_handler = QueueHandler(queue.SimpleQueue())
+            _start_listener()
+            targets: List[logging.Handler] = [_queue_handler]
+            atexit.register(stop_logging)
+            os.register_at_fork(after_in_child=_after_fork_in_child)
+        else:
+            targets = list(_handlers)
+
+        base.handlers = list(targets)
+        app_logger = logging.getLogger(APP_LOGGER)
+        app_logger.handlers = list(targets)
+        # Os handlers ja estao no "app"; propagar para o root duplicaria as linhas
+        app_logger.propagate = False
+        try:
+            app_logger.setLevel(settings.LOG_LEVEL.upper())
+        except ValueError:
+            app_logger.setLevel(logging.INFO)
+            app_logger.warning("LOG_LEVEL invalido (%r), usando INFO", settings.LOG_LEVEL)
+        for name, level in parse_levels(settings.LOG_LEVELS).items():
+            logging.getLogger(name).setLevel(level)
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger do modulo abaixo de "app" (nomes de fora, como __main__, viram app.<nome>).
+    """
+    configure_logging()
+    if name != APP_LOGGER and not name.startswith(f"{APP_LOGGER}."):
+        name = f"{APP_LOGGER}.{name}"
+    return logging.getLogger(name)
@@ -0,0 +1,294 @@
+"""
+Metricas no formato Prometheus das execucoes de produtos.
+
+Todas as series usam o rotulo `produto` com a chave do PRODUCT_MAPPING (nome sanitizado do payload).
+O servidor expoe o registro em GET /metrics; no modo CLI, METRICS_TEXTFILE grava um arquivo para o
+textfile collector do node_exporter e METRICS_PUSHGATEWAY envia ao Pushgateway ao final da execucao.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, push_to_gateway, write_to_textfile
+from prometheus_client.core import GaugeMetricFamily
+from .logs import get_logger
+from .pipeline import STAGE_FINISHED, StageMetrics, add_stage_listener
+from .settings import settings
+
+if TYPE_CHECKING:
+    from .resources import ResourceUsage
+
+logger = get_logger(__name__)
+
+UNKNOWN_PRODUCT = "desconhecido"
+
+# Workflows de decks (NEWAVE/DECOMP) levam dezenas de minutos; os buckets cobrem de 100 ms a 1 h
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+# Frescor (chegada/publicacao ate API e notificacao): de 30 s a 2 dias, por causa da `periodicidade` dos decks
+FRESHNESS_BUCKETS = (30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 14400, 43200, 86400, 172800)
+HTTP_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REGISTRY = CollectorRegistry()
+
+WORKFLOW_DURATION = Histogram(
+    "webhook_workflow_duration_seconds", "Duracao do workflow completo do produto",
+    ["produto", "status"], buckets=DURATION_BUCKETS, registry=REGISTRY,
+)
+WORKFLOWS = Counter(
+    "webhook_workflows", "Workflows executados por produto e resultado",
+    ["produto", "status"], registry=REGISTRY,
+)
+WORKFLOWS_IN_FLIGHT = Gauge(
+    "webhook_workflows_in_flight", "Workflows em execucao neste processo",
+    ["produto"], registry=REGISTRY,
+)
+STAGE_DURATION = Histogram(
+    "webhook_stage_duration_seconds", "Duracao de cada etapa do pipeline do produto",
+    ["produto", "stage", "status"], buckets=DURATION_BUCKETS, registry=REGISTRY,
+)
+STAGE_CPU = Counter(
+    "webhook_stage_cpu_seconds", "Tempo de CPU da thread em cada etapa do pipeline",
+    ["produto", "stage"], registry=REGISTRY,
+)
+ROWS_PARSED = Counter(
+    "webhook_rows_parsed", "Linhas produzidas pela etapa parse",
+    ["produto"], registry=REGISTRY,
+)
+ROWS_POSTED = Counter(
+    "webhook_rows_posted", "Registros enviados a API em POST/PUT com corpo JSON em lista",
+    ["produto"], registry=REGISTRY,
+)
+BYTES_DOWNLOADED = Counter(
+    "webhook_bytes_downloaded", "Bytes baixados do S3 para o produto",
+    ["produto"], registry=REGISTRY,
+)
+WORKFLOW_PEAK_RSS = Gauge(
+    "webhook_workflow_peak_rss_bytes", "Pico de RSS do processo durante a ultima execucao do produto",
+    ["produto"], registry=REGISTRY,
+)
+WORKFLOW_CPU = Counter(
+    "webhook_workflow_cpu_seconds", "Tempo de CPU do processo durante as execucoes do produto",
+    ["produto", "mode"], registry=REGISTRY,
+)
+SCRATCH_BYTES_WRITTEN = Counter(
+    "webhook_scratch_bytes_written", "Crescimento dos diretorios de trabalho (PATH_TMP/PATH_ARQUIVOS_TEMP) por produto",
+    ["produto", "directory"], registry=REGISTRY,
+)
+STAGE_FRAME_MEMORY = Gauge(
+    "webhook_stage_frame_memory_bytes", "Memoria dos DataFrames devolvidos pela ultima execucao da etapa",
+    ["produto", "stage"], registry=REGISTRY,
+)
+FRESHNESS = Histogram(
+    "webhook_freshness_seconds", "Latencia da chegada do webhook/publicacao ate os dados na API ou a notificacao",
+    ["produto", "latency"], buckets=FRESHNESS_BUCKETS, registry=REGISTRY,
+)
+FRESHNESS_P95 = Gauge(
+    "webhook_freshness_p95_seconds", "p95 rolante das ultimas FRESHNESS_WINDOW execucoes do produto",
+    ["produto", "latency"], registry=REGISTRY,
+)
+FRESHNESS_SLO = Gauge(
+    "webhook_freshness_slo_seconds", "SLO de frescor configurado para o produto",
+    ["produto", "latency"], registry=REGISTRY,
+)
+FRESHNESS_BREACHES = Counter(
+    "webhook_freshness_slo_breaches", "Execucoes com latencia de frescor acima do SLO",
+    ["produto", "latency"], registry=REGISTRY,
+)
+HTTP_DURATION = Histogram(
+    "webhook_http_request_duration_seconds", "Latencia de cada tentativa de chamada HTTP por endpoint e status",
+    ["endpoint", "method", "status"], buckets=HTTP_BUCKETS, registry=REGISTRY,
+)
+HTTP_REQUEST_BYTES = Counter(
+    "webhook_http_request_bytes", "Bytes enviados no corpo das chamadas HTTP",
+    ["endpoint", "method"], registry=REGISTRY,
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "webhook_http_response_bytes", "Bytes recebidos no corpo das respostas HTTP",
+    ["endpoint", "method"], registry=REGISTRY,
+)
+HTTP_RETRIES = Counter(
+    "webhook_http_retries", "Retentativas de chamadas HTTP por endpoint",
+    ["endpoint", "method"], registry=REGISTRY,
+)
+ARTIFACT_CACHE_REQUESTS = Counter(
+    "webhook_artifact_cache_requests", "Consultas ao cache local de arquivos do S3 por resultado (hit, miss, stale)",
+    ["result"], registry=REGISTRY,
+)
+ARTIFACT_CACHE_BYTES = Gauge(
+    "webhook_artifact_cache_bytes", "Tamanho dos conteudos guardados no cache local de arquivos do S3",
+    registry=REGISTRY,
+)
+
+_current_product: ContextVar[str] = ContextVar("current_product", default=UNKNOWN_PRODUCT)
+
+
+def current_product() -> str:
+    return _current_product.get()
+
+
+@contextmanager
+def track_workflow(product_key: str) -> Iterator[None]:
+    """
+    Mede o workflow do produto e define o produto corrente para as demais metricas da execucao.
+    """
+    token = _current_product.set(product_key)
+    WORKFLOWS_IN_FLIGHT.labels(product_key).inc()
+    start = time.perf_counter()
+    status = "succeeded"
+    try:
+        yield
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        WORKFLOW_DURATION.labels(product_key, status).observe(time.perf_counter() - start)
+        WORKFLOWS.labels(product_key, status).inc()
+        WORKFLOWS_IN_FLIGHT.labels(product_key).dec()
+        _current_product.reset(token)
+
+
+def _observe_stage(product: Any, event: str, metrics: StageMetrics):
+    if event != STAGE_FINISHED:
+        return
+    product_key = current_product()
+    STAGE_DURATION.labels(product_key, metrics.name, metrics.status).observe(metrics.wall_time or 0)
+    if metrics.cpu_time:
+        STAGE_CPU.labels(product_key, metrics.name).inc(metrics.cpu_time)
+    if metrics.name == "parse" and metrics.rows:
+        ROWS_PARSED.labels(product_key).inc(metrics.rows)
+    if metrics.memory_bytes is not None:
+        STAGE_FRAME_MEMORY.labels(product_key, metrics.name).set(metrics.memory_bytes)
+
+
+add_stage_listener(_observe_stage)
+
+
+def observe_download(path: str):
+    """
+    Soma o tamanho do arquivo (ou de todos os arquivos do diretorio) baixado do S3.
+    """
+    try:
+        if os.path.isdir(path):
+            size = sum(
+                os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names
+            )
+        else:
+            size = os.path.getsize(path)
+    except (OSError, TypeError):
+        return
+    BYTES_DOWNLOADED.labels(current_product()).inc(size)
+
+
+def observe_posted(json_body: Any):
+    if isinstance(json_body, list):
+        ROWS_POSTED.labels(current_product()).inc(len(json_body))
+
+
+def observe_resources(product_key: str, usage: "ResourceUsage"):
+    WORKFLOW_PEAK_RSS.labels(product_key).set(usage.peak_rss)
+    WORKFLOW_CPU.labels(product_key, "user").inc(max(usage.user_cpu, 0))
+    WORKFLOW_CPU.labels(product_key, "system").inc(max(usage.system_cpu, 0))
+    for directory, size in usage.scratch_bytes.items():
+        if size > 0:
+            SCRATCH_BYTES_WRITTEN.labels(product_key, directory).inc(size)
+
+
+def observe_http(
+    endpoint: str, method: str, status: str, seconds: float, request_bytes: int = 0, response_bytes: int = 0
+):
+    """
+    Uma tentativa de chamada HTTP; `status` e o codigo da resposta ou o nome da excecao de rede.
+    """
+    HTTP_DURATION.labels(endpoint, method, status).observe(seconds)
+    if request_bytes:
+        HTTP_REQUEST_BYTES.labels(endpoint, method).inc(request_bytes)
+    if response_bytes:
+        HTTP_RESPONSE_BYTES.labels(endpoint, method).inc(response_bytes)
+
+
+def observe_http_retry(endpoint: str, method: str):
+    HTTP_RETRIES.labels(endpoint, method).inc()
+
+
+def observe_artifact_cache(result: str):
+    ARTIFACT_CACHE_REQUESTS.labels(result).inc()
+
+
+def set_artifact_cache_bytes(size: int):
+    ARTIFACT_CACHE_BYTES.set(size)
+
+
+def observe_freshness(product_key: str, latency: str, seconds: float):
+    FRESHNESS.labels(product_key, latency).observe(max(seconds, 0))
+
+
+def observe_freshness_breach(product_key: str, latency: str):
+    FRESHNESS_BREACHES.labels(product_key, latency).inc()
+
+
+def set_freshness_p95(product_key: str, latency: str, seconds: float):
+    FRESHNESS_P95.labels(product_key, latency).set(seconds)
+
+
+def set_freshness_slo(product_key: str, latency: str, seconds: float):
+    FRESHNESS_SLO.labels(product_key, latency).set(seconds)
+
+
+class _LaneCollector:
+    """
+    Profundidade de fila e jobs em execucao por faixa, lidos do agendador no momento da coleta.
+    """
+
+    def __init__(self):
+        self.source: Optional[Callable[[], Dict[str, Dict[str, int]]]] = None
+
+    def collect(self):
+        pending = GaugeMetricFamily("webhook_queue_depth", "Jobs aguardando na fila da faixa", labels=["lane"])
+        running = GaugeMetricFamily("webhook_jobs_in_flight", "Jobs em execucao na faixa", labels=["lane"])
+        if self.source is not None:
+            for lane, stats in self.source().items():
+                pending.add_metric([lane], stats["pending"])
+                running.add_metric([lane], stats["running"])
+        yield pending
+        yield running
+
+
+_lane_collector = _LaneCollector()
+REGISTRY.register(_lane_collector)
+
+
+def register_lane_stats(source: Callable[[], Dict[str, Dict[str, int]]]):
+    _lane_collector.source = source
+
+
+def export_cli_metrics():
+    """
+    Exporta o registro ao final de uma execucao pela CLI, conforme METRICS_TEXTFILE e METRICS_PUSHGATEWAY.
+    """
+    if settings.METRICS_TEXTFILE:
+        os.makedirs(os.path.dirname(settings.METRICS_TEXTFILE) or ".", exist_ok=True)
+        write_to_textfile(settings.METRICS_TEXTFILE, REGISTRY)
+    if settings.METRICS_PUSHGATEWAY:
+        try:
+            push_to_gateway(settings.METRICS_PUSHGATEWAY, job=settings.METRICS_JOB, registry=REGISTRY)
+        except Exception as e:
+            logger.warning(f"Falha ao enviar metricas ao Pushgateway {settings.METRICS_PUSHGATEWAY}: {e}")
+
+
+def start_periodic_export(interval: float) -> Optional[threading.Thread]:
+    """
+    Exporta as metricas a cada `interval` segundos, para processos residentes (worker).
+    """
+    if not (settings.METRICS_TEXTFILE or settings.METRICS_PUSHGATEWAY):
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            export_cli_metrics()
+
+    thread = threading.Thread(target=loop, name="metrics-export", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,56 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from .logs import get_logger
+from .settings import settings
+
+logger = get_logger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Pool de processos compartilhado para as etapas de parse que seguram a GIL
+    (pdfplumber, openpyxl/pandas, inewave).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            logger.info(f"Iniciando pool de processos para parse com {settings.CPU_POOL_WORKERS} workers")
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.CPU_POOL_WORKERS,
+                mp_context=multiprocessing.get_context(settings.CPU_POOL_START_METHOD),
+            )
+        return _pool
+
+
+def submit_cpu_bound(fn: Callable, *args: Any, **kwargs: Any) -> Future:
+    """
+    Agenda `fn` no pool de processos quando CPU_POOL_ENABLED esta ativo; caso contrario executa
+    na thread atual e devolve um Future ja resolvido.
+    `fn` e os argumentos precisam ser serializaveis por pickle: funcoes de modulo recebendo caminhos
+    de arquivo e devolvendo DataFrames.
+    """
+    if settings.CPU_POOL_ENABLED:
+        return get_process_pool().submit(fn, *args, **kwargs)
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except BaseException as e:
+        future.set_exception(e)
+    return future
+
+
+def run_cpu_bound(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    return submit_cpu_bound(fn, *args, **kwargs).result()
+
+
+def shutdown_process_pool(wait: bool = True):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+            _pool = None
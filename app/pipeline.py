@@ -0,0 +1,158 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Iterator, List, Optional
+from .logs import get_logger
+from .settings import settings
+from .tracing import span
+
+logger = get_logger(__name__)
+
+STAGES = ("fetch", "extract", "parse", "transform", "publish", "notify", "trigger")
+
+STAGE_STARTED = "started"
+STAGE_FINISHED = "finished"
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+@dataclass
+class StageMetrics:
+    """
+    Medicoes de uma etapa do pipeline de um produto.
+    `cpu_time` e o tempo de CPU da thread que executou a etapa; trabalho enviado ao pool de processos
+    (app.offload) aparece apenas no tempo de parede.
+    """
+    name: str
+    started_at: float
+    wall_time: Optional[float] = None
+    cpu_time: Optional[float] = None
+    rows: Optional[int] = None
+    # Memoria (memory_usage(deep=True)) dos DataFrames/Series devolvidos pela etapa
+    memory_bytes: Optional[int] = None
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+StageListener = Callable[[Any, str, StageMetrics], None]
+
+_listeners: List[StageListener] = []
+_listeners_lock = threading.Lock()
+
+
+def add_stage_listener(listener: StageListener):
+    """
+    Registra um observador chamado no inicio (STAGE_STARTED) e no fim (STAGE_FINISHED) de cada etapa,
+    com a instancia do produto, o evento e as medicoes da etapa.
+    """
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def remove_stage_listener(listener: StageListener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def notify_stage_listeners(product: Any, event: str, metrics: StageMetrics):
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(product, event, metrics)
+        except Exception as e:
+            # Um observador com problema nao pode derrubar o processamento do produto
+            logger.warning(f"Observador de etapa {getattr(listener, '__name__', listener)} falhou: {e}")
+
+
+def count_rows(value: Any) -> Optional[int]:
+    """
+    Quantidade de linhas produzidas por uma etapa: len() de DataFrames, Series e listas; None para o resto.
+    """
+    if isinstance(value, (list, tuple)) or hasattr(value, "shape"):
+        try:
+            return len(value)
+        except TypeError:
+            return None
+    return None
+
+
+def frame_memory(value: Any) -> Optional[int]:
+    """
+    Memoria ocupada pelos DataFrames/Series do resultado de uma etapa, incluindo os objetos Python das colunas
+    de texto (deep=True); soma os valores de dicts. None quando nao ha DataFrame no resultado.
+    """
+    if isinstance(value, dict):
+        sizes = [size for size in map(frame_memory, value.values()) if size is not None]
+        return sum(sizes) if sizes else None
+    if hasattr(value, "memory_usage") and hasattr(value, "shape"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    return None
+
+
+def _measure_result(metrics: StageMetrics, result: Any):
+    metrics.rows = count_rows(result)
+    if settings.STAGE_MEMORY_ENABLED:
+        metrics.memory_bytes = frame_memory(result)
+
+
+@contextmanager
+def measure_stage(product: Any, name: str, record: Optional[List[StageMetrics]] = None, cpu: bool = True) -> Iterator[StageMetrics]:
+    """
+    Mede o bloco de uma etapa (tempo de parede e, se `cpu`, tempo de CPU da thread), abre um span
+    `stage <nome>` e avisa os observadores.
+    As medicoes sao anexadas a `record` antes da execucao, inclusive quando a etapa falha.
+    """
+    metrics = StageMetrics(name=name, started_at=time.time())
+    if record is not None:
+        record.append(metrics)
+    notify_stage_listeners(product, STAGE_STARTED, metrics)
+    with span(f"stage {name}", stage=name, produto=type(product).__name__) as stage_span:
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield metrics
+            metrics.status = STATUS_OK
+        except Exception as e:
+            metrics.status = STATUS_ERROR
+            metrics.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            metrics.wall_time = round(time.perf_counter() - wall_start, 4)
+            if cpu:
+                metrics.cpu_time = round(time.thread_time() - cpu_start, 4)
+            if stage_span is not None:
+                for key in ("cpu_time", "rows", "memory_bytes"):
+                    if getattr(metrics, key) is not None:
+                        stage_span.set_attribute(key, getattr(metrics, key))
+            notify_stage_listeners(product, STAGE_FINISHED, metrics)
+
+
+def timed_stage(product: Any, name: str, fn: Callable[..., Any], *args: Any, record: Optional[List[StageMetrics]] = None) -> Any:
+    """
+    Executa uma etapa medindo tempo de parede, tempo de CPU, linhas produzidas e memoria dos DataFrames.
+    """
+    with measure_stage(product, name, record) as metrics:
+        result = fn(*args)
+        _measure_result(metrics, result)
+    return result
+
+
+async def timed_stage_async(
+    product: Any, name: str, fn: Callable[..., Awaitable[Any]], *args: Any, record: Optional[List[StageMetrics]] = None
+) -> Any:
+    """
+    Versao de timed_stage para etapas awaitable. O tempo de CPU nao e medido: a thread do event loop
+    e compartilhada com as demais corrotinas.
+    """
+    with measure_stage(product, name, record, cpu=False) as metrics:
+        result = await fn(*args)
+        _measure_result(metrics, result)
+    return result
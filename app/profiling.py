@@ -0,0 +1,408 @@
+"""
+Profiling sob demanda de uma execucao de produto (main.py --profile).
+
+Dois modos:
+- cprofile (padrao): um cProfile por etapa do pipeline (mais um para o que roda fora das etapas), gravados
+  juntos em profile.pstats, com o StackSampler rodando em paralelo para gerar as pilhas para flame graph;
+- sampling: apenas o StackSampler, com overhead baixo; o resumo por etapa vem das amostras.
+
+Em ambos sao gravados stacks.collapsed (formato "frame;frame;frame contagem" do flamegraph.pl/speedscope)
+e summary.txt com o top-N de funcoes por etapa.
+
+Para o servico residente, o ContinuousProfiler (PROFILER_ENABLED) amostra continuamente em taxa baixa,
+agregando as pilhas por produto; os dados saem em GET /profiler/stacks e /profiler/top ou num arquivo
+gravado ao receber PROFILER_DUMP_SIGNAL.
+"""
+import cProfile
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
+from .logs import get_logger
+from .pipeline import STAGE_FINISHED, STAGE_STARTED, StageMetrics, add_stage_listener, remove_stage_listener
+from .settings import settings
+
+logger = get_logger(__name__)
+
+OUTSIDE_STAGES = "workflow"
+TRUNCATED_STACK = "[outras pilhas]"
+
+# Folhas de pilha de threads paradas esperando trabalho (pool ocioso, join, event loop sem I/O pronto)
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+
+class StackSampler:
+    """
+    Amostra as pilhas de todas as threads do processo a cada `interval` segundos via sys._current_frames().
+    Cada amostra e contada sob a tag devolvida por `tag_for(thread_id)` (None descarta a thread); threads
+    ociosas sao ignoradas. Com `max_stacks`, pilhas novas alem do limite sao somadas em "<tag>;[outras pilhas]".
+    """
+
+    def __init__(
+        self, interval: float = 0.005, tag_for: Optional[Callable[[int], Optional[str]]] = None,
+        max_stacks: Optional[int] = None,
+    ):
+        self.interval = interval
+        self.tag_for = tag_for or (lambda ident: OUTSIDE_STAGES)
+        self.max_stacks = max_stacks
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self):
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or is_idle(frame):
+                continue
+            tag = self.tag_for(ident)
+            if tag is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            key = (tag, *reversed(stack))
+            with self._lock:
+                if self.max_stacks and key not in self.counts and len(self.counts) >= self.max_stacks:
+                    key = (tag, TRUNCATED_STACK)
+                self.counts[key] += 1
+        self.samples += 1
+
+    def snapshot(self, tag: Optional[str] = None, reset: bool = False) -> Counter:
+        with self._lock:
+            counts = self.counts
+            if reset:
+                self.counts, self.samples = Counter(), 0
+        return Counter({key: n for key, n in counts.items() if tag is None or key[0] == tag})
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Uma amostra com erro e descartada; deixar a excecao subir mataria a thread em silencio
+            try:
+                self.sample()
+            except Exception as e:
+                self.errors += 1
+                if self.errors == 1 or self.errors % 1000 == 0:
+                    logger.warning("Falha ao amostrar as pilhas (%d ate agora): %s", self.errors, e, exc_info=True)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self, counts: Optional[Counter] = None) -> List[str]:
+        counts = self.snapshot() if counts is None else counts
+        return [f"{';'.join(stack)} {count}" for stack, count in counts.most_common()]
+
+    def top_by_tag(self, top: int, counts: Optional[Counter] = None) -> Dict[str, List[Tuple[str, int, int]]]:
+        """
+        Para cada tag, as `top` funcoes com mais amostras proprias: (funcao, amostras proprias, inclusivas).
+        """
+        own: Dict[str, Counter] = defaultdict(Counter)
+        inclusive: Dict[str, Counter] = defaultdict(Counter)
+        for (tag, *stack), count in (self.snapshot() if counts is None else counts).items():
+            own[tag][stack[-1]] += count
+            for label in set(stack):
+                inclusive[tag][label] += count
+        return {
+            tag: [(label, count, inclusive[tag][label]) for label, count in counter.most_common(top)]
+            for tag, counter in own.items()
+        }
+
+
+class ProfileSession:
+    """
+    Perfila o bloco `with` separando o tempo por etapa do pipeline. Com `cprofile`, o perfil ativo e trocado
+    nos observadores de etapa: so um cProfile pode estar ativo por vez (no 3.12+ ele e global ao processo),
+    por isso as etapas finais deixam de rodar em paralelo durante a sessao.
+    """
+
+    def __init__(self, use_cprofile: bool = True, interval: float = 0.005, top: int = 15):
+        self.use_cprofile = use_cprofile
+        self.top = top
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.stage_times: Dict[str, float] = defaultdict(float)
+        self.wall_time = 0.0
+        self._active: List[str] = []
+        self._thread_stages: Dict[int, List[str]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.sampler = StackSampler(interval, self._tag_for)
+
+    def _tag_for(self, ident: int) -> str:
+        stages = self._thread_stages.get(ident)
+        return stages[-1] if stages else OUTSIDE_STAGES
+
+    def _switch(self, previous: Optional[str], current: Optional[str]):
+        if not self.use_cprofile:
+            return
+        if previous is not None:
+            self.profiles[previous].disable()
+        if current is not None:
+            self.profiles.setdefault(current, cProfile.Profile()).enable()
+
+    def _on_stage(self, product: Any, event: str, metrics: StageMetrics):
+        ident = threading.get_ident()
+        with self._lock:
+            if event == STAGE_STARTED:
+                # Etapas finais em sequencia para que o tempo de cada uma caia no seu proprio perfil
+                product.concurrent_stages = ()
+                self._thread_stages[ident].append(metrics.name)
+                self._switch(self._active[-1] if self._active else None, metrics.name)
+                self._active.append(metrics.name)
+            elif event == STAGE_FINISHED:
+                if self._thread_stages[ident]:
+                    self._thread_stages[ident].pop()
+                self.stage_times[metrics.name] += metrics.wall_time or 0
+                if self._active and self._active[-1] == metrics.name:
+                    self._active.pop()
+                    self._switch(metrics.name, self._active[-1] if self._active else None)
+                elif metrics.name in self._active:
+                    self._active.remove(metrics.name)
+
+    def __enter__(self) -> "ProfileSession":
+        add_stage_listener(self._on_stage)
+        if self.use_cprofile:
+            try:
+                self._switch(None, OUTSIDE_STAGES)
+            except ValueError as e:
+                # Outro profiler (debugger, coverage) ja ocupa o hook de profiling do processo
+                logger.warning(f"cProfile indisponivel ({e}), usando apenas amostragem")
+                self.use_cprofile = False
+                self.profiles.clear()
+        self._active = [OUTSIDE_STAGES] if self.use_cprofile else []
+        self._start = time.perf_counter()
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall_time = time.perf_counter() - self._start
+        self.sampler.stop()
+        with self._lock:
+            if self._active:
+                self._switch(self._active[-1], None)
+            self._active = []
+        remove_stage_listener(self._on_stage)
+
+    def combined_stats(self) -> Optional[pstats.Stats]:
+        profiles = list(self.profiles.values())
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def _cprofile_top(self, name: str) -> List[str]:
+        stats = pstats.Stats(self.profiles[name]).stats
+        entries = sorted(
+            ((key, value) for key, value in stats.items() if not key[0].endswith("profiling.py")),
+            key=lambda item: item[1][3], reverse=True,
+        )[:self.top]
+        return [
+            f"  {ct:9.3f}s acum {tt:9.3f}s proprio {nc:>9} chamadas  {func} ({os.path.basename(filename)}:{line})"
+            for (filename, line, func), (_, nc, tt, ct, _) in entries
+        ]
+
+    def summary(self) -> str:
+        lines = [
+            f"Tempo total: {self.wall_time:.3f}s, {self.sampler.samples} amostras a cada {self.sampler.interval * 1000:.0f} ms",
+            "Tempo por etapa: " + (", ".join(f"{name}={t:.3f}s" for name, t in self.stage_times.items()) or "-"),
+        ]
+        if self.use_cprofile:
+            for name in self.profiles:
+                lines += ["", f"[{name}] top {self.top} por tempo acumulado (cProfile)"] + self._cprofile_top(name)
+        else:
+            interval_ms = self.sampler.interval * 1000
+            for tag, entries in self.sampler.top_by_tag(self.top).items():
+                lines += ["", f"[{tag}] top {self.top} por amostras proprias (~{interval_ms:.0f} ms cada)"]
+                lines += [f"  {own:>7} proprias {inclusive:>7} inclusivas  {label}" for label, own, inclusive in entries]
+        return "\n".join(lines)
+
+    def write(self, output_dir: str) -> Dict[str, str]:
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {
+            "collapsed": os.path.join(output_dir, "stacks.collapsed"),
+            "summary": os.path.join(output_dir, "summary.txt"),
+        }
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            f.write("\n".join(self.sampler.collapsed()) + "\n")
+        with open(paths["summary"], "w", encoding="utf-8") as f:
+            f.write(self.summary() + "\n")
+        stats = self.combined_stats()
+        if stats is not None:
+            paths["pstats"] = os.path.join(output_dir, "profile.pstats")
+            stats.dump_stats(paths["pstats"])
+        return paths
+
+
+class ContinuousProfiler:
+    """
+    Amostragem continua do servico residente, com as pilhas agregadas pelo produto em execucao na thread.
+    A thread e associada ao produto pelo runner (profile_product) e pelas etapas do pipeline, que tambem
+    cobrem as threads das etapas finais concorrentes. Produtos assincronos dividem a thread do event loop:
+    enquanto dois rodam juntos, as amostras dela vao para o que comecou por ultimo entre os que nao terminaram.
+    """
+
+    def __init__(self, interval: float, max_stacks: int):
+        self._thread_products: Dict[int, List[str]] = defaultdict(list)
+        self.sampler = StackSampler(interval, self._tag_for, max_stacks)
+        self.started_at: Optional[datetime] = None
+
+    def _tag_for(self, ident: int) -> Optional[str]:
+        # A lista e alterada pela propria thread amostrada: pode esvaziar entre a leitura e o indice
+        products = self._thread_products.get(ident)
+        try:
+            return products[-1] if products is not None else None
+        except IndexError:
+            return None
+
+    def _push(self, product_key: str):
+        self._thread_products[threading.get_ident()].append(product_key)
+
+    def _pop(self, product_key: str):
+        # Remove a entrada do produto que terminou, nao a ultima: no event loop os produtos terminam fora de ordem
+        ident = threading.get_ident()
+        products = self._thread_products.get(ident)
+        if products:
+            for index in range(len(products) - 1, -1, -1):
+                if products[index] == product_key:
+                    del products[index]
+                    break
+        if not products:
+            self._thread_products.pop(ident, None)
+
+    @contextmanager
+    def track(self, product_key: str) -> Iterator[None]:
+        self._push(product_key)
+        try:
+            yield
+        finally:
+            self._pop(product_key)
+
+    def _on_stage(self, product: Any, event: str, metrics: StageMetrics):
+        from .metrics import current_product
+
+        if event == STAGE_STARTED:
+            self._push(current_product())
+        elif event == STAGE_FINISHED:
+            self._pop(current_product())
+
+    def start(self):
+        add_stage_listener(self._on_stage)
+        self.started_at = datetime.now()
+        self.sampler.start()
+
+    def stop(self):
+        self.sampler.stop()
+        remove_stage_listener(self._on_stage)
+
+    def collapsed(self, product_key: Optional[str] = None, reset: bool = False) -> List[str]:
+        return self.sampler.collapsed(self.sampler.snapshot(product_key, reset))
+
+    def top(self, product_key: Optional[str] = None, top: int = 20) -> Dict[str, Any]:
+        """
+        Top-N de funcoes por amostras proprias de cada produto, com o tempo estimado pelo intervalo de amostragem.
+        """
+        interval = self.sampler.interval
+        return {
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "interval": interval,
+            "samples": self.sampler.samples,
+            "sample_errors": self.sampler.errors,
+            "products": {
+                product: [
+                    {"function": label, "own_samples": own, "inclusive_samples": inclusive, "own_seconds": own * interval}
+                    for label, own, inclusive in entries
+                ]
+                for product, entries in self.sampler.top_by_tag(top, self.sampler.snapshot(product_key)).items()
+            },
+        }
+
+    def dump(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"stacks-{datetime.now():%Y%m%d-%H%M%S}.collapsed")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed()) + "\n")
+        return path
+
+
+_continuous_profiler: Optional[ContinuousProfiler] = None
+_continuous_lock = threading.Lock()
+
+
+def get_continuous_profiler() -> Optional[ContinuousProfiler]:
+    return _continuous_profiler
+
+
+def start_continuous_profiler() -> Optional[ContinuousProfiler]:
+    """
+    Inicia o profiler continuo se PROFILER_ENABLED, uma unica vez por processo, e instala o handler do
+    PROFILER_DUMP_SIGNAL (kill -USR2 <pid>) que grava as pilhas acumuladas em PROFILER_DUMP_DIR.
+    """
+    global _continuous_profiler
+    if not settings.PROFILER_ENABLED:
+        return None
+    with _continuous_lock:
+        if _continuous_profiler is not None:
+            return _continuous_profiler
+        _continuous_profiler = ContinuousProfiler(settings.PROFILER_INTERVAL, settings.PROFILER_MAX_STACKS)
+        _continuous_profiler.start()
+    logger.info(f"Profiler continuo ativo: amostra a cada {settings.PROFILER_INTERVAL}s")
+    _install_dump_signal(_continuous_profiler)
+    return _continuous_profiler
+
+
+def _install_dump_signal(profiler: ContinuousProfiler):
+    signum = getattr(signal, settings.PROFILER_DUMP_SIGNAL, None) if settings.PROFILER_DUMP_SIGNAL else None
+    if signum is None:
+        return
+
+    def dump(*_):
+        # O handler roda na thread principal entre bytecodes: a gravacao vai para outra thread
+        threading.Thread(
+            target=lambda: logger.info(f"Pilhas do profiler gravadas em {profiler.dump(settings.PROFILER_DUMP_DIR)}"),
+            name="profiler-dump", daemon=True,
+        ).start()
+
+    try:
+        signal.signal(signum, dump)
+    except ValueError:
+        # signal.signal so funciona na thread principal; o dump continua disponivel pelo endpoint
+        logger.warning(f"Nao foi possivel instalar o handler de {settings.PROFILER_DUMP_SIGNAL} fora da thread principal")
+
+
+def profile_product(product_key: str) -> ContextManager:
+    """
+    Associa a thread corrente ao produto para o profiler continuo; sem efeito com ele desligado.
+    """
+    profiler = _continuous_profiler
+    return profiler.track(product_key) if profiler is not None else nullcontext()
@@ -0,0 +1,64 @@
+import importlib
+import threading
+from typing import Dict, Iterator, List, Mapping, Optional, Type
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class LazyProductRegistry(Mapping):
+    """
+    Mapeamento produto -> classe do ETL resolvido sob demanda.
+    Cada entrada e uma string "modulo:Classe" (ou None para produtos sem ETL); o modulo so e
+    importado no primeiro acesso ao produto e a classe fica em cache a partir dai.
+    """
+
+    def __init__(self, entries: Dict[str, Optional[str]]):
+        self._entries = dict(entries)
+        self._cache: Dict[str, type] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> Optional[Type]:
+        target = self._entries[key]
+        if target is None:
+            return None
+        cls = self._cache.get(target)
+        if cls is None:
+            with self._lock:
+                cls = self._cache.get(target)
+                if cls is None:
+                    cls = self._cache[target] = self._load(target)
+        return cls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def target(self, key: str) -> Optional[str]:
+        return self._entries[key]
+
+    def is_loaded(self, key: str) -> bool:
+        return self._entries[key] in self._cache
+
+    def preload(self) -> List[str]:
+        """
+        Importa todos os produtos mapeados. Retorna as chaves que falharam ao carregar.
+        """
+        failed = []
+        for key, target in self._entries.items():
+            if target is None:
+                continue
+            try:
+                self[key]
+            except Exception as e:
+                logger.warning(f"Nao foi possivel carregar o produto {key} ({target}): {e}")
+                failed.append(key)
+        return failed
+
+    @staticmethod
+    def _load(target: str) -> type:
+        module_name, _, class_name = target.partition(":")
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)
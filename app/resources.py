@@ -0,0 +1,162 @@
+"""
+Contabilidade de recursos por execucao de produto: pico de RSS, CPU de usuario/sistema e crescimento
+dos diretorios de trabalho (PATH_TMP / PATH_ARQUIVOS_TEMP, so com SCRATCH_TRACKING_ENABLED).
+
+RSS e CPU sao do processo inteiro: com varios workflows simultaneos no mesmo processo (servidor, worker
+com --workers > 1) os valores de uma execucao incluem as demais. Para dimensionar workers, use execucoes
+isoladas (CLI ou worker com --workers 1).
+"""
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, Optional
+from middle.utils import Constants
+from .logs import get_logger
+from .settings import settings
+
+logger = get_logger(__name__)
+constants = Constants()
+
+_MB = 1024 ** 2
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Sem /proc (macOS): ru_maxrss e o pico do processo, em bytes no macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def pid_alive(pid: int) -> bool:
+    """
+    True se existe um processo com o pid neste host (inclusive de outro usuario).
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def process_start_token(pid: int) -> Optional[str]:
+    """
+    Identifica uma execucao do processo `pid`: inicio do boot_id do kernel + instante de inicio do processo
+    (/proc/<pid>/stat). Um pid reaproveitado (ex.: PID 1 de um container reiniciado) tem outro token.
+    None sem /proc ou se o processo nao existe.
+    """
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            boot_id = f.read().strip().replace("-", "")[:8]
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Campos depois do nome do comando (entre parenteses); starttime e o 22o campo da linha
+    return f"{boot_id}{stat.rsplit(')', 1)[1].split()[19]}"
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def scratch_directories() -> Dict[str, str]:
+    directories = {}
+    for name in ("PATH_TMP", "PATH_ARQUIVOS_TEMP"):
+        path = getattr(constants, name, None)
+        if isinstance(path, str) and path:
+            directories[name] = path
+    return directories
+
+
+@dataclass
+class ResourceUsage:
+    duration: float = 0.0
+    rss_start: int = 0
+    rss_end: int = 0
+    peak_rss: int = 0
+    user_cpu: float = 0.0
+    system_cpu: float = 0.0
+    # Crescimento de cada diretorio de trabalho durante a execucao (negativo se a execucao limpou arquivos)
+    scratch_bytes: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        scratch = ", ".join(f"{name} {size / _MB:+.1f} MB" for name, size in self.scratch_bytes.items())
+        return (
+            f"pico RSS {self.peak_rss / _MB:.1f} MB (inicio {self.rss_start / _MB:.1f} MB, fim {self.rss_end / _MB:.1f} MB), "
+            f"CPU usuario {self.user_cpu:.2f}s sistema {self.system_cpu:.2f}s, scratch: {scratch or '-'}"
+        )
+
+
+class RssSampler:
+    """
+    Amostra o RSS do processo em uma thread ate ser parada, guardando o maior valor observado.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+@contextmanager
+def track_resources(product_key: str) -> Iterator[Optional[ResourceUsage]]:
+    """
+    Mede os recursos consumidos pelo bloco e registra o resumo no log e nas metricas ao final.
+    """
+    if not settings.RESOURCE_TRACKING_ENABLED:
+        yield None
+        return
+    from . import metrics
+
+    usage = ResourceUsage(rss_start=rss_bytes())
+    # Percorrer os diretorios compartilhados custa proporcional ao que ja existe neles, por isso e opcional
+    directories = scratch_directories() if settings.SCRATCH_TRACKING_ENABLED else {}
+    scratch_start = {name: directory_size(path) for name, path in directories.items()}
+    times_start, start = os.times(), time.perf_counter()
+    sampler: Optional[RssSampler] = None
+    try:
+        with RssSampler(settings.RSS_SAMPLE_INTERVAL) as sampler:
+            yield usage
+    finally:
+        times_end = os.times()
+        usage.duration = time.perf_counter() - start
+        usage.rss_end = rss_bytes()
+        usage.peak_rss = max(sampler.peak, usage.rss_end) if sampler is not None else usage.rss_end
+        usage.user_cpu = times_end.user - times_start.user
+        usage.system_cpu = times_end.system - times_start.system
+        usage.scratch_bytes = {
+            name: directory_size(path) - scratch_start[name] for name, path in directories.items()
+        }
+        logger.info(f"Recursos de {product_key}: {usage.summary()}")
+        metrics.observe_resources(product_key, usage)
@@ -0,0 +1,79 @@
+import asyncio
+import inspect
+from contextlib import ExitStack, contextmanager
+from typing import Any, Iterator, Type
+from middle.utils import sanitize_string
+from .logs import get_logger
+from .constants import PRODUCT_MAPPING
+from .ledger import record_run
+from .metrics import track_workflow
+from .profiling import profile_product
+from .resources import track_resources
+from .schema import WebhookSintegreSchema
+from .tracing import span
+from .webhook_products_interface import WebhookProductsInterface
+
+logger = get_logger(__name__)
+
+
+class ProductNotMappedError(ValueError):
+    """Produto recebido no webhook sem handler no PRODUCT_MAPPING."""
+
+
+def resolve_product(payload: WebhookSintegreSchema) -> Type[WebhookProductsInterface]:
+    """
+    Sanitiza o nome do produto do payload e retorna a classe responsavel pelo ETL.
+    """
+    payload.nome = sanitize_string(payload.nome, space_char="_")
+    product_handler = PRODUCT_MAPPING.get(payload.nome)
+    if not product_handler:
+        logger.error(f"Produto {payload.nome} nao encontrado no mapeamento")
+        raise ProductNotMappedError("Produto nao mapeado")
+    return product_handler
+
+
+def run_payload(payload: WebhookSintegreSchema) -> Any:
+    """
+    Executa o workflow completo do produto referente ao payload.
+    """
+    product_handler = resolve_product(payload)(payload)
+    with instrument_run(payload):
+        result = product_handler.run_workflow()
+        if inspect.isawaitable(result):
+            # Produto assincrono chamado fora do servidor (jobs, worker, backfill): roda num event loop proprio
+            result = asyncio.run(result)
+    return result
+
+
+@contextmanager
+def instrument_run(payload: WebhookSintegreSchema) -> Iterator[None]:
+    """
+    Span raiz, metricas, registro no ledger, contabilidade de recursos e profiler continuo de uma execucao do produto.
+    """
+    with ExitStack() as stack:
+        root = stack.enter_context(span(
+            f"workflow {payload.nome}", produto=payload.nome, webhook_id=payload.webhookId, filename=payload.filename
+        ))
+        stack.enter_context(track_workflow(payload.nome))
+        run = stack.enter_context(record_run(payload))
+        usage = stack.enter_context(track_resources(payload.nome))
+        stack.enter_context(profile_product(payload.nome))
+        if run is not None:
+            run.trace_id = root.trace_id if root is not None else None
+            run.resources = usage
+        yield
+
+
+def is_async_product(product_class: Type[WebhookProductsInterface]) -> bool:
+    return inspect.iscoroutinefunction(product_class.run_workflow)
+
+
+async def run_payload_async(payload: WebhookSintegreSchema) -> Any:
+    """
+    Versao awaitable do run_payload: produtos assincronos rodam no event loop corrente e os sincronos numa thread.
+    """
+    product_class = resolve_product(payload)
+    if not is_async_product(product_class):
+        return await asyncio.to_thread(run_payload, payload)
+    with instrument_run(payload):
+        return await product_class(payload).run_workflow()
@@ -0,0 +1,128 @@
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+from .logs import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Lane:
+    """
+    Faixa de execucao do agendador.
+    priority: menor valor e atendido primeiro quando ha workers livres.
+    max_concurrency: maximo de jobs da faixa executando ao mesmo tempo.
+    queue_limit: maximo de jobs aguardando na faixa; acima disso o submit e recusado.
+    """
+    name: str
+    max_concurrency: int
+    priority: int
+    queue_limit: int
+
+
+class LaneFullError(RuntimeError):
+    """Fila da faixa cheia: o job nao foi aceito."""
+
+
+class LaneScheduler:
+    """
+    Pool de workers que atende filas separadas por faixa, respeitando a prioridade e o limite de
+    concorrencia de cada uma. Produtos sao associados a faixas pela chave do PRODUCT_MAPPING.
+    """
+
+    def __init__(
+        self,
+        lanes: List[Lane],
+        product_lanes: Mapping[str, str],
+        default_lane: str,
+        max_workers: int,
+    ):
+        self.lanes = {lane.name: lane for lane in lanes}
+        if default_lane not in self.lanes:
+            raise ValueError(f"Faixa padrao {default_lane} nao configurada")
+        unknown = set(product_lanes.values()) - set(self.lanes)
+        if unknown:
+            raise ValueError(f"Faixas nao configuradas: {sorted(unknown)}")
+        self.product_lanes = dict(product_lanes)
+        self.default_lane = default_lane
+        self._pending: Dict[str, Deque[Tuple[int, Future, Callable, tuple]]] = {name: deque() for name in self.lanes}
+        self._running: Dict[str, int] = {name: 0 for name in self.lanes}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"webhook-lane-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def lane_for(self, product_key: str) -> Lane:
+        return self.lanes[self.product_lanes.get(product_key, self.default_lane)]
+
+    def submit(self, product_key: str, fn: Callable, *args: Any) -> Future:
+        lane = self.lane_for(product_key)
+        future: Future = Future()
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Agendador finalizado")
+            if len(self._pending[lane.name]) >= lane.queue_limit:
+                raise LaneFullError(f"Fila da faixa {lane.name} cheia ({lane.queue_limit} jobs aguardando)")
+            self._pending[lane.name].append((next(self._sequence), future, fn, args))
+            self._condition.notify()
+        return future
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._condition:
+            return {
+                name: {
+                    "pending": len(self._pending[name]),
+                    "running": self._running[name],
+                    "max_concurrency": lane.max_concurrency,
+                    "priority": lane.priority,
+                    "queue_limit": lane.queue_limit,
+                }
+                for name, lane in self.lanes.items()
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _next_lane(self) -> Optional[str]:
+        # Faixa elegivel de maior prioridade; empate resolvido pelo job mais antigo
+        eligible = [
+            (lane.priority, self._pending[name][0][0], name)
+            for name, lane in self.lanes.items()
+            if self._pending[name] and self._running[name] < lane.max_concurrency
+        ]
+        return min(eligible)[2] if eligible else None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                lane_name = self._next_lane()
+                while lane_name is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    lane_name = self._next_lane()
+                _, future, fn, args = self._pending[lane_name].popleft()
+                self._running[lane_name] += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._running[lane_name] -= 1
+                    self._condition.notify_all()
@@ -0,0 +1,99 @@
+from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """
+    Configuracoes de execucao do servico de webhooks.
+    Lidas de variaveis de ambiente (ou do .env), todas com valores padrao seguros.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Modo aceitar-e-enfileirar do POST /webhook (responde 202 com o id do job)
+    WEBHOOK_ASYNC_MODE: bool = False
+    WEBHOOK_WORKERS: int = 6
+    WEBHOOK_JOBS_RETENTION: int = 500
+
+    # Deduplicacao de entregas repetidas do mesmo webhookId + s3Key
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_DB: str = "/tmp/tasks-webhook-ons/idempotency.sqlite"
+    IDEMPOTENCY_RUNNING_TTL: int = 6 * 60 * 60
+    IDEMPOTENCY_WAIT_TIMEOUT: int = 60 * 60
+    # Reservas em execucao renovam o heartbeat; sem renovacao por HEARTBEAT_TIMEOUT a entrega pode ser retomada
+    IDEMPOTENCY_HEARTBEAT_INTERVAL: int = 30
+    IDEMPOTENCY_HEARTBEAT_TIMEOUT: int = 120
+
+    # Pool de processos para as etapas de parse CPU-bound (app.offload)
+    CPU_POOL_ENABLED: bool = False
+    CPU_POOL_WORKERS: int = 2
+    CPU_POOL_START_METHOD: str = "spawn"
+
+    # Cliente HTTP assincrono dos produtos derivados de AsyncWebhookProductsInterface
+    ASYNC_HTTP_TIMEOUT: float = 120.0
+    ASYNC_HTTP_MAX_CONNECTIONS: int = 20
+
+    # Logging por fila (app.logs): os modulos so enfileiram e uma thread escreve nos handlers do middle.
+    # LOG_LEVELS sobrescreve o nivel por modulo, ex.: "app.tasks.deck_decomp=DEBUG,app.tasks.rdh=WARNING"
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+
+    # Adaptadores de servicos externos (app.adapters): "live" ou "offline", com latencia injetada por servico
+    ADAPTERS_PROFILE: str = "live"
+    ADAPTERS_LATENCY: str = ""
+    OFFLINE_S3_DIR: str = "/tmp/tasks-webhook-ons/offline/s3"
+    OFFLINE_HTTP_FIXTURES: str = "/tmp/tasks-webhook-ons/offline/http"
+    OFFLINE_RECORD_FILE: Optional[str] = None
+
+    # Cache local dos arquivos do S3 (app.artifacts) por s3Key + ETag, guardados pelo sha256 e limitados com LRU.
+    # No handle_webhook_file a extracao continua sendo do middle: o cache guarda e recria a arvore que ele gerou.
+    # Com ARTIFACT_CACHE_REVALIDATE cada acerto consulta o ETag no S3 (HEAD) antes de usar a copia local
+    ARTIFACT_CACHE_ENABLED: bool = True
+    ARTIFACT_CACHE_DIR: str = "/tmp/tasks-webhook-ons/artifacts"
+    ARTIFACT_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
+    ARTIFACT_CACHE_REVALIDATE: bool = False
+
+    # Retentativas das chamadas HTTP idempotentes (app.adapters.http e cliente assincrono), com espera exponencial
+    HTTP_RETRIES: int = 2
+    HTTP_RETRY_BACKOFF: float = 1.0
+
+    # Exportacao das metricas (app.metrics) fora do servidor: arquivo para o textfile collector e/ou Pushgateway
+    METRICS_TEXTFILE: Optional[str] = None
+    METRICS_PUSHGATEWAY: Optional[str] = None
+    METRICS_JOB: str = "tasks-webhook-ons"
+    METRICS_EXPORT_INTERVAL: int = 60
+
+    # Contabilidade de recursos por execucao (app.resources) e memoria dos DataFrames ao fim de cada etapa.
+    # memory_usage(deep=True) percorre as colunas de texto; desligue STAGE_MEMORY_ENABLED se pesar
+    RESOURCE_TRACKING_ENABLED: bool = True
+    RSS_SAMPLE_INTERVAL: float = 0.5
+    # Crescimento de PATH_TMP/PATH_ARQUIVOS_TEMP por execucao: percorre os diretorios inteiros antes e depois
+    SCRATCH_TRACKING_ENABLED: bool = False
+    STAGE_MEMORY_ENABLED: bool = True
+
+    # Tracing das execucoes (app.tracing): arquivo local em jsonl (um span por linha) ou otlp (OTLP/JSON por trace)
+    TRACING_ENABLED: bool = True
+    TRACING_FILE: Optional[str] = "/tmp/tasks-webhook-ons/traces.jsonl"
+    TRACING_FORMAT: str = "jsonl"
+    TRACING_MAX_BYTES: int = 100 * 1024 ** 2
+
+    # Ledger das execucoes (app.ledger): payload, duracao, status, hash da entrada, linhas enviadas e etapas
+    LEDGER_ENABLED: bool = True
+    LEDGER_DB: str = "/tmp/tasks-webhook-ons/ledger.sqlite"
+    LEDGER_HASH_INPUTS: bool = True
+    # Execucoes mais recentes do produto usadas no p95 rolante de frescor (app.freshness)
+    FRESHNESS_WINDOW: int = 20
+
+    # Profiler de amostragem continuo do servico residente (app.profiling); opt-in, ~10 amostras/s por padrao
+    PROFILER_ENABLED: bool = False
+    PROFILER_INTERVAL: float = 0.1
+    PROFILER_MAX_STACKS: int = 20000
+    PROFILER_DUMP_SIGNAL: Optional[str] = "SIGUSR2"
+    PROFILER_DUMP_DIR: str = "/tmp/tasks-webhook-ons/profiles"
+
+    # Bucket com os arquivos recebidos pelo webhook (webhooks/<produto>/<webhookId>_<arquivo>)
+    S3_WEBHOOK_BUCKET: Optional[str] = None
+
+
+settings = Settings()
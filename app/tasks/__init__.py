@@ -1,32 +1,30 @@
-from .relatorio_limites_intercambio_modelo_decomp import RelatorioLimitesIntercambioDecomp
-from .carga_patamar_decomp import CargaPatamarDecomp
-from .previsoes_carga_mensal_patamar_newave import CargaPatamarNewave
-from .decks_newave import DecksNewave
-from .deck_decomp import DeckDecomp
-from .relatorio_acompanhamento_hidrologico import RelatorioAcompanhamentoHidrologico
-from .precipitacao_prevista import PreciptacaoPrevista
-from .ipdo import Ipdo
-from .notas_tecnicas_medio_prazo import NotasTecnicasMedioPrazo
-from .weol import Weol
-from .vazoes_semanais_previstas import VazoesSemanaisPrevistasPMO
-from .vazoes_diarias_previstas import VazoesDiariasPrevistasPDP
-from .arquivos_modelo_pdp import ArquivosModelosPDP
+import importlib
 
-__all__ = [
-    "RelatorioAcompanhamentoHidrologico",
-    "RelatorioResultadosFinaisConsistidosPDP",
-    "ResultadosPreliminaresNaoConsistidos",
-    "RelatorioLimitesIntercambioDecomp",
-    "CargaPatamarDecomp",
-    "CargaPatamarNewave",
-    "DecksNewave",
-    "DeckDecomp",
-    "CargaPatamarNewave",
-    "PreciptacaoPrevista",
-    "Ipdo",
-    "NotasTecnicasMedioPrazo",
-    "Weol",
-    "VazoesSemanaisPrevistasPMO",
-    "VazoesDiariasPrevistasPDP",
-    "ArquivosModelosPDP"
-]
\ No newline at end of file
+# Exportacoes carregadas sob demanda: importar o pacote nao deve puxar inewave, pdfplumber,
+# matplotlib etc. de todos os produtos (ver app.registry.LazyProductRegistry)
+_LAZY_EXPORTS = {
+    "RelatorioLimitesIntercambioDecomp": ".relatorio_limites_intercambio_modelo_decomp",
+    "CargaPatamarDecomp": ".carga_patamar_decomp",
+    "CargaPatamarNewave": ".previsoes_carga_mensal_patamar_newave",
+    "DecksNewave": ".decks_newave",
+    "DeckDecomp": ".deck_decomp",
+    "RelatorioAcompanhamentoHidrologico": ".relatorio_acompanhamento_hidrologico",
+    "PreciptacaoPrevista": ".precipitacao_prevista",
+    "Ipdo": ".ipdo",
+    "NotasTecnicasMedioPrazo": ".notas_tecnicas_medio_prazo",
+    "Weol": ".weol",
+    "VazoesSemanaisPrevistasPMO": ".vazoes_semanais_previstas",
+    "VazoesDiariasPrevistasPDP": ".vazoes_diarias_previstas",
+    "ArquivosModelosPDP": ".arquivos_modelo_pdp",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = list(_LAZY_EXPORTS)
@@ -11,14 +11,14 @@ project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.schema import WebhookSintegreSchema  # noqa: E402
 from middle.utils import ( # noqa: E402
-    setup_logger,
     Constants,
     get_auth_header,
 )
-from middle.airflow import trigger_dag
+from app.logs import get_logger  # noqa: E402
+from app.adapters import trigger_dag
 
 from app.webhook_products_interface import WebhookProductsInterface  # noqa: E402
-logger = setup_logger()
+logger = get_logger(__name__)
 constants = Constants()
 
 
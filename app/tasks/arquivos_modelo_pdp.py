@@ -6,12 +6,12 @@ import sys
 import pandas as pd
 import glob
 import os
-import requests
 
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.webhook_products_interface import WebhookProductsInterface
+from app.adapters import http  # noqa: E402
 from app.schema import WebhookSintegreSchema
 
 from middle.utils import ( 
@@ -19,8 +19,9 @@ from middle.utils import (
 )
 
 from middle.utils.file_manipulation import extract_zip
-from middle.utils import setup_logger, Constants
-logger = setup_logger()
+from middle.utils import Constants
+from app.logs import get_logger
+logger = get_logger(__name__)
 constants = Constants()
 
 class ArquivosModelosPDP(WebhookProductsInterface):
@@ -48,11 +49,12 @@ class ArquivosModelosPDP(WebhookProductsInterface):
         
         pass
     
-    def process_file(self, file_path):
+    def process_file(self, file_path, path_lista_vazoes: Optional[str] = None):
         logger.info("Processando arquivos do produto... Arquivo encontrado: %s", file_path)
         try:
             unzip_path = extract_zip(file_path)
-            path_lista_vazoes = project_root / "app" / "files" / "relatorio_acompanhamento_hidrologico" / "info_vazao_obs.json"
+            # Lista de subbacias: por padrao a mesma do relatorio de acompanhamento hidrologico
+            path_lista_vazoes = path_lista_vazoes or project_root / "app" / "files" / "relatorio_acompanhamento_hidrologico" / "info_vazao_obs.json"
             
             df_lista_vazoes = pd.read_json(path_lista_vazoes)
 
@@ -86,7 +88,7 @@ class ArquivosModelosPDP(WebhookProductsInterface):
     def post_data(self, process_result: pd.DataFrame) -> dict:
         try:
             
-            res = requests.post(
+            res = http.post(
                 constants.POST_RODADAS_VAZAO_OBSERVADA_PDP,   
                 headers=get_auth_header(),
                 json=process_result.to_dict(orient='records')
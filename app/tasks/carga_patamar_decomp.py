@@ -1,6 +1,5 @@
 import sys
 import os
-import requests
 import shutil
 import pandas as pd
 import glob
@@ -11,19 +10,22 @@ from pathlib import Path
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
-from middle.message import send_whatsapp_message, send_email_message
-from middle.utils import setup_logger, Constants, get_auth_header, sanitize_string  # noqa: E402
-from middle.utils.file_manipulation import extract_zip # noqa: E402
-from middle.s3 import ( # noqa: E402
+from app.adapters import (  # noqa: E402
+    send_whatsapp_message,
+    send_email_message,
+    http,
     handle_webhook_file,
     get_latest_webhook_product,
+    trigger_dag,
 )
-from middle.airflow import trigger_dag
+from middle.utils import Constants, get_auth_header, sanitize_string  # noqa: E402
+from app.logs import get_logger  # noqa: E402
+from middle.utils.file_manipulation import extract_zip # noqa: E402
 from typing import Optional
 from app.schema import WebhookSintegreSchema 
 
 # Configura o logger globalmente uma única vez
-logger = setup_logger()
+logger = get_logger(__name__)
 constants = Constants()
 
 class CargaPatamarDecomp():
@@ -146,7 +148,7 @@ class ReadCargaPatamar:
     def post_data(self, data_in: pd.DataFrame) -> dict:
         self.logger.info("Posting load data to database, rows: %d", len(data_in))
         try:
-            res = requests.post(
+            res = http.post(
                 constants.POST_DECOMP_CARGA_DECOMP,
                 json=data_in.to_dict('records'),
                 headers=get_auth_header()
@@ -263,7 +265,7 @@ class ReadCargaSemanal:
     def post_data(self, data_in: pd.DataFrame) -> dict:
         self.logger.info("Posting load data to database, rows: %d", len(data_in))
         try:
-            res = requests.post(
+            res = http.post(
                 constants.POST_DECOMP_CARGA_PMO,
                 json=data_in.to_dict('records'),
                 headers=get_auth_header()
@@ -365,7 +367,7 @@ class GenerateTable:
     def get_data(self, date) -> dict:
         self.logger.info("Retrieving data from database with params: %s", date)
         try:
-            res = requests.get(
+            res = http.get(
                 constants.GET_DECOMP_CARGA_PMO,
                 params=date,
                 headers=get_auth_header()
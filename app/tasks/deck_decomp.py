@@ -1,3 +1,4 @@
+import logging
 import sys
 import os
 import pandas as pd
@@ -8,23 +9,26 @@ from pathlib import Path
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
-from middle.message import send_whatsapp_message
-from middle.utils import setup_logger, Constants, html_style # noqa: E402
-from middle.utils.file_manipulation import extract_zip
-from middle.s3 import ( # noqa: E402
+from app.adapters import (  # noqa: E402
+    send_whatsapp_message,
     handle_webhook_file,
     get_latest_webhook_product,
+    trigger_dag,
 )
-from middle.airflow import trigger_dag  # noqa: E402
+from middle.utils import Constants, html_style  # noqa: E402
+from app.logs import get_logger  # noqa: E402
+from middle.utils.file_manipulation import extract_zip
 from app.webhook_products_interface import WebhookProductsInterface  # noqa: E402
 from app.schema import WebhookSintegreSchema  # noqa: E402
 
+logger = get_logger(__name__)
+
 class DeckDecomp(WebhookProductsInterface):
     def __init__(self, payload: Optional[WebhookSintegreSchema]):
         super().__init__(payload)    
         self.read_cmo = ReadResultsDecomp()
         self.trigger_dag = trigger_dag
-        self.logger = setup_logger()  
+        self.logger = logger
         self.consts = Constants()
         self.logger.debug("Initialized DeckDecomp instance")
     
@@ -52,7 +56,7 @@ class DeckDecomp(WebhookProductsInterface):
 class ReadResultsDecomp:
     
     def __init__(self):
-        self.logger = setup_logger()  # Usa o self.logger global
+        self.logger = logger
         self.logger.debug("Initialized ReadResultsDecomp instance")
         self.consts = Constants()
     def run_workflow(self, filepath: Optional[str] = None, manually_date: Optional[datetime] = None):
@@ -105,6 +109,8 @@ class ReadResultsDecomp:
             cost_data = []
             cost_headers = []
             in_cost_section = False
+            # Consultado uma vez: o debug por linha de custo so e emitido com o nivel DEBUG ligado
+            debug_entries = self.logger.isEnabledFor(logging.DEBUG)
             self.logger.debug("Parsing summary file content")
             for line in lines:
                 line_normalized = ' '.join(line.split()).upper() 
@@ -139,7 +145,8 @@ class ReadResultsDecomp:
                             if ssis_value.startswith("Med_") and ssis_value in desired_med:
                                 cost_entry['Ssis'] = cost_entry['Ssis'].replace("Med_", "")
                                 cost_data.append(cost_entry)
-                                self.logger.debug("Added cost entry: %s", cost_entry)
+                                if debug_entries:
+                                    self.logger.debug("Added cost entry: %s", cost_entry)
                         else:
                             self.logger.warning("Skipping line with mismatched values: %s", line)
 
@@ -4,18 +4,24 @@ import pandas as pd
 from datetime import datetime, timedelta
 from middle.utils import html_to_image
 from typing import Optional, Dict, Any
-from middle.message import send_whatsapp_message
-from middle.utils import setup_logger, Constants, html_style
+from app.adapters import (  # noqa: E402
+    send_whatsapp_message,
+    handle_webhook_file,
+    get_latest_webhook_product,
+    trigger_dag,
+)
+from middle.utils import Constants, html_style
+from app.logs import get_logger
 from middle.utils.file_manipulation import extract_zip
-from middle.s3 import handle_webhook_file, get_latest_webhook_product
-from middle.airflow import trigger_dag  
+
+logger = get_logger(__name__)
 
 
 class DeckDessem():
     def __init__(self):
         self.trigger_dag = trigger_dag
         self.consts = Constants()
-        self.logger = setup_logger()    
+        self.logger = logger
     
     def run_workflow(self, filepath: Optional[str] = None, manually_date: Optional[datetime] = None):
         self.logger.info("Starting DeckDessem workflow")
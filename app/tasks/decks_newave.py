@@ -13,23 +13,25 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.webhook_products_interface import WebhookProductsInterface  # noqa: E402
+from app.adapters import http, trigger_dag  # noqa: E402
 from app.schema import WebhookSintegreSchema  # noqa: E402
+from app.offload import submit_cpu_bound  # noqa: E402
 
 from middle.utils import (  # noqa: E402
-    setup_logger,
     get_auth_header,
     Constants,
     extract_zip,
     SemanaOperativa,
 )
-from middle.airflow import trigger_dag  # noqa: E402
+from app.logs import get_logger  # noqa: E402
 from app.tasks.previsoes_carga_mensal_patamar_newave import GenerateTable  # noqa: E402
 constants = Constants()
+logger = get_logger(__name__)
 
 
 class DecksNewave(WebhookProductsInterface):
     def __init__(self, payload: Optional[WebhookSintegreSchema]):
-        self.logger = setup_logger()
+        self.logger = logger
         self.logger.debug("Initializing DecksNewave with payload: %s", payload)
         super().__init__(payload)
         self.product_date = self.payload.dataProduto
@@ -106,13 +108,19 @@ class DecksNewave(WebhookProductsInterface):
                 self.wind_updater.update_wind_data(dict_file_paths)
                 self.logger.info("Wind data update completed")
 
-            df_cadic = self.deck_processor.process_cadic_deck(dict_file_paths['cadic'])
+            # Os tres parses inewave sao independentes: com o pool de processos habilitado (app.offload)
+            # rodam em paralelo fora da GIL do worker
+            future_cadic = submit_cpu_bound(self.deck_processor.process_cadic_deck, dict_file_paths['cadic'])
+            future_system = submit_cpu_bound(self.deck_processor.process_system_deck, dict_file_paths['system'])
+            future_load_level = submit_cpu_bound(self.deck_processor.process_load_level_deck, dict_file_paths['load_level'])
+
+            df_cadic = future_cadic.result()
             self.logger.info("Processed cadic, shape: %s", df_cadic.shape)
 
-            df_system = self.deck_processor.process_system_deck(dict_file_paths['system'])
+            df_system = future_system.result()
             self.logger.info("Processed system, shape: %s", df_system.shape)
 
-            dict_load_level_data = self.deck_processor.process_load_level_deck(dict_file_paths['load_level'])
+            dict_load_level_data = future_load_level.result()
             self.logger.info("Processed load_level, keys: %s", list(dict_load_level_data.keys()))
 
             dict_processed_data = {
@@ -130,7 +138,7 @@ class DecksNewave(WebhookProductsInterface):
     def post_data(self, df_data: pd.DataFrame, url: str) -> Dict:
         self.logger.info("Posting data to URL: %s, data shape: %s", url, df_data.shape)
         try:
-            response = requests.post(
+            response = http.post(
                 url,
                 json=df_data.to_dict('records'),
                 headers=self.headers
@@ -146,7 +154,7 @@ class DecksNewave(WebhookProductsInterface):
 
 class DeckProcessor:
     def __init__(self, payload: Optional[WebhookSintegreSchema]):
-        self.logger = setup_logger()
+        self.logger = logger
         self.logger.debug("Initializing DeckProcessor with payload: %s", payload)
         self.product_date = payload.dataProduto
         self.file_name = payload.filename
@@ -494,14 +502,14 @@ class DeckProcessor:
 
 class NewaveUpdater:
     def __init__(self):
-        self.logger = setup_logger()
+        self.logger = logger
         self.logger.debug("Initializing NewaveUpdater")
         self.logger.info("NewaveUpdater initialized successfully")
 
     def get_database_data(self, endpoint: str) -> pd.DataFrame:
         self.logger.info("Fetching data from endpoint: %s", endpoint)
         try:
-            response = requests.get(endpoint, headers=get_auth_header())
+            response = http.get(endpoint, headers=get_auth_header())
             response.raise_for_status()
             data = response.json()
             df_data = pd.DataFrame(data)
@@ -589,7 +597,7 @@ class NewaveUpdater:
 
 class VazoesBinaryReader:
     def __init__(self):
-        self.logger = setup_logger()
+        self.logger = logger
         self.logger.debug("Initializing VazoesBinaryReader")
         self.postos = 320
         self.format_string = f"<{self.postos}i"
@@ -651,7 +659,7 @@ class VazoesBinaryReader:
     def post_data(self, df_data: pd.DataFrame) -> Dict:
         self.logger.info("Posting flow data, shape: %s", df_data.shape)
         try:
-            response = requests.post(
+            response = http.post(
                 constants.ENDPOINT_HISTORICO_VAZOES,
                 json=df_data.to_dict('records'),
                 headers=get_auth_header()
@@ -666,7 +674,6 @@ class VazoesBinaryReader:
 
 
 if __name__ == "__main__":
-    logger = setup_logger()
     logger.debug("Starting main execution")
     payload = {
         "dataProduto": "11/2025",
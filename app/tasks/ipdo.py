@@ -6,21 +6,20 @@ from typing import Optional
 from pdf2image import convert_from_path
 from io import BytesIO
 import pdfplumber
-import requests
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from app.schema import WebhookSintegreSchema
+from app.adapters import http, send_whatsapp_message, send_email_message  # noqa: E402
 from app.webhook_products_interface import WebhookProductsInterface
-from middle.message import send_whatsapp_message, send_email_message
 from middle.utils import (
     Constants,
     get_auth_header,
-    setup_logger,
 )
+from app.logs import get_logger
 
 constants = Constants()
-logger = setup_logger()
+logger = get_logger(__name__)
 
 
 class Ipdo(WebhookProductsInterface):
@@ -28,28 +27,35 @@ class Ipdo(WebhookProductsInterface):
         super().__init__(payload)
         
     def run_workflow(self, filepath: Optional[str] = None, manually_date: Optional[datetime] = None):
-        if not filepath:
-            filepath = self.download_files()
-    
-        self.run_process(filepath)
-        
+        return self.run_stages(filepath)
+
 
     def run_process(self, filepath: str):
-        body = self.process_file(filepath)
-        self.post_data(body)
-        imagem = self.pdf_to_jpg(filepath, 2)
-        mensagem = filepath[filepath.rfind("/")+1:-4].replace("-", " ", 1).replace("-", "/")
+        return self.run_stages(filepath)
+
+
+    def parse(self, filepath: str) -> dict:
+        return self.process_file(filepath)
+
+
+    def publish(self, body: dict) -> dict:
+        return self.post_data(body)
+
+
+    def notify(self, body: dict):
+        imagem = self.pdf_to_jpg(self.filepath, 2)
+        mensagem = self.filepath[self.filepath.rfind("/")+1:-4].replace("-", " ", 1).replace("-", "/")
         send_whatsapp_message("condicao hidrica", mensagem, imagem)
         send_email_message(
             user=constants.EMAIL_IPDO,
             destinatario=[constants.EMAIL_MIDDLE, constants.EMAIL_FRONT],
             mensagem=mensagem,
-            arquivos=[filepath]
+            arquivos=[self.filepath]
         )
 
 
     def post_data(self, process_result: dict) -> dict:
-        res = requests.post(
+        res = http.post(
             constants.ENDPOINT_IPDO, json=process_result, headers=get_auth_header()
         )
         res.raise_for_status()
@@ -57,7 +63,7 @@ class Ipdo(WebhookProductsInterface):
     
     
     def process_file(self, path: str):
-        print(f"Leitura do arquivo: {path}")
+        logger.info("Leitura do arquivo: %s", path)
         with pdfplumber.open(path) as pdf:
             texto = "".join(page.extract_text() for page in pdf.pages)
         linhas = texto.split('\n')
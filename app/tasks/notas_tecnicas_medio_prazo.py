@@ -13,11 +13,11 @@ sys.path.insert(0, str(project_root))
 from app.webhook_products_interface import WebhookProductsInterface
 from app.schema import WebhookSintegreSchema
 
-from middle.utils import setup_logger, Constants, html_to_image
+from middle.utils import Constants, html_to_image
+from app.logs import get_logger
 from middle.utils.file_manipulation import extract_zip
-from middle.message.sender import send_email_message, send_whatsapp_message
-from middle.airflow import trigger_dag
-logger = setup_logger()
+from app.adapters import send_email_message, send_whatsapp_message, trigger_dag  # noqa: E402
+logger = get_logger(__name__)
 constants = Constants()
 
 
@@ -1,6 +1,5 @@
 import sys
 import os
-import requests
 import pandas as pd
 import glob
 import pdb
@@ -12,13 +11,13 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.schema import WebhookSintegreSchema
-from middle.utils import setup_logger, Constants, get_auth_header, html_to_image, html_style
+from app.adapters import http, send_whatsapp_message, trigger_dag  # noqa: E402
+from middle.utils import Constants, get_auth_header, html_to_image, html_style
+from app.logs import get_logger
 from app.webhook_products_interface import WebhookProductsInterface
 from middle.utils.file_manipulation import extract_zip
-from middle.message.sender import send_whatsapp_message
-from middle.airflow import trigger_dag
 
-logger = setup_logger()
+logger = get_logger(__name__)
 constants = Constants()
 
 class CargaPatamarNewave(WebhookProductsInterface):
@@ -129,7 +128,7 @@ class CargaPatamarNewave(WebhookProductsInterface):
     def post_data(self, process_result: pd.DataFrame) -> dict:
         logger.info("Inserindo valores de vazão observado do produto Previsões de Carga Mensal por Patamar do Newave. Qntd de linhas inseridas: %d", len(process_result))
         try:
-            res = requests.post(
+            res = http.post(
                 url=self.post_previsoes_carga,
                 json=process_result.to_dict('records'),
                 headers=get_auth_header()
@@ -254,7 +253,7 @@ class UpdateSistemaCadic:
     def _get_data(self, url: str, params) -> pd.DataFrame:
         logger.debug("Fetching data from URL: %s with params: %s", url, params)  
         try:
-            res = requests.get(url, headers=self.headers, params=params)
+            res = http.get(url, headers=self.headers, params=params)
             if res.status_code != 200:
                 logger.error("Failed to fetch data from %s, status: %d, response: %s", url, res.status_code, res.text)  
                 res.raise_for_status()
@@ -267,7 +266,7 @@ class UpdateSistemaCadic:
     def _put_data(self, url: str, data_in: pd.DataFrame):
         logger.debug("Putting data to URL: %s, DataFrame shape: %s", url, data_in.shape)  
         try:
-            res = requests.put(url, json=data_in.to_dict('records'), headers=self.headers)
+            res = http.put(url, json=data_in.to_dict('records'), headers=self.headers)
             if res.status_code != 200:
                 logger.error("Failed to put data to %s, status: %d, response: %s", url, res.status_code, res.text)  
                 res.raise_for_status()
@@ -409,7 +408,7 @@ class GerarDeckQuadrimestral:
     def _get_data(self, url: str, params) -> pd.DataFrame:
         logger.debug("Fetching data from URL: %s with params: %s", url, params)  
         try:
-            res = requests.get(url, headers=self.headers, params=params)
+            res = http.get(url, headers=self.headers, params=params)
             if res.status_code != 200:
                 logger.error("Failed to fetch data from %s, status: %d, response: %s", url, res.status_code, res.text)  
                 res.raise_for_status()
@@ -422,7 +421,7 @@ class GerarDeckQuadrimestral:
     def _post_data(self, url: str, df: pd.DataFrame) -> pd.DataFrame:
         logger.debug("Posting data to URL: %s, DataFrame shape: %s", url, df.shape)  
         try:
-            res = requests.post(
+            res = http.post(
                 url,
                 headers=self.headers,
                 json=df.to_dict('records'),
@@ -533,7 +532,7 @@ class GenerateTable:
     def get_data(self, url: str) -> pd.DataFrame:
         logger.debug("Fetching data from URL: %s", url)  
         try:
-            res = requests.get(url, headers=self.headers)
+            res = http.get(url, headers=self.headers)
             if res.status_code != 200:
                 logger.error("Failed to fetch data from %s, status: %d, response: %s", url, res.status_code, res.text)  
                 res.raise_for_status()
@@ -6,21 +6,98 @@ import sys
 import glob
 import os
 import json
-import requests
 import math
 from datetime import datetime
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.webhook_products_interface import WebhookProductsInterface
+from app.adapters import http  # noqa: E402
 from app.schema import WebhookSintegreSchema
 
-from middle.utils import setup_logger, Constants, get_auth_header
+from middle.utils import Constants, get_auth_header
+from app.logs import get_logger
 from middle.utils.file_manipulation import extract_zip
-logger = setup_logger()
+from app.offload import run_cpu_bound
+logger = get_logger(__name__)
 constants = Constants()
 
 
+def parse_vazoes_observadas(file_path, path_info_vazoes_obs_json) -> pd.DataFrame:
+    """Lê as vazões observadas de cada trecho da planilha conforme o info_vazao_obs.json."""
+    logger.info("Processando arquivos do produto... Arquivo encontrado: %s", file_path)
+    try:
+
+        df_load = pd.ExcelFile(file_path)
+
+        with open(path_info_vazoes_obs_json, encoding='utf-8') as f:
+            infoTrechos = json.load(f)
+
+        process_result = []	
+        for index, station_info in enumerate(infoTrechos):
+            trecho = station_info
+
+            nomeArquivoSaida = trecho
+            tipoVazao = infoTrechos[station_info]['iniciais']
+            sheet_name = infoTrechos[station_info]['sheet']
+            codigoEstacao = infoTrechos[station_info]['codigoEstacao']
+
+            logger.debug("%s (%d/%d)", nomeArquivoSaida, index + 1, len(infoTrechos))
+
+            df = df_load.parse(sheet_name, header=[4,6])
+            df.index = df['Unnamed: 0_level_0']['DATA']
+            df = df.drop( 'Unnamed: 0_level_0', axis=1, level=0)
+            df = df[df.index.notnull()]
+
+            for ii, comp in enumerate(infoTrechos[station_info]['composicao']):
+
+                if 'sheet' not in infoTrechos[station_info]['composicao'][comp]:
+                    vazComp = df[comp][infoTrechos[station_info]['composicao'][comp]['tipoVazao']]
+
+                else:
+                    df_temp = df_load.parse(infoTrechos[station_info]['composicao'][comp]['sheet'], header=[4,6])
+                    df_temp.index = df_temp['Unnamed: 0_level_0']['DATA']
+                    df_temp = df_temp.drop( 'Unnamed: 0_level_0', axis=1, level=0)
+                    df_temp = df_temp[df_temp.index.notnull()]
+                    vazComp = df_temp[comp][infoTrechos[station_info]['composicao'][comp]['tipoVazao']]
+
+                if ii == 0:
+                    vaz_out = vazComp
+                else:
+                    if 'tempoViagem' in infoTrechos[station_info]['composicao'][comp]:
+                        tempoViagem = infoTrechos[station_info]['composicao'][comp]['tempoViagem']
+
+                        diasViagem = math.ceil(tempoViagem/24)
+
+                        if nomeArquivoSaida == 'FOA':
+                            vaz_out -= (tempoViagem/(diasViagem*24))*vazComp + ((diasViagem*24 - tempoViagem)/(diasViagem*24))*vazComp.shift(periods=diasViagem)
+                        else:
+                            vaz_out += (tempoViagem/(diasViagem*24))*vazComp.shift(periods=diasViagem) + ((diasViagem*24 - tempoViagem)/(diasViagem*24))*vazComp
+                    else:
+                        vaz_out += vazComp
+            if nomeArquivoSaida == 'GOV. JAYME CANET':
+                nomeArquivoSaida = 'MAUA'
+
+            for dt, vaz in vaz_out.items():
+                process_result.append([nomeArquivoSaida, codigoEstacao, tipoVazao, dt.strftime('%Y-%m-%d 00:00:00'), round(vaz,2)])
+
+        process_result = pd.DataFrame(process_result)
+        process_result = process_result.dropna()
+
+        process_result.rename(columns={0:'txt_subbacia', 1:'cd_estacao', 2:'txt_tipo_vaz', 3:'dt_referente', 4:'vl_vaz'}, inplace=True)
+
+        process_result['cd_estacao'] = process_result['cd_estacao'].astype(int)
+        process_result['dt_referente'] = pd.to_datetime(process_result['dt_referente']).dt.strftime('%Y-%m-%d')
+        process_result['vl_vaz'] = process_result['vl_vaz'].astype(float)
+
+        return process_result
+
+    except Exception as e:
+        logger.error("Falha em processar os arquivos do produto: %s", str(e), exc_info=True)
+        raise
+
+
+
 class RelatorioAcompanhamentoHidrologico(WebhookProductsInterface):
     
     def __init__(self, payload: Optional[WebhookSintegreSchema]):
@@ -49,83 +126,15 @@ class RelatorioAcompanhamentoHidrologico(WebhookProductsInterface):
     
     
     def process_file(self, file_path):
-        logger.info("Processando arquivos do produto... Arquivo encontrado: %s", file_path)
-        try:
-            
-            df_load = pd.ExcelFile(file_path)
-            
-            with open(self.PATH_INFO_VAZOES_OBS_JSON, encoding='utf-8') as f:
-                infoTrechos = json.load(f)
-            
-            process_result = []	
-            for index, station_info in enumerate(infoTrechos):
-                trecho = station_info
-
-                nomeArquivoSaida = trecho
-                tipoVazao = infoTrechos[station_info]['iniciais']
-                sheet_name = infoTrechos[station_info]['sheet']
-                codigoEstacao = infoTrechos[station_info]['codigoEstacao']
-
-                print(nomeArquivoSaida+' ('+str(index+1)+'/'+str(len(infoTrechos))+')')
-
-                df = df_load.parse(sheet_name, header=[4,6])
-                df.index = df['Unnamed: 0_level_0']['DATA']
-                df = df.drop( 'Unnamed: 0_level_0', axis=1, level=0)
-                df = df[df.index.notnull()]
-
-                for ii, comp in enumerate(infoTrechos[station_info]['composicao']):
-                
-                    if 'sheet' not in infoTrechos[station_info]['composicao'][comp]:
-                        vazComp = df[comp][infoTrechos[station_info]['composicao'][comp]['tipoVazao']]
-
-                    else:
-                        df_temp = df_load.parse(infoTrechos[station_info]['composicao'][comp]['sheet'], header=[4,6])
-                        df_temp.index = df_temp['Unnamed: 0_level_0']['DATA']
-                        df_temp = df_temp.drop( 'Unnamed: 0_level_0', axis=1, level=0)
-                        df_temp = df_temp[df_temp.index.notnull()]
-                        vazComp = df_temp[comp][infoTrechos[station_info]['composicao'][comp]['tipoVazao']]
-
-                    if ii == 0:
-                        vaz_out = vazComp
-                    else:
-                        if 'tempoViagem' in infoTrechos[station_info]['composicao'][comp]:
-                            tempoViagem = infoTrechos[station_info]['composicao'][comp]['tempoViagem']
-
-                            diasViagem = math.ceil(tempoViagem/24)
-
-                            if nomeArquivoSaida == 'FOA':
-                                vaz_out -= (tempoViagem/(diasViagem*24))*vazComp + ((diasViagem*24 - tempoViagem)/(diasViagem*24))*vazComp.shift(periods=diasViagem)
-                            else:
-                                vaz_out += (tempoViagem/(diasViagem*24))*vazComp.shift(periods=diasViagem) + ((diasViagem*24 - tempoViagem)/(diasViagem*24))*vazComp
-                        else:
-                            vaz_out += vazComp
-                if nomeArquivoSaida == 'GOV. JAYME CANET':
-                    nomeArquivoSaida = 'MAUA'
-
-                for dt, vaz in vaz_out.items():
-                    process_result.append([nomeArquivoSaida, codigoEstacao, tipoVazao, dt.strftime('%Y-%m-%d 00:00:00'), round(vaz,2)])
-            
-            process_result = pd.DataFrame(process_result)
-            process_result = process_result.dropna()
-            
-            process_result.rename(columns={0:'txt_subbacia', 1:'cd_estacao', 2:'txt_tipo_vaz', 3:'dt_referente', 4:'vl_vaz'}, inplace=True)
-            
-            process_result['cd_estacao'] = process_result['cd_estacao'].astype(int)
-            process_result['dt_referente'] = pd.to_datetime(process_result['dt_referente']).dt.strftime('%Y-%m-%d')
-            process_result['vl_vaz'] = process_result['vl_vaz'].astype(float)
-
-            return process_result
-            
-        except Exception as e:
-            logger.error("Falha em processar os arquivos do produto: %s", str(e), exc_info=True)
-            raise
+        # O parse da planilha segura a GIL: roda no pool de processos quando habilitado (app.offload)
+        return run_cpu_bound(parse_vazoes_observadas, file_path, self.PATH_INFO_VAZOES_OBS_JSON)
         
         
     def post_data(self, process_result: pd.DataFrame) -> dict:
         
         logger.info("Inserindo valores de vazão observado do produto Relatório de Acompanhamento Hídrico. Qntd de linhas inseridas: %d", len(process_result))
         try:
-            res = requests.post(
+            res = http.post(
                 self.consts.POST_RODADAS_VAZAO_OBSERVADA_PDP,
                 json=process_result.to_dict('records'),
                 headers=get_auth_header()
@@ -13,19 +13,19 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.schema import WebhookSintegreSchema  # noqa: E402
+from app.adapters import http, send_whatsapp_message, trigger_dag  # noqa: E402
 from middle.utils import ( # noqa: E402
-    setup_logger,
     Constants,
     get_auth_header,
     extrair_mes_ano,
     html_to_image,
     html_style,
 )
+from app.logs import get_logger  # noqa: E402
 from app.webhook_products_interface import WebhookProductsInterface  # noqa: E402
-from middle.message import send_whatsapp_message
-from middle.airflow import trigger_dag
+from app.offload import run_cpu_bound  # noqa: E402
 
-logger = setup_logger()
+logger = get_logger(__name__)
 constants = Constants()
 
 MONTHS = {
@@ -33,6 +33,26 @@ MONTHS = {
     7: "Julho", 8: "Agosto", 9: "Setembro", 10: "Outubro", 11: "Novembro", 12: "Dezembro"
 }
 
+def extract_limits_table(pdf_path: str, table_name: str) -> Optional[pd.DataFrame]:
+    """Extrai a primeira tabela da página que contém `table_name`, abrindo o PDF uma única vez."""
+    # Função de módulo (e não método) para poder rodar no pool de processos de app.offload
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            if table_name not in (page.extract_text() or ""):
+                continue
+            tables = page.extract_tables()
+            if not tables:
+                logger.warning("Nenhuma tabela encontrada na página especificada.")
+                return None
+            df = pd.DataFrame(tables[0])
+            df.columns = df.iloc[0]
+            df = df[1:]
+            df.reset_index(drop=True, inplace=True)
+            return df
+    logger.warning("Tabela não encontrada no PDF.")
+    return None
+
+
 class RelatorioLimitesIntercambioDecomp(WebhookProductsInterface):
     
     def __init__(self, payload: Optional[WebhookSintegreSchema]):
@@ -161,15 +181,10 @@ class RelatorioLimitesIntercambioDecomp(WebhookProductsInterface):
             'FSENE': 431, 'FSUL': 437, 'RSUL': 439, 'RSE': 441, '-RSE': 443, 'FETXG+FTRXG': 445,
             'FXGET+FXGTR': 447
         }
-        table_page = self.find_table_page(pdf_path, table_name)
-        if table_page is None:
-            logger.warning("Tabela não encontrada no PDF.")
-            return None
-        else:
-            df = self.extract_table_from_pdf(pdf_path, table_page)
-            if df is not None:
-                return self.reformat_df_database(df, dict_num, data_produto)
-            return None
+        df = run_cpu_bound(extract_limits_table, pdf_path, table_name)
+        if df is not None:
+            return self.reformat_df_database(df, dict_num, data_produto)
+        return None
 
 
     def sanitaze_dataframe(self, df: pd.DataFrame):
@@ -183,7 +198,7 @@ class RelatorioLimitesIntercambioDecomp(WebhookProductsInterface):
 
 
     def post_data(self, df: pd.DataFrame):
-        res = requests.post(
+        res = http.post(
             constants.POST_RESTRICOES_ELETRICAS,
             headers=get_auth_header(),
             json=df.to_dict(orient='records'),
@@ -213,7 +228,7 @@ class GenerateTable:
       
     def get_data(self, url_in: str, params:dict={}) -> pd.DataFrame:
         try:
-            res = requests.get(
+            res = http.get(
                 url = url_in,
                 params=params,
                 headers=self.header
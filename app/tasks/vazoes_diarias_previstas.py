@@ -12,14 +12,15 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.webhook_products_interface import WebhookProductsInterface
+from app.adapters import http, send_email_message  # noqa: E402
 from app.schema import WebhookSintegreSchema
 
-from middle.utils import setup_logger, extract_zip, Constants
-from middle.message.sender import send_email_message
+from middle.utils import extract_zip, Constants
+from app.logs import get_logger
 from middle.utils import ( 
     get_auth_header
 )
-logger = setup_logger()
+logger = get_logger(__name__)
 constants = Constants()
 
 
@@ -115,7 +116,7 @@ class VazoesDiariasPrevistasPDP(WebhookProductsInterface):
         
     def post_data(self, process_result: pd.DataFrame) -> dict:
         try:
-            res = requests.post(
+            res = http.post(
                 constants.POST_PREV_ENA,
                 json=process_result.to_dict('records'),
                 headers=self.headers
@@ -269,7 +270,7 @@ class GeradorTabela:
         
     def _get_data(self, url_in: str, params:dict={}) -> pd.DataFrame:
         try:
-            res = requests.get(
+            res = http.get(
                 url = url_in,
                 params=params,
                 headers=self.header
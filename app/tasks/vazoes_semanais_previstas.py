@@ -8,20 +8,19 @@ import os
 import re
 import numpy as np
 import datetime
-import requests
 
 current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from app.webhook_products_interface import WebhookProductsInterface
+from app.adapters import http, send_email_message, send_whatsapp_message, trigger_dag  # noqa: E402
 from app.schema import WebhookSintegreSchema
 
-from middle.utils import setup_logger, Constants, html_to_image, get_auth_header
+from middle.utils import Constants, html_to_image, get_auth_header
+from app.logs import get_logger
 from middle.utils.file_manipulation import extract_zip
 from middle.utils.date_utils import SemanaOperativa
-from middle.message.sender import send_email_message, send_whatsapp_message
-from middle.airflow import trigger_dag
-logger = setup_logger()
+logger = get_logger(__name__)
 constants = Constants()
 
 
@@ -166,7 +165,7 @@ class VazoesSemanaisPrevistasPMO(WebhookProductsInterface):
         df_ena_bacia = df_SE[df_SE[0].isin(bacias)].copy()
         df_ena_bacia = pd.concat([df_ena_bacia,df_S_NE_N[df_S_NE_N[0].isin(bacias)].copy()])
 
-        bacias_segmentadas = requests.get(
+        bacias_segmentadas = http.get(
                 constants.GET_ONS_BACIAS_SEGMENTADAS,
                 headers=get_auth_header()
         ).json()
@@ -223,7 +222,7 @@ class VazoesSemanaisPrevistasPMO(WebhookProductsInterface):
             df_tb_ve = process_result['df_load_tb_ve']
             df_tb_ve_bacias = process_result['df_load_tb_ve_bacias']    
             
-            res = requests.post(
+            res = http.post(
                 constants.POST_PREV_SEMANAL_ENA,   
                 headers=get_auth_header(),
                 json=df_tb_ve.to_dict(orient='records')
@@ -235,7 +234,7 @@ class VazoesSemanaisPrevistasPMO(WebhookProductsInterface):
                 raise Exception("Falha ao enviar dados da tabela TB_VE. Status Code: {}".format(res.status_code)) 
             
             
-            res_bacias = requests.post(
+            res_bacias = http.post(
                 constants.POST_PREV_SEMANAL_ENA_POR_BACIA,   
                 headers=get_auth_header(),          
                 json=df_tb_ve_bacias.to_dict(orient='records')
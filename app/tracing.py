@@ -0,0 +1,184 @@
+"""
+Tracing das execucoes de produtos sem backend: cada workflow gera uma arvore de spans (workflow -> etapas ->
+chamadas de S3, HTTP, Airflow e mensageria) que e gravada em TRACING_FILE quando o span raiz termina.
+
+Formatos (TRACING_FORMAT):
+- jsonl: um span por linha, com trace_id/span_id/parent_id, inicio, duracao e atributos;
+- otlp: uma linha por trace no formato OTLP/JSON (ExportTraceServiceRequest), o mesmo do file exporter do
+  OpenTelemetry Collector, para importar em Jaeger/Tempo quando necessario.
+
+O span corrente fica num ContextVar, entao threads abertas com contextvars.copy_context()/asyncio.to_thread
+continuam a mesma arvore.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+from .logs import get_logger
+from .settings import settings
+
+logger = get_logger(__name__)
+
+SERVICE_NAME = "tasks-webhook-ons"
+
+FORMAT_JSONL = "jsonl"
+FORMAT_OTLP = "otlp"
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = STATUS_OK
+    error: Optional[str] = None
+    # Spans finalizados do mesmo trace, compartilhado a partir do raiz
+    _finished: List["Span"] = field(default_factory=list, repr=False)
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.error = f"{type(error).__name__}: {error}"
+
+    def finish(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self._finished.append(self)
+        if self.parent_id is None:
+            _export(self._finished)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Cria um span filho do span corrente (ou raiz de um novo trace) sem torna-lo corrente.
+    Util para intervalos que comecam e terminam em callbacks diferentes, como os event hooks do httpx.
+    Quem chama deve chamar finish(); retorna None com o tracing desligado.
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+    parent = _current_span.get()
+    if parent is None:
+        return Span(name, secrets.token_hex(16), secrets.token_hex(8), attributes=attributes)
+    return Span(
+        name, parent.trace_id, secrets.token_hex(8), parent.span_id, attributes=attributes, _finished=parent._finished
+    )
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Abre um span filho do corrente, tornando-o corrente dentro do bloco; excecoes marcam o span com erro.
+    """
+    current = start_span(name, **attributes)
+    if current is None:
+        yield None
+        return
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+
+
+_export_lock = threading.Lock()
+
+
+def _export(spans: List[Span]):
+    if not settings.TRACING_FILE:
+        return
+    if settings.TRACING_FORMAT == FORMAT_OTLP:
+        lines = [json.dumps(to_otlp(spans), ensure_ascii=False, default=str)]
+    else:
+        lines = [json.dumps(s.to_dict(), ensure_ascii=False, default=str) for s in spans]
+    try:
+        with _export_lock:
+            os.makedirs(os.path.dirname(settings.TRACING_FILE) or ".", exist_ok=True)
+            _rotate(settings.TRACING_FILE)
+            with open(settings.TRACING_FILE, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+    except OSError as e:
+        # Falha ao gravar o trace nao pode derrubar o produto
+        logger.warning(f"Falha ao exportar trace para {settings.TRACING_FILE}: {e}")
+
+
+def _rotate(path: str):
+    if settings.TRACING_MAX_BYTES and os.path.exists(path) and os.path.getsize(path) >= settings.TRACING_MAX_BYTES:
+        os.replace(path, f"{path}.1")
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> dict:
+    """
+    Converte os spans de um trace para o JSON de ExportTraceServiceRequest do OTLP.
+    """
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": __name__},
+            "spans": [{
+                "traceId": s.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                # SPAN_KIND_INTERNAL
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+                "status": {"code": 2, "message": s.error} if s.status == STATUS_ERROR else {"code": 1},
+            } for s in spans],
+        }],
+    }]}
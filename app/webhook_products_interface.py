@@ -1,12 +1,16 @@
 import os
+import contextvars
 from abc import ABC, abstractmethod
-from middle import s3
-from middle.utils import setup_logger, extract_zip
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from . import adapters
+from middle.utils import extract_zip
+from .logs import get_logger
+from typing import Optional, Dict, Any, List, Tuple
+from .pipeline import StageMetrics, timed_stage
 from .schema import WebhookSintegreSchema
 import pandas as pd
 from middle.utils import Constants
-logger = setup_logger()
+logger = get_logger(__name__)
 constants = Constants()
 
 class WebhookProductsInterface(ABC):
@@ -15,9 +19,14 @@ class WebhookProductsInterface(ABC):
     Define os metodos base que devem ser implementados no ETL dos produtos do webhook.
     """
     
+    # Etapas finais independentes entre si, executadas em paralelo pelo run_stages
+    concurrent_stages: Tuple[str, ...] = ("notify", "trigger")
+
     def __init__(self, payload: Optional[WebhookSintegreSchema] = None):
         self.payload:WebhookSintegreSchema = payload
         self.run_workflow_results:dict = {}
+        self.stage_metrics: List[StageMetrics] = []
+        self.filepath: Optional[str] = None
 
 
 
@@ -47,7 +56,7 @@ class WebhookProductsInterface(ABC):
         logger.debug("Criado caminho temporário para o arquivo: %s", path_to_send)
         
         try: 
-            filepath_to_extract = s3.download_from_s3(id_produto, filename, path_to_send)
+            filepath_to_extract = adapters.download_from_s3(id_produto, filename, path_to_send, s3_key=self.payload.s3Key)
             logger.info(f"Arquivo {filename} baixado com sucesso para {path_to_send}")
             
             return filepath_to_extract
@@ -56,5 +65,99 @@ class WebhookProductsInterface(ABC):
             
             logger.error(f"Erro ao baixar arquivo do S3: {e}")
             raise Exception(f"Erro ao baixar arquivo do S3: {e}")
-    
-        
\ No newline at end of file
+
+    def fetch(self) -> str:
+        """
+        Etapa fetch: obtem o arquivo do produto. Por padrao baixa do S3 com o download_files.
+        """
+        return self.download_files()
+
+    def extract(self, filepath: str) -> Any:
+        """
+        Etapa extract: descompacta ou localiza os arquivos a serem lidos a partir do arquivo baixado.
+        """
+        return filepath
+
+    def parse(self, extracted: Any) -> Any:
+        """
+        Etapa parse: le os arquivos e devolve os dados brutos do produto.
+        """
+        return extracted
+
+    def transform(self, parsed: Any) -> Any:
+        """
+        Etapa transform: converte os dados brutos no formato enviado para a API.
+        """
+        return parsed
+
+    def publish(self, data: Any) -> Any:
+        """
+        Etapa publish: envia os dados tratados para a API.
+        """
+        return None
+
+    def notify(self, data: Any):
+        """
+        Etapa notify: envia WhatsApp/e-mail sobre o produto processado.
+        """
+        return None
+
+    def trigger(self, data: Any):
+        """
+        Etapa trigger: dispara as dags que dependem do produto.
+        """
+        return None
+
+    def run_stages(self, filepath: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Executa o pipeline fetch -> extract -> parse -> transform -> publish -> notify/trigger,
+        registrando tempo de parede, tempo de CPU e linhas de cada etapa em `stage_metrics`.
+        Etapas nao sobrescritas pelo produto sao puladas; com `filepath` informado o fetch tambem e pulado.
+        """
+        self.stage_metrics = []
+        try:
+            self.filepath = filepath if filepath else self._run_stage("fetch")
+            value = self.filepath
+            for name in ("extract", "parse", "transform"):
+                if self._stage_implemented(name):
+                    value = self._run_stage(name, value)
+            if self._stage_implemented("publish"):
+                self._run_stage("publish", value)
+            self._run_final_stages(value)
+        finally:
+            self._log_stage_metrics()
+        self.run_workflow_results["stages"] = [m.to_dict() for m in self.stage_metrics]
+        return self.run_workflow_results
+
+    def _log_stage_metrics(self):
+        logger.info(
+            f"Etapas de {type(self).__name__}: "
+            + ", ".join(
+                f"{m.name}={m.wall_time}s/cpu {m.cpu_time}s/{m.rows} linhas"
+                + (f"/{m.memory_bytes / 1024 ** 2:.1f} MB" if m.memory_bytes is not None else "")
+                for m in self.stage_metrics
+            )
+        )
+
+    def _stage_implemented(self, name: str) -> bool:
+        return getattr(type(self), name) is not getattr(WebhookProductsInterface, name)
+
+    def _run_stage(self, name: str, *args: Any) -> Any:
+        return timed_stage(self, name, getattr(self, name), *args, record=self.stage_metrics)
+
+    def _run_final_stages(self, data: Any):
+        stages = [name for name in ("notify", "trigger") if self._stage_implemented(name)]
+        concurrent = [name for name in stages if name in self.concurrent_stages]
+        for name in stages:
+            if name not in concurrent or len(concurrent) == 1:
+                self._run_stage(name, data)
+        if len(concurrent) < 2:
+            return
+        # Cada etapa roda numa copia do contexto para levar adiante os contextvars da execucao (job, trace)
+        with ThreadPoolExecutor(max_workers=len(concurrent), thread_name_prefix="webhook-stage") as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._run_stage, name, data) for name in concurrent
+            ]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            raise errors[0]
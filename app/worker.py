@@ -0,0 +1,278 @@
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional, TextIO, Tuple
+from .logs import get_logger
+from .resources import pid_alive, process_start_token
+from .schema import WebhookSintegreSchema
+
+logger = get_logger(__name__)
+
+
+def process_raw_payload(
+    raw: Any,
+    handler: Callable[[WebhookSintegreSchema], Any],
+) -> Dict[str, Any]:
+    """
+    Valida um payload cru (dict ou JSON) e executa o handler, retornando um registro com o resultado e o tempo gasto.
+    """
+    started_at = time.perf_counter()
+    record: Dict[str, Any] = {
+        "webhookId": None,
+        "nome": None,
+        "status": "succeeded",
+        "error": None,
+        "started_at": datetime.now().isoformat(),
+    }
+    payload = None
+    try:
+        if isinstance(raw, (str, bytes)):
+            raw = json.loads(raw)
+        payload = WebhookSintegreSchema(**raw)
+        record["webhookId"] = payload.webhookId
+        handler(payload)
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = f"{type(e).__name__}: {e}"
+        logger.error(f"Falha ao processar payload {record['webhookId']}: {e}", exc_info=True)
+    if payload is not None:
+        record["nome"] = payload.nome
+    record["finished_at"] = datetime.now().isoformat()
+    record["duration"] = round(time.perf_counter() - started_at, 4)
+    return record
+
+
+def run_ndjson_batch(
+    stream: TextIO,
+    handler: Callable[[WebhookSintegreSchema], Any],
+    parallel: int = 1,
+    output: Optional[TextIO] = None,
+) -> Dict[str, int]:
+    """
+    Processa um lote de payloads em NDJSON (um JSON por linha) com ate `parallel` execucoes simultaneas.
+    Cada resultado e escrito em `output` como uma linha JSON assim que o payload termina.
+    """
+    output = output or sys.stdout
+    summary = {"total": 0, "succeeded": 0, "failed": 0}
+    slots = threading.BoundedSemaphore(max(parallel, 1))
+    output_lock = threading.Lock()
+
+    def process(line_number: int, line: str):
+        try:
+            record = {"line": line_number, **process_raw_payload(line, handler)}
+            with output_lock:
+                summary[record["status"]] += 1
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=max(parallel, 1), thread_name_prefix="webhook-batch") as executor:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            # Le a proxima linha so quando ha vaga, para nao carregar o lote inteiro em memoria
+            slots.acquire()
+            summary["total"] += 1
+            executor.submit(process, line_number, line)
+    return summary
+
+
+class SpoolQueue:
+    """
+    Fila local baseada em diretorio: cada arquivo *.json em `directory` e um payload.
+    O arquivo e movido para processing/<host>__<pid>-<token>__<nome> ao ser reservado e para done/ ou failed/
+    ao final; o token (process_start_token) distingue execucoes com o mesmo pid, como o PID 1 de um container
+    reiniciado. Ao iniciar, arquivos deixados em processing/ por uma execucao deste host que nao existe mais
+    (worker que caiu no meio da execucao) voltam para a fila; os de outros hosts sao apenas reportados.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 1.0):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        pid = os.getpid()
+        token = process_start_token(pid) or f"{time.time_ns():x}"
+        self.owner = f"{socket.gethostname()}__{pid}-{token}"
+        for subdir in ("processing", "done", "failed"):
+            os.makedirs(os.path.join(directory, subdir), exist_ok=True)
+        self.recover()
+
+    @staticmethod
+    def original_name(item_id: str) -> str:
+        return os.path.basename(item_id).split("__", 2)[-1]
+
+    def recover(self) -> int:
+        """
+        Devolve a fila os payloads reservados por execucoes encerradas deste host. Retorna quantos voltaram.
+        """
+        host = socket.gethostname()
+        recovered = 0
+        processing_dir = os.path.join(self.directory, "processing")
+        for entry in os.scandir(processing_dir):
+            if not entry.is_file() or not entry.name.endswith(".json"):
+                continue
+            parts = entry.name.split("__", 2)
+            if len(parts) == 3:
+                owner_host, owner_run, name = parts
+                if owner_host != host:
+                    logger.warning("Payload %s reservado pelo host %s continua em processing/", name, owner_host)
+                    continue
+                if self._owner_running(owner_run):
+                    continue
+            else:
+                # Reservado antes do nome levar o dono: nao ha como saber se o processo vive
+                name = entry.name
+            try:
+                os.rename(entry.path, os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            recovered += 1
+            logger.warning("Payload %s deixado em processing/ por um worker interrompido voltou para a fila", name)
+        return recovered
+
+    def _owner_running(self, owner: str) -> bool:
+        # owner e "<pid>-<token>" (ou so "<pid>" em arquivos antigos)
+        if f"{socket.gethostname()}__{owner}" == self.owner:
+            # Chamado antes da primeira reserva: nada em processing/ pode ser desta execucao
+            return False
+        pid, _, token = owner.partition("-")
+        if not pid.isdigit() or not pid_alive(int(pid)):
+            return False
+        current = process_start_token(int(pid))
+        return not token or current is None or current == token
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        while True:
+            claimed = self._claim_next()
+            if claimed is None:
+                yield None
+                time.sleep(self.poll_interval)
+                continue
+            yield claimed
+
+    def _claim_next(self) -> Optional[Tuple[str, str]]:
+        pending = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file() and entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in pending:
+            processing_path = os.path.join(self.directory, "processing", f"{self.owner}__{entry.name}")
+            try:
+                # rename e atomico: se outro worker reservou o arquivo antes, segue para o proximo
+                os.rename(entry.path, processing_path)
+            except FileNotFoundError:
+                continue
+            with open(processing_path, encoding="utf-8") as f:
+                return processing_path, f.read()
+        return None
+
+    def ack(self, item_id: str, record: Dict[str, Any]):
+        target_dir = "done" if record["status"] == "succeeded" else "failed"
+        target_path = os.path.join(self.directory, target_dir, self.original_name(item_id))
+        os.replace(item_id, target_path)
+        with open(target_path[:-len(".json")] + ".result.json", "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+
+
+class StdinQueue:
+    """
+    Fila lida da entrada padrao: um payload JSON por linha. Termina no EOF.
+    A leitura espera no maximo `poll_interval` por vez (select), para o Worker poder atender SIGTERM/SIGINT
+    mesmo sem nada chegando na entrada.
+    """
+
+    def __init__(self, stream=None, poll_interval: float = 1.0):
+        self.stream = stream or sys.stdin
+        self.poll_interval = poll_interval
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        try:
+            fd = self.stream.fileno()
+        except (AttributeError, OSError, ValueError):
+            fd = None
+        lines = self._lines(fd) if fd is not None else (line for line in self.stream)
+        line_number = 0
+        for line in lines:
+            if line is None:
+                yield None
+                continue
+            line_number += 1
+            if line.strip():
+                yield f"stdin:{line_number}", line
+
+    def _lines(self, fd: int) -> Iterator[Optional[str]]:
+        # Le direto do descritor: o buffer do TextIO esconderia do select linhas ja lidas
+        buffer = b""
+        while True:
+            ready, _, _ = select.select([fd], [], [], self.poll_interval)
+            if not ready:
+                yield None
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                yield line.decode("utf-8")
+        if buffer:
+            yield buffer.decode("utf-8")
+
+    def ack(self, item_id: str, record: Dict[str, Any]):
+        print(json.dumps({"id": item_id, **record}, ensure_ascii=False), flush=True)
+
+
+class Worker:
+    """
+    Processo residente que consome payloads de uma fila local e os executa pelo handler do webhook,
+    reaproveitando os modulos ja importados entre um evento e outro.
+    """
+
+    def __init__(
+        self,
+        queue,
+        handler: Callable[[WebhookSintegreSchema], Any],
+        workers: int = 1,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.workers = max(workers, 1)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        logger.info("Sinal de parada recebido, aguardando jobs em andamento")
+        self._stop.set()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        logger.info(f"Worker iniciado com {self.workers} execucao(oes) em paralelo")
+        items = iter(self.queue)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="webhook-worker") as executor:
+            while not self._stop.is_set():
+                # Reserva a vaga antes de retirar o item da fila, para nao segurar payloads sem poder executa-los
+                self._slots.acquire()
+                item = next(items, StopIteration)
+                if item is StopIteration:
+                    self._slots.release()
+                    break
+                if item is None:
+                    self._slots.release()
+                    continue
+                executor.submit(self._process, *item)
+        logger.info("Worker finalizado")
+
+    def _process(self, item_id: str, raw: str):
+        try:
+            record = process_raw_payload(raw, self.handler)
+            self.queue.ack(item_id, record)
+        finally:
+            self._slots.release()
@@ -0,0 +1,101 @@
+"""
+Custo de carregamento de cada produto do PRODUCT_MAPPING.
+
+Para cada handler, sobe um interpretador novo, importa o registro de produtos e resolve a
+entrada, medindo tempo de import e memoria residente (RSS) antes e depois.
+
+Uso:
+    python benchmarks/import_cost.py [--produto CHAVE ...] [--json saida.json]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+_PROBE = r"""
+import json, os, resource, sys, time
+sys.path.insert(0, {root!r})
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+rss_start = rss_bytes()
+t0 = time.perf_counter()
+from app.constants import PRODUCT_MAPPING
+t1 = time.perf_counter()
+rss_registry = rss_bytes()
+modules_registry = len(sys.modules)
+error = None
+try:
+    PRODUCT_MAPPING[{key!r}]
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+t2 = time.perf_counter()
+print(json.dumps({{
+    "registry_import_s": t1 - t0,
+    "product_import_s": t2 - t1,
+    "rss_start": rss_start,
+    "rss_registry": rss_registry,
+    "rss_product": rss_bytes(),
+    "modules_registry": modules_registry,
+    "modules_product": len(sys.modules),
+    "error": error,
+}}))
+"""
+
+
+def measure(key: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(root=str(project_root), key=key)],
+        capture_output=True, text=True, cwd=project_root,
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        return {"produto": key, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "sem saida"}
+    return {"produto": key, **json.loads(proc.stdout.strip().splitlines()[-1])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produto", action="append", help="Chave do PRODUCT_MAPPING (padrao: todas com handler)")
+    parser.add_argument("--json", help="Arquivo onde gravar os resultados em JSON")
+    args = parser.parse_args()
+
+    from app.constants import PRODUCT_MAPPING
+
+    keys = args.produto or [key for key in PRODUCT_MAPPING if PRODUCT_MAPPING.target(key)]
+    # Produtos que apontam para a mesma classe tem o mesmo custo: mede uma vez por alvo
+    targets = {}
+    for key in keys:
+        targets.setdefault(PRODUCT_MAPPING.target(key), key)
+
+    results = [measure(key) for key in targets.values()]
+
+    mb = 1024 * 1024
+    print(f"{'produto':<64} {'import (s)':>10} {'RSS (MB)':>9} {'+RSS (MB)':>10} {'+modulos':>9}")
+    for r in results:
+        if "product_import_s" not in r or r.get("error"):
+            print(f"{r['produto']:<64} ERRO: {r.get('error')}")
+            continue
+        print(
+            f"{r['produto']:<64} {r['product_import_s']:>10.3f} {r['rss_product'] / mb:>9.1f} "
+            f"{(r['rss_product'] - r['rss_registry']) / mb:>10.1f} {r['modules_product'] - r['modules_registry']:>9d}"
+        )
+    if results and "registry_import_s" in results[0]:
+        print(f"\nimport do registro (app.constants): {results[0]['registry_import_s']:.3f}s, "
+              f"RSS {results[0]['rss_registry'] / mb:.1f} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
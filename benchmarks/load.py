@@ -0,0 +1,561 @@
+"""
+Teste de carga em rajada: simula a chegada quase simultanea dos produtos de um dia de PMO/revisao
+(carga por patamar, decks DECOMP, vazoes semanais, limites de intercambio, decks WEOL) e mede
+throughput, atraso de fila e latencia por produto, para ajustar faixas e pools antes de um PMO real.
+
+Os payloads vem do corpus de regressao (benchmarks/replay.py): cada disparo usa uma entrada do produto
+com um webhookId novo, entao nada e deduplicado, e o arquivo de entrada e as respostas GET da entrada
+ficam nos diretorios dos adaptadores offline. Produtos do mix sem entrada no corpus podem ser simulados
+com --service-time (o handler apenas dorme), o que ainda exercita filas, faixas e workers.
+
+Alvos:
+- jobs:   JobManager + LaneScheduler em processo, o mesmo caminho do POST /webhook com WEBHOOK_ASYNC_MODE;
+          --workers e --lanes sobrescrevem WEBHOOK_WORKERS e o max_concurrency das faixas;
+- worker: Worker residente consumindo um spool temporario, como o `main.py worker --spool`;
+- http:   POST /webhook de um servidor ja rodando (--url). O servidor deve usar ADAPTERS_PROFILE=offline com
+          os mesmos OFFLINE_S3_DIR/OFFLINE_HTTP_FIXTURES deste processo, onde os arquivos sao preparados;
+          em modo assincrono o status de cada job e acompanhado em /webhook/jobs/{id}.
+
+Atraso de fila = inicio da execucao - envio; latencia = fim da execucao - envio.
+
+Uso:
+    python benchmarks/load.py [--alvo jobs|worker|http] [--mix produto=peso,...] [--count 30] [--rate 0]
+                              [--poisson] [--seed 0] [--workers N] [--lanes rapida=4,padrao=2,pesada=1]
+                              [--service-time SEGUNDOS] [--latency http=0.2,s3=1] [--corpus DIR]
+                              [--url http://localhost:8000] [--json saida.json]
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, redirect_stdout
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from parsers import _git_revision  # noqa: E402
+from replay import DEFAULT_CORPUS_DIR, HTTP_DIR, INPUT_DIR, isolated_settings, list_entries, load_payload  # noqa: E402
+
+# Produtos que chegam juntos na quinta/sexta do ciclo do PMO, com o peso de cada um no sorteio
+PMO_MIX: Dict[str, float] = {
+    "carga_por_patamar_decomp": 1,
+    "deck_preliminar_decomp_valor_esperado": 1,
+    "resultados_preliminares_nao_consistidos_vazoes_semanais_pmo": 1,
+    "resultados_preliminares_consistidos_vazoes_semanais_pmo": 1,
+    "preliminar_relatorio_mensal_de_limites_de_intercambio": 1,
+    "decks_da_previsao_de_geracao_eolica_semanal_weolsm": 2,
+}
+
+TARGETS = ("jobs", "worker", "http")
+
+
+@dataclass
+class Shot:
+    """
+    Um payload disparado e os instantes (time.time) observados para ele.
+    """
+    produto: str
+    payload: Dict[str, Any]
+    simulated: bool
+    submitted_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    lane: Optional[str] = None
+    status: str = "pending"
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def queue_delay(self) -> Optional[float]:
+        if self.submitted_at is None or self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+    @property
+    def latency(self) -> Optional[float]:
+        if self.submitted_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+    def finish(self, status: str, started_at: Optional[float], finished_at: Optional[float], error: Optional[str] = None):
+        self.status, self.started_at, self.finished_at, self.error = status, started_at, finished_at, error
+        self.done.set()
+
+
+def parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Converte "a=3,b=1" (ou "a,b", peso 1) em {"a": 3.0, "b": 1.0}.
+    """
+    weights = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, value = item.partition("=")
+        weights[name.strip()] = float(value) if value else 1.0
+    return weights
+
+
+def corpus_by_product(corpus_dir: Path) -> Dict[str, List[Path]]:
+    from middle.utils import sanitize_string
+
+    entries: Dict[str, List[Path]] = {}
+    for name in list_entries(corpus_dir):
+        try:
+            payload = load_payload(corpus_dir / name)
+        except (OSError, ValueError) as e:
+            print(f"Entrada {name} ignorada: {e}")
+            continue
+        entries.setdefault(sanitize_string(payload["nome"], space_char="_"), []).append(corpus_dir / name)
+    return entries
+
+
+def _input_file(entry_dir: Path, filename: str) -> Path:
+    path = entry_dir / INPUT_DIR / filename
+    if path.exists():
+        return path
+    files = sorted(p for p in (entry_dir / INPUT_DIR).iterdir() if p.is_file())
+    if not files:
+        raise FileNotFoundError(f"Entrada {entry_dir} sem arquivo em {INPUT_DIR}/")
+    return files[0]
+
+
+class CreatedFiles:
+    """
+    Arquivos, links e diretorios escritos pelo teste, desfeitos por undo(): no alvo http eles ficam nos
+    diretorios offline reais do servidor. Arquivos que ja existiam voltam ao conteudo anterior.
+    """
+
+    def __init__(self):
+        self.paths: List[Path] = []
+        self.previous: Dict[Path, bytes] = {}
+
+    def mkdir(self, directory: Path):
+        missing = []
+        while not directory.exists():
+            missing.append(directory)
+            directory = directory.parent
+        for path in reversed(missing):
+            path.mkdir(exist_ok=True)
+            self.paths.append(path)
+
+    def write(self, path: Path, data: bytes):
+        self.mkdir(path.parent)
+        if path.is_file() and not path.is_symlink():
+            self.previous.setdefault(path, path.read_bytes())
+        elif path not in self.paths:
+            self.paths.append(path)
+        path.write_bytes(data)
+
+    def symlink(self, source: Path, target: Path):
+        self.mkdir(target.parent)
+        os.symlink(source, target)
+        self.paths.append(target)
+
+    def undo(self):
+        for path in reversed(self.paths):
+            try:
+                if path.is_dir() and not path.is_symlink():
+                    path.rmdir()
+                else:
+                    path.unlink(missing_ok=True)
+            except OSError:
+                # Diretorio com arquivos de outra origem: fica
+                continue
+        for path, data in self.previous.items():
+            path.write_bytes(data)
+        self.paths, self.previous = [], {}
+
+
+def prepare_http_fixtures(entries: List[Path], http_dir: Path, created: CreatedFiles):
+    # GETs de entradas diferentes para a mesma URL sao iguais na pratica; a ultima entrada prevalece
+    for entry_dir in entries:
+        source = entry_dir / HTTP_DIR
+        if not source.is_dir():
+            continue
+        for file in source.rglob("*"):
+            if file.is_file():
+                created.write(http_dir / file.relative_to(source), file.read_bytes())
+
+
+def build_shots(
+    mix: Dict[str, float],
+    count: int,
+    seed: int,
+    corpus: Dict[str, List[Path]],
+    s3_dir: Path,
+    simulate: bool,
+    created: CreatedFiles,
+) -> List[Shot]:
+    """
+    Sorteia `count` produtos pelo peso do mix e monta os payloads, cada um com webhookId proprio e o
+    arquivo de entrada no S3 offline em webhooks/<produto>/<webhookId>_<filename>.
+    """
+    rng = random.Random(seed)
+    products, weights = list(mix), list(mix.values())
+    cycles = {key: itertools.cycle(entries) for key, entries in corpus.items()}
+    shots = []
+    for n in range(count):
+        product_key = rng.choices(products, weights)[0]
+        webhook_id = f"load-{n:05d}-{rng.getrandbits(32):08x}"
+        if product_key in cycles:
+            entry_dir = next(cycles[product_key])
+            payload = {**load_payload(entry_dir), "webhookId": webhook_id}
+            payload["s3Key"] = f"{payload.get('s3Key', '')}#{webhook_id}"
+            target = s3_dir / "webhooks" / product_key / f"{webhook_id}_{payload['filename']}"
+            created.symlink(_input_file(entry_dir, payload["filename"]).resolve(), target)
+            shots.append(Shot(product_key, payload, simulated=False))
+        elif simulate:
+            payload = {
+                "dataProduto": datetime.now().strftime("%d/%m/%Y"), "filename": f"{product_key}.zip",
+                "macroProcesso": "load", "nome": product_key.replace("_", " "), "periodicidade": datetime.now().isoformat(),
+                "processo": "load", "s3Key": webhook_id, "url": "", "webhookId": webhook_id,
+            }
+            shots.append(Shot(product_key, payload, simulated=True))
+        else:
+            raise ValueError(f"Produto {product_key} sem entrada no corpus; grave uma ou use --service-time")
+    return shots
+
+
+def schedule(shots: List[Shot], rate: float, poisson: bool, seed: int, fire: Callable[[Shot], None]):
+    """
+    Dispara os payloads na taxa pedida (por segundo; 0 = todos de uma vez), com intervalos fixos ou exponenciais.
+    """
+    rng = random.Random(seed + 1)
+    start = time.perf_counter()
+    offset = 0.0
+    for shot in shots:
+        wait = start + offset - time.perf_counter()
+        if wait > 0:
+            time.sleep(wait)
+        fire(shot)
+        if rate > 0:
+            offset += rng.expovariate(rate) if poisson else 1 / rate
+
+
+def make_handler(shots: List[Shot], service_time: float) -> Callable[[Any], Any]:
+    from app.runner import run_payload
+
+    simulated = {shot.payload["webhookId"] for shot in shots if shot.simulated}
+
+    def handler(payload):
+        if payload.webhookId in simulated:
+            time.sleep(service_time)
+            return {"simulated": True}
+        return run_payload(payload)
+
+    return handler
+
+
+def run_jobs_target(shots: List[Shot], args: argparse.Namespace, handler: Callable) -> Dict[str, Dict[str, int]]:
+    """
+    Retorna o maior numero de jobs aguardando e executando observado em cada faixa.
+    """
+    from app.constants import DEFAULT_LANE, LANES, PRODUCT_LANES
+    from app.jobs import JobManager
+    from app.runner import ProductNotMappedError, resolve_product
+    from app.scheduler import LaneFullError, LaneScheduler
+    from app.schema import WebhookSintegreSchema
+    from app.settings import settings
+
+    overrides = parse_weights(args.lanes)
+    lanes = [replace(lane, max_concurrency=int(overrides.get(lane.name, lane.max_concurrency))) for lane in LANES]
+    scheduler = LaneScheduler(lanes, PRODUCT_LANES, default_lane=DEFAULT_LANE, max_workers=args.workers or settings.WEBHOOK_WORKERS)
+    manager = JobManager(scheduler=scheduler, retention=len(shots) + 1, runner=handler)
+    jobs = {}
+
+    def fire(shot: Shot):
+        shot.submitted_at = time.time()
+        try:
+            payload = WebhookSintegreSchema(**shot.payload)
+            # Como no POST /webhook: resolve_product sanitiza o nome, que define a faixa do job
+            resolve_product(payload)
+            job = manager.submit(payload)
+        except ProductNotMappedError as e:
+            shot.finish("failed", None, None, f"{type(e).__name__}: {e}")
+            return
+        except LaneFullError as e:
+            shot.finish("rejected", None, None, str(e))
+            return
+        except Exception as e:
+            # Qualquer outra falha (ex.: modulo do produto que nao importa) conta para o disparo e o envio segue
+            shot.finish("failed", None, time.time(), f"{type(e).__name__}: {e}")
+            return
+        shot.lane = job.lane
+        jobs[id(shot)] = job
+
+    peaks: Dict[str, Dict[str, int]] = {name: {"pending": 0, "running": 0} for name in scheduler.lanes}
+    sender = threading.Thread(target=schedule, args=(shots, args.rate, args.poisson, args.seed, fire), daemon=True)
+    sender.start()
+    while sender.is_alive() or any(not job.done for job in jobs.values()):
+        for name, stats in manager.lanes().items():
+            peaks[name]["pending"] = max(peaks[name]["pending"], stats["pending"])
+            peaks[name]["running"] = max(peaks[name]["running"], stats["running"])
+        time.sleep(0.05)
+    for shot in shots:
+        job = jobs.get(id(shot))
+        if job is not None:
+            status = "succeeded" if job.status == "succeeded" else "failed"
+            shot.finish(status, job.started_at, job.finished_at, job.error)
+    manager.shutdown()
+    return peaks
+
+
+def run_worker_target(shots: List[Shot], args: argparse.Namespace, handler: Callable, spool_dir: str):
+    from app.worker import SpoolQueue, Worker
+
+    by_id = {shot.payload["webhookId"]: shot for shot in shots}
+    remaining = threading.Semaphore(0)
+
+    class TrackingSpool(SpoolQueue):
+        def ack(self, item_id: str, record: Dict[str, Any]):
+            super().ack(item_id, record)
+            shot = by_id[record["webhookId"]]
+            shot.finish(
+                record["status"], datetime.fromisoformat(record["started_at"]).timestamp(),
+                datetime.fromisoformat(record["finished_at"]).timestamp(), record["error"],
+            )
+            remaining.release()
+
+    worker = Worker(TrackingSpool(spool_dir, poll_interval=0.05), handler, workers=args.workers or 1)
+
+    def fire(shot: Shot):
+        # O webhookId comeca pelo numero do disparo, entao a ordem dos arquivos e a de envio
+        name = shot.payload["webhookId"]
+        tmp_path = os.path.join(spool_dir, f"{name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(shot.payload, f)
+        shot.submitted_at = time.time()
+        # rename atomico: o worker nunca le um payload pela metade
+        os.rename(tmp_path, os.path.join(spool_dir, f"{name}.json"))
+
+    def send_and_wait():
+        schedule(shots, args.rate, args.poisson, args.seed, fire)
+        for _ in shots:
+            remaining.acquire()
+        worker.stop()
+
+    threading.Thread(target=send_and_wait, daemon=True).start()
+    # Worker.run instala os handlers de sinal, entao roda na thread principal
+    worker.run()
+
+
+def run_http_target(shots: List[Shot], args: argparse.Namespace):
+    import httpx
+
+    client = httpx.Client(base_url=args.url, timeout=args.http_timeout)
+
+    def parse_time(value: Optional[str]) -> Optional[float]:
+        return datetime.fromisoformat(value).timestamp() if value else None
+
+    def follow(shot: Shot, job: Dict[str, Any]):
+        # Acompanha o job ate terminar; o servidor informa inicio e fim da execucao
+        while job["status"] not in ("succeeded", "failed"):
+            time.sleep(args.poll_interval)
+            job = client.get(f"/webhook/jobs/{job['job_id']}").json()
+        shot.lane = job.get("lane")
+        shot.finish(job["status"], parse_time(job["started_at"]), parse_time(job["finished_at"]), job.get("error"))
+
+    def send(shot: Shot):
+        shot.submitted_at = time.time()
+        try:
+            deliver(shot)
+        except Exception as e:
+            # Sem isso o disparo ficaria pendente e a espera pelos disparos nao terminaria
+            shot.finish("failed", None, time.time(), f"{type(e).__name__}: {e}")
+
+    def deliver(shot: Shot):
+        response = client.post("/webhook", json=shot.payload)
+        if response.status_code == 429:
+            shot.finish("rejected", None, None, response.text)
+        elif response.status_code == 202 or (response.status_code == 200 and "job_id" in response.json()):
+            follow(shot, response.json())
+        elif response.is_success:
+            # Modo sincrono: a resposta so volta ao fim da execucao e o inicio nao e conhecido
+            shot.finish("succeeded", None, time.time())
+        else:
+            shot.finish("failed", None, time.time(), f"HTTP {response.status_code}: {response.text[:200]}")
+
+    def fire(shot: Shot):
+        threading.Thread(target=send, args=(shot,), daemon=True).start()
+
+    schedule(shots, args.rate, args.poisson, args.seed, fire)
+    for shot in shots:
+        shot.done.wait()
+    client.close()
+
+
+def _stats(values: List[float]) -> Dict[str, Optional[float]]:
+    from app.ledger import percentile
+
+    return {
+        "p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def summarize(shots: List[Shot]) -> Dict[str, Any]:
+    submitted = [s.submitted_at for s in shots if s.submitted_at is not None]
+    finished = [s.finished_at for s in shots if s.finished_at is not None]
+    completed = [s for s in shots if s.status == "succeeded"]
+    elapsed = (max(finished) - min(submitted)) if submitted and finished else None
+    summary: Dict[str, Any] = {
+        "submitted": len(submitted),
+        "succeeded": len(completed),
+        "failed": sum(1 for s in shots if s.status == "failed"),
+        "rejected": sum(1 for s in shots if s.status == "rejected"),
+        "elapsed_s": elapsed,
+        "throughput_per_min": len(completed) / elapsed * 60 if elapsed else None,
+        "queue_delay_s": _stats([s.queue_delay for s in shots if s.queue_delay is not None]),
+        "latency_s": _stats([s.latency for s in completed if s.latency is not None]),
+        "products": {},
+    }
+    for product_key in sorted({s.produto for s in shots}):
+        group = [s for s in shots if s.produto == product_key]
+        ok = [s for s in group if s.status == "succeeded"]
+        summary["products"][product_key] = {
+            "lane": next((s.lane for s in group if s.lane), None),
+            "simulated": group[0].simulated,
+            "submitted": len(group),
+            "succeeded": len(ok),
+            "failed": sum(1 for s in group if s.status == "failed"),
+            "rejected": sum(1 for s in group if s.status == "rejected"),
+            "queue_delay_s": _stats([s.queue_delay for s in group if s.queue_delay is not None]),
+            "latency_s": _stats([s.latency for s in ok if s.latency is not None]),
+        }
+    errors = sorted({s.error for s in shots if s.error})
+    if errors:
+        summary["errors"] = errors[:20]
+    return summary
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:8.2f}" if value is not None else f"{'-':>8}"
+
+
+def print_summary(summary: Dict[str, Any], peaks: Optional[Dict[str, Dict[str, int]]]):
+    print(
+        f"\n{summary['submitted']} enviados, {summary['succeeded']} ok, {summary['failed']} falhas,"
+        f" {summary['rejected']} recusados em {_fmt(summary['elapsed_s']).strip()}s"
+        f" ({_fmt(summary['throughput_per_min']).strip()} execucoes/min)"
+    )
+    print(
+        f"Fila (s): p50 {_fmt(summary['queue_delay_s']['p50'])} p95 {_fmt(summary['queue_delay_s']['p95'])}"
+        f" max {_fmt(summary['queue_delay_s']['max'])}"
+    )
+    print(f"\n{'produto':<62} {'faixa':<7} {'n':>4} {'fila p50':>8} {'fila p95':>8} {'lat p50':>8} {'lat p95':>8} {'lat p99':>8}")
+    for product_key, item in summary["products"].items():
+        name = product_key + (" (simulado)" if item["simulated"] else "")
+        print(
+            f"{name:<62} {item['lane'] or '-':<7} {item['submitted']:>4}"
+            f" {_fmt(item['queue_delay_s']['p50'])} {_fmt(item['queue_delay_s']['p95'])}"
+            f" {_fmt(item['latency_s']['p50'])} {_fmt(item['latency_s']['p95'])} {_fmt(item['latency_s']['p99'])}"
+        )
+    if peaks:
+        print("\nPico por faixa: " + ", ".join(
+            f"{name} {peak['running']} executando/{peak['pending']} aguardando" for name, peak in peaks.items()
+        ))
+    for error in summary.get("errors", []):
+        print(f"erro: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga em rajada do webhook (dia de PMO/revisao)")
+    parser.add_argument("--alvo", choices=TARGETS, default="jobs", help="Caminho de entrada exercitado")
+    parser.add_argument("--mix", help="Produtos e pesos (produto=peso,...); padrao: mix do PMO")
+    parser.add_argument("--count", type=int, default=30, help="Total de payloads disparados")
+    parser.add_argument("--rate", type=float, default=0.0, help="Payloads por segundo (0 = rajada, todos de uma vez)")
+    parser.add_argument("--poisson", action="store_true", help="Intervalos exponenciais em vez de fixos")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do sorteio de produtos e intervalos")
+    parser.add_argument("--workers", type=int, help="Workers do agendador (jobs) ou do worker (padrao: WEBHOOK_WORKERS / 1)")
+    parser.add_argument("--lanes", help="max_concurrency por faixa para o alvo jobs (ex.: rapida=4,padrao=2,pesada=1)")
+    parser.add_argument("--service-time", type=float, help="Simula produtos sem entrada no corpus com esta duracao em segundos")
+    parser.add_argument("--latency", default="", help="Latencia injetada nos adaptadores offline (ex.: http=0.2,s3=1)")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS_DIR, help="Diretorio do corpus de regressao")
+    parser.add_argument("--url", default="http://localhost:8000", help="Servidor para o alvo http")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Intervalo de consulta dos jobs no alvo http")
+    parser.add_argument("--http-timeout", type=float, default=3600.0, help="Timeout do POST no alvo http")
+    parser.add_argument("--json", help="Salva o resumo neste arquivo")
+    parser.add_argument("--verbose", action="store_true", help="Mantem os logs INFO/DEBUG e os prints dos produtos")
+    args = parser.parse_args()
+
+    from app.adapters import build_profile, parse_latency, use_profile
+    from app.constants import PRODUCT_MAPPING
+    from app.settings import settings
+
+    mix = parse_weights(args.mix) or PMO_MIX
+    unknown = sorted(set(mix) - set(PRODUCT_MAPPING))
+    if unknown:
+        parser.error(f"Produtos fora do PRODUCT_MAPPING: {', '.join(unknown)}")
+    if args.alvo == "http" and args.service_time is not None:
+        parser.error("--service-time so vale para os alvos em processo (jobs e worker)")
+    corpus = {key: entries for key, entries in corpus_by_product(args.corpus).items() if key in mix}
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    peaks = None
+    created = CreatedFiles()
+    with ExitStack() as stack:
+        tmp = stack.enter_context(tempfile.TemporaryDirectory(prefix="load-webhook-"))
+        stack.callback(created.undo)
+        if args.alvo == "http":
+            # O servidor le os mesmos diretorios offline; os arquivos do teste ficam la
+            s3_dir, http_dir = Path(settings.OFFLINE_S3_DIR), Path(settings.OFFLINE_HTTP_FIXTURES)
+        else:
+            s3_dir, http_dir = Path(tmp) / "s3", Path(tmp) / "http"
+            stack.enter_context(isolated_settings(
+                tmp, OFFLINE_S3_DIR=str(s3_dir), OFFLINE_HTTP_FIXTURES=str(http_dir),
+                IDEMPOTENCY_DB=os.path.join(tmp, "idempotency.sqlite"),
+            ))
+            stack.enter_context(use_profile(build_profile("offline", latency=parse_latency(args.latency))))
+        prepare_http_fixtures([entry for entries in corpus.values() for entry in entries], http_dir, created)
+        shots = build_shots(mix, args.count, args.seed, corpus, s3_dir, simulate=args.service_time is not None, created=created)
+        print(f"Disparando {len(shots)} payloads no alvo {args.alvo} ({'rajada' if args.rate <= 0 else f'{args.rate}/s'})")
+
+        if args.alvo != "http":
+            PRODUCT_MAPPING.preload()
+        handler = make_handler(shots, args.service_time or 0.0)
+        # Alguns produtos usam print por item; a saida vai para /dev/null para nao poluir o relatorio
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull if not args.verbose else sys.stdout):
+            if args.alvo == "jobs":
+                peaks = run_jobs_target(shots, args, handler)
+            elif args.alvo == "worker":
+                spool_dir = os.path.join(tmp, "spool")
+                os.makedirs(spool_dir)
+                run_worker_target(shots, args, handler, spool_dir)
+            else:
+                run_http_target(shots, args)
+
+    summary = summarize(shots)
+    print_summary(summary, peaks)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "alvo": args.alvo,
+                "mix": mix,
+                "count": args.count,
+                "rate": args.rate,
+                "workers": args.workers,
+                "lanes": args.lanes,
+                "service_time": args.service_time,
+                "lane_peaks": peaks,
+                "summary": summary,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Geradores de arquivos sinteticos no formato dos produtos do ONS, usados pelos benchmarks de parse.
+
+Cada gerador recebe o diretorio de saida e um fator `scale` (1 = tamanho tipico de um arquivo real,
+ou uma fracao dele quando o parser e lento demais para o tamanho cheio) e devolve o caminho gerado.
+Os valores sao pseudoaleatorios com semente fixa, para que duas execucoes leiam exatamente os mesmos bytes.
+"""
+import json
+import os
+import random
+import struct
+import zipfile
+from datetime import date, timedelta
+from typing import Tuple
+
+SUBMERCADOS = ("SE", "S", "NE", "N")
+
+
+def vazoes_dat(directory: str, scale: float = 1.0) -> str:
+    """
+    vazoes.dat do NEWAVE: registros de 320 postos (int32 little-endian) por mes, a partir de 1931.
+    scale=1 gera 20 anos de historico.
+    """
+    rng = random.Random(1931)
+    postos, meses = 320, max(int(20 * 12 * scale), 1)
+    path = os.path.join(directory, "vazoes.dat")
+    with open(path, "wb") as f:
+        for _ in range(meses):
+            f.write(struct.pack(f"<{postos}i", *(rng.randint(0, 20000) for _ in range(postos))))
+    return path
+
+
+def renovaveis_dat(directory: str, scale: float = 1.0, deck_date: date = date(2025, 10, 18)) -> Tuple[str, date]:
+    """
+    renovaveis.dat do DESSEM com blocos EOLICA / EOLICASUBM / EOLICA-GERACAO.
+    scale=1 gera 100 barras com uma previsao por dia da semana operativa.
+    """
+    rng = random.Random(7)
+    fontes = ("EOL", "UFV", "PCH", "BIO")
+    next_friday = (4 - deck_date.weekday() + 7) % 7
+    dias = [deck_date + timedelta(days=d) for d in range(next_friday + 1)]
+    barras = max(int(100 * scale), 1)
+    lines = ["&  renovaveis sintetico\n"]
+    for barra in range(1, barras + 1):
+        lines.append(f"EOLICA ; {barra:5d} ; UEE_{barra}_{fontes[barra % len(fontes)]} ; 1 ;\n")
+    for barra in range(1, barras + 1):
+        lines.append(f"EOLICASUBM ; {barra:5d} ; {SUBMERCADOS[barra % len(SUBMERCADOS)]} ;\n")
+    for barra in range(1, barras + 1):
+        for dia in dias:
+            lines.append(
+                f"EOLICA-GERACAO ; {barra:5d} ; {dia.day:2d} ; 0 ; 0 ; {dia.day:2d} ; 23 ; 1 ; {rng.uniform(0, 300):.2f} ;\n"
+            )
+    path = os.path.join(directory, "renovaveis.dat")
+    with open(path, "w", encoding="latin-1") as f:
+        f.writelines(lines)
+    return directory, deck_date
+
+
+def acompanhamento_hidrologico_xlsx(directory: str, scale: float = 1.0) -> Tuple[str, str]:
+    """
+    Planilha de vazoes observadas (cabecalhos nas linhas 5 e 7) e o info_vazao_obs.json correspondente.
+    scale=1 gera 12 trechos com 2 postos cada e um ano de dados diarios.
+    """
+    from openpyxl import Workbook
+
+    rng = random.Random(42)
+    trechos, dias = max(int(12 * scale), 1), 365
+    inicio = date(2024, 10, 1)
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    info = {}
+    for t in range(trechos):
+        sheet = workbook.create_sheet(f"T{t}")
+        postos = [f"P{t}A", f"P{t}B"]
+        sheet.append([])
+        sheet.append([])
+        sheet.append([])
+        sheet.append([])
+        sheet.append([None, postos[0], postos[0], postos[1], postos[1]])
+        sheet.append([])
+        sheet.append(["DATA", "VNA", "VIN", "VNA", "VIN"])
+        for d in range(dias):
+            sheet.append([inicio + timedelta(days=d), *(round(rng.uniform(10, 5000), 2) for _ in range(4))])
+        info[f"TRECHO {t}"] = {
+            "iniciais": "VNA",
+            "sheet": f"T{t}",
+            "codigoEstacao": 1000 + t,
+            "composicao": {
+                postos[0]: {"tipoVazao": "VNA"},
+                postos[1]: {"tipoVazao": "VIN", "tempoViagem": 30},
+            },
+        }
+    xlsx_path = os.path.join(directory, "acomph_sintetico.xlsx")
+    json_path = os.path.join(directory, "info_vazao_obs.json")
+    workbook.save(xlsx_path)
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False)
+    return xlsx_path, json_path
+
+
+def precipitacao_prevista_zip(directory: str, scale: float = 1.0) -> Tuple[str, str]:
+    """
+    Zip de precipitacao prevista (<MODELO>_m_DDMMYY.dat, largura fixa) e a resposta da API de subbacias.
+    scale=1 gera 200 subbacias com 14 dias de previsao.
+    """
+    rng = random.Random(14)
+    subbacias = max(int(200 * scale), 1)
+    linhas = [
+        f"SB{i:04d} {-rng.uniform(5, 30):8.3f} {-rng.uniform(40, 60):8.3f} "
+        + " ".join(f"{rng.uniform(0, 80):6.1f}" for _ in range(14))
+        for i in range(subbacias)
+    ]
+    zip_path = os.path.join(directory, "ECMWF_precipitacao14d_20251018.zip")
+    with zipfile.ZipFile(zip_path, "w") as zip_file:
+        zip_file.writestr("ECMWF_m_181025.dat", "\n".join(linhas) + "\n")
+    postos_path = os.path.join(directory, "subbacias.json")
+    with open(postos_path, "w", encoding="utf-8") as f:
+        json.dump([{"id": i, "nome": f"SB{i:04d}"} for i in range(subbacias)], f)
+    return zip_path, postos_path
+
+
+def deck_weol_zip(directory: str, scale: float = 1.0) -> str:
+    """
+    Deck de previsao eolica semanal (WEOL-SM) com o CSV de previsao final e o de patamares.
+    scale=1 gera 6 semanas de previsao e o calendario horario de patamares das mesmas semanas.
+    """
+    rng = random.Random(6)
+    semanas = max(int(6 * scale), 1)
+    inicio = date(2025, 10, 18)
+    cabecalho = ["Regiao"]
+    for s in range(semanas):
+        ini, fim = inicio + timedelta(weeks=s), inicio + timedelta(weeks=s, days=6)
+        cabecalho += [ini.strftime("%d/%m/%Y"), "", fim.strftime("%d/%m/%Y")]
+    previsao = [";".join(cabecalho)]
+    for regiao in (*SUBMERCADOS, "Patamares"):
+        previsao.append(";".join([regiao, *(f"{rng.uniform(0, 15000):.1f}" for _ in range(3 * semanas))]))
+    patamares = ["Inicio;Patamar;CodPatamar;DiaSemana;DiaTipico;TipoDia;Intervalo;Dia;Semana;Mes"]
+    for h in range(semanas * 7 * 24):
+        instante = inicio + timedelta(hours=h)
+        patamares.append(f"{instante.isoformat()};Medio;2;{instante.weekday()};1;Util;{h % 24};{instante.day};{h // 168};{instante.month}")
+    zip_path = os.path.join(directory, "Deck_PrevMes_20251018.zip")
+    with zipfile.ZipFile(zip_path, "w") as zip_file:
+        zip_file.writestr("Arquivos Saida/Previsoes Subsistemas Finais/Total/Prev_20251018.csv", "\n".join(previsao).encode("latin-1"))
+        zip_file.writestr("Arquivos Entrada/Dados Cadastrais/Patamares_20251018.csv", "\n".join(patamares).encode("latin-1"))
+    return zip_path
+
+
+def modelos_pdp_zip(directory: str, scale: float = 1.0) -> Tuple[str, str]:
+    """
+    Zip dos modelos de previsao de vazoes diarias (PDP), com um <subbacia>.txt separado por | por subbacia,
+    e o info_vazao_obs.json que lista as subbacias lidas. scale=1 gera as 118 subbacias do arquivo real
+    com 30 dias de vazao cada.
+    """
+    rng = random.Random(118)
+    subbacias, dias = max(int(118 * scale), 1), 30
+    inicio = date(2025, 11, 9)
+    info = {}
+    zip_path = os.path.join(directory, "Modelos_Chuva_Vazao_20251109.zip")
+    with zipfile.ZipFile(zip_path, "w") as zip_file:
+        for s in range(subbacias):
+            nome = f"SUBBACIA{s:04d}"
+            codigo = 60000000 + s
+            info[nome] = {"sheet": "Sintetico", "iniciais": "VNA", "codigoEstacao": str(codigo), "composicao": {}}
+            linhas = [
+                f"{codigo}|{nome}|{s}|VNA|{(inicio + timedelta(days=d)).isoformat()}|{rng.uniform(10, 5000):.2f}"
+                for d in range(dias)
+            ]
+            zip_file.writestr(f"Modelos_Chuva_Vazao/{nome}.txt", "\n".join(linhas) + "\n")
+    json_path = os.path.join(directory, "info_vazao_obs.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(info, f, ensure_ascii=False)
+    return zip_path, json_path
+
+
+LIMITES_TABLE_NAME = "Tabela 4-1: Resultados dos Limites Elétricos"
+LIMITES = (
+    "IPU60", "IPU50", "Ger. MAD", "RNE", "FNS", "FNESE", "FNNE", "FNEN", "EXPNE", "EXPN",
+    "FNS+FNESE", "FSENE", "FSUL", "RSUL", "RSE", "-RSE", "FETXG+FTRXG", "FXGET+FXGTR",
+)
+
+
+def _pdf_text(x: float, y: float, size: float, text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"BT /F1 {size} Tf {x:.1f} {y:.1f} Td ({escaped}) Tj ET"
+
+
+def _write_pdf(path: str, pages: list, width: int = 842, height: int = 595):
+    """
+    PDF minimo (Helvetica, WinAnsiEncoding) com uma pagina por stream de conteudo.
+    """
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for content in pages:
+        stream = content.encode("latin-1")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{content}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+        f.writelines(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+
+def limites_intercambio_pdf(directory: str, scale: float = 1.0) -> Tuple[str, str]:
+    """
+    Relatorio mensal de limites de intercambio: paginas de texto e, na ultima, a Tabela 4-1 com grade
+    (19 colunas, 3 linhas de cabecalho e uma linha por limite). scale=1 gera 20 paginas.
+    Retorna o caminho do PDF e o nome da tabela procurado pelo parser.
+    """
+    rng = random.Random(41)
+    width, height = 842, 595
+    paginas = max(int(20 * scale), 2)
+    pages = []
+    for p in range(paginas - 1):
+        lines = [_pdf_text(40, height - 40, 12, f"{p + 1}. Analise de intercambio entre subsistemas - item {p + 1}")]
+        for i in range(45):
+            lines.append(_pdf_text(
+                40, height - 60 - i * 11, 8,
+                f"Fluxo {rng.choice(LIMITES)} no patamar {rng.choice(('pesada', 'media', 'leve'))}: "
+                f"{rng.uniform(0, 12000):.0f} MW com {rng.randint(1, 40)} contingencias avaliadas",
+            ))
+        pages.append("\n".join(lines))
+
+    colunas, margem = 19, 20
+    col_width, row_height = (width - 2 * margem) / colunas, 14
+    header = [
+        ["Item", "Limite", *(mes for mes in ("Mes 1", "Mes 2") for _ in range(9))],
+        ["", "", *(patamar for _ in range(2) for patamar in ("Pesada", "", "", "Média", "", "", "Leve", "", ""))],
+        ["", "", *("MW" for _ in range(18))],
+    ]
+    rows = header + [
+        [str(i + 1), limite, *(f"{rng.uniform(0.5, 12):.3f}" if c % 3 == 0 else "" for c in range(17))]
+        for i, limite in enumerate(LIMITES)
+    ]
+    top = height - 70
+    ops = [_pdf_text(margem, height - 40, 12, LIMITES_TABLE_NAME), "0.5 w"]
+    bottom = top - row_height * len(rows)
+    for r in range(len(rows) + 1):
+        ops.append(f"{margem} {top - r * row_height:.1f} m {width - margem} {top - r * row_height:.1f} l S")
+    for c in range(colunas + 1):
+        ops.append(f"{margem + c * col_width:.1f} {top:.1f} m {margem + c * col_width:.1f} {bottom:.1f} l S")
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            if value:
+                ops.append(_pdf_text(margem + c * col_width + 2, top - (r + 1) * row_height + 4, 6, value))
+    pages.append("\n".join(ops))
+
+    path = os.path.join(directory, "RT-ONS_PMO_Novembro-2025.pdf")
+    _write_pdf(path, pages, width, height)
+    return path, LIMITES_TABLE_NAME
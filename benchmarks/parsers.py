@@ -0,0 +1,286 @@
+"""
+Microbenchmarks das etapas de parse/transform dos produtos.
+
+Cada caso gera (ou localiza) o arquivo de entrada, roda o parser `--repeat` vezes apos um aquecimento
+e mede tempo (min/mediana), pico de memoria alocada (tracemalloc, numa execucao extra) e linhas por segundo.
+As chamadas externas passam pelo perfil offline de app.adapters, entao nenhuma API e acessada.
+
+Casos com arquivos sinteticos (benchmarks/parser_fixtures.py) rodam sempre; casos que dependem de um
+arquivo real (PDFs) leem de --fixtures-dir/<caso>/ e sao pulados quando o arquivo nao existe.
+
+Uso:
+    python benchmarks/parsers.py [--caso NOME ...] [--scale 1.0] [--repeat 5]
+                                 [--json saida.json] [--compare baseline.json] [--threshold 10]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import parser_fixtures  # noqa: E402
+
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class FixtureMissing(Exception):
+    """Caso que depende de um arquivo real ausente em --fixtures-dir."""
+
+
+@dataclass
+class Case:
+    name: str
+    description: str
+    # Recebe (diretorio de trabalho, scale, --fixtures-dir) e devolve a funcao sem argumentos que sera medida
+    setup: Callable[[str, float, Path], Callable[[], Any]]
+
+
+def count_rows(result: Any) -> Optional[int]:
+    from app.pipeline import count_rows as pipeline_count_rows
+
+    if isinstance(result, dict):
+        counts = [pipeline_count_rows(value) for value in result.values()]
+        return sum(c for c in counts if c is not None) if any(c is not None for c in counts) else None
+    return pipeline_count_rows(result)
+
+
+def _setup_vazoes_binary(workdir: str, scale: float, fixtures_dir: Path):
+    from app.tasks.decks_newave import VazoesBinaryReader
+
+    path = parser_fixtures.vazoes_dat(workdir, scale)
+    reader = VazoesBinaryReader()
+    return lambda: reader.read_binary_file(path)
+
+
+def _setup_deck_dessem_renovaveis(workdir: str, scale: float, fixtures_dir: Path):
+    from app.tasks.deck_dessem import DeckDessem
+
+    path, deck_date = parser_fixtures.renovaveis_dat(workdir, scale)
+    deck = DeckDessem()
+    return lambda: deck.read_renovaveis(path, deck_date)
+
+
+def _setup_acompanhamento_hidrologico(workdir: str, scale: float, fixtures_dir: Path):
+    from app.tasks.relatorio_acompanhamento_hidrologico import parse_vazoes_observadas
+
+    xlsx_path, json_path = parser_fixtures.acompanhamento_hidrologico_xlsx(workdir, scale)
+    return lambda: parse_vazoes_observadas(xlsx_path, json_path)
+
+
+def _setup_precipitacao_prevista(workdir: str, scale: float, fixtures_dir: Path):
+    from middle.utils import Constants
+    from app.adapters import get_profile
+    from app.tasks.precipitacao_prevista import PreciptacaoPrevista
+
+    zip_path, postos_path = parser_fixtures.precipitacao_prevista_zip(workdir, scale)
+    fixture = get_profile().http.fixture_path(Constants().GET_RODADAS_SUBBACIAS)
+    fixture.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(postos_path, fixture)
+    product = PreciptacaoPrevista()
+    return lambda: product.process_file(zip_path)
+
+
+def _setup_weol(workdir: str, scale: float, fixtures_dir: Path):
+    from app.schema import WebhookSintegreSchema
+    from app.tasks.weol import Weol
+
+    zip_path = parser_fixtures.deck_weol_zip(workdir, scale)
+    product = Weol(WebhookSintegreSchema(
+        dataProduto="18/10/2025", filename=os.path.basename(zip_path), macroProcesso="benchmark",
+        nome="weol", periodicidade=datetime(2025, 10, 18), processo="benchmark",
+        s3Key="", url="", webhookId="benchmark",
+    ))
+    return lambda: product.parse(zip_path)
+
+
+def _setup_arquivos_modelo_pdp(workdir: str, scale: float, fixtures_dir: Path):
+    from app.tasks.arquivos_modelo_pdp import ArquivosModelosPDP
+
+    zip_path, json_path = parser_fixtures.modelos_pdp_zip(workdir, scale)
+    product = ArquivosModelosPDP(None)
+    return lambda: product.process_file(zip_path, json_path)
+
+
+def _setup_limites_intercambio(workdir: str, scale: float, fixtures_dir: Path):
+    from app.tasks.relatorio_limites_intercambio_modelo_decomp import extract_limits_table
+
+    pdf_path, table_name = parser_fixtures.limites_intercambio_pdf(workdir, scale)
+    return lambda: extract_limits_table(pdf_path, table_name)
+
+
+def _setup_ipdo(workdir: str, scale: float, fixtures_dir: Path):
+    files = sorted(glob.glob(str(fixtures_dir / "ipdo" / "*.pdf")))
+    if not files:
+        raise FixtureMissing(f"nenhum PDF em {fixtures_dir / 'ipdo'}")
+    from app.tasks.ipdo import Ipdo
+
+    product = Ipdo(None)
+    return lambda: product.process_file(files[0])
+
+
+CASES: Dict[str, Case] = {case.name: case for case in (
+    Case("vazoes_binary", "VazoesBinaryReader.read_binary_file (vazoes.dat do NEWAVE)", _setup_vazoes_binary),
+    Case("deck_dessem_renovaveis", "DeckDessem.read_renovaveis (renovaveis.dat)", _setup_deck_dessem_renovaveis),
+    Case("acompanhamento_hidrologico", "parse_vazoes_observadas (planilha de vazoes observadas)", _setup_acompanhamento_hidrologico),
+    Case("precipitacao_prevista", "PreciptacaoPrevista.process_file (extract + parse + transform)", _setup_precipitacao_prevista),
+    Case("weol", "Weol.parse (previsao final + patamares do deck WEOL-SM)", _setup_weol),
+    Case("arquivos_modelo_pdp", "ArquivosModelosPDP.process_file (um txt por subbacia do zip)", _setup_arquivos_modelo_pdp),
+    Case("limites_intercambio", "extract_limits_table (busca da Tabela 4-1 no relatorio de limites)", _setup_limites_intercambio),
+    Case("ipdo", "Ipdo.process_file (PDF real em --fixtures-dir/ipdo/)", _setup_ipdo),
+)}
+
+
+def run_case(case: Case, workdir: str, scale: float, repeat: int, fixtures_dir: Path) -> dict:
+    result: Dict[str, Any] = {"case": case.name, "description": case.description, "scale": scale}
+    try:
+        fn = case.setup(workdir, scale, fixtures_dir)
+    except FixtureMissing as e:
+        return {**result, "skipped": str(e)}
+    except Exception as e:
+        return {**result, "error": f"{type(e).__name__}: {e}"}
+
+    try:
+        rows = count_rows(fn())
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as e:
+        return {**result, "error": f"{type(e).__name__}: {e}"}
+
+    median = statistics.median(times)
+    return {
+        **result,
+        "repeat": repeat,
+        "rows": rows,
+        "min_s": min(times),
+        "median_s": median,
+        "mean_s": statistics.fmean(times),
+        "peak_mb": peak / 1024 ** 2,
+        "rows_per_s": rows / median if rows and median > 0 else None,
+    }
+
+
+def run_suite(names: List[str], scale: float, repeat: int, fixtures_dir: Path, quiet: bool = True) -> List[dict]:
+    from app.adapters import build_profile, use_profile
+    from app.settings import settings
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-parsers-") as tmp:
+        settings.OFFLINE_HTTP_FIXTURES = str(Path(tmp) / "http")
+        settings.OFFLINE_S3_DIR = str(Path(tmp) / "s3")
+        with use_profile(build_profile("offline", latency={})):
+            for name in names:
+                workdir = os.path.join(tmp, name)
+                os.makedirs(workdir)
+                # Alguns parsers usam print por item; a saida vai para /dev/null para nao poluir o relatorio
+                with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+                    results.append(run_case(CASES[name], workdir, scale, repeat, fixtures_dir))
+                _print_result(results[-1])
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=project_root, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_result(result: dict):
+    if "skipped" in result:
+        print(f"{result['case']:<28} pulado: {result['skipped']}")
+    elif "error" in result:
+        print(f"{result['case']:<28} erro: {result['error']}")
+    else:
+        rows_per_s = f"{result['rows_per_s']:>12,.0f}" if result["rows_per_s"] else f"{'-':>12}"
+        print(
+            f"{result['case']:<28} {result['median_s'] * 1000:>10.1f} ms (min {result['min_s'] * 1000:.1f})"
+            f" {result['peak_mb']:>8.1f} MB {result['rows'] or 0:>10} linhas {rows_per_s} linhas/s"
+        )
+
+
+def compare(results: List[dict], baseline_path: str, threshold: float) -> bool:
+    """
+    Compara mediana de tempo e pico de memoria com um JSON salvo anteriormente.
+    Retorna True se algum caso piorou mais que `threshold` por cento.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {item["case"]: item for item in json.load(f)["results"]}
+    regression = False
+    print(f"\nComparacao com {baseline_path} (limite {threshold:.0f}%):")
+    for result in results:
+        base = baseline.get(result["case"])
+        if not base or "median_s" not in base or "median_s" not in result:
+            continue
+        deltas = {
+            metric: (result[metric] - base[metric]) / base[metric] * 100
+            for metric in ("median_s", "peak_mb") if base[metric]
+        }
+        worse = [metric for metric, delta in deltas.items() if delta > threshold]
+        regression = regression or bool(worse)
+        print(
+            f"{result['case']:<28} tempo {deltas.get('median_s', 0):+7.1f}%  memoria {deltas.get('peak_mb', 0):+7.1f}%"
+            + ("  <-- regressao" if worse else "")
+        )
+    return regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks das etapas de parse dos produtos")
+    parser.add_argument("--caso", nargs="*", choices=sorted(CASES), help="Casos a executar (padrao: todos)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Fator de tamanho dos arquivos sinteticos")
+    parser.add_argument("--repeat", type=int, default=5, help="Execucoes medidas por caso, apos o aquecimento")
+    parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR, help="Diretorio com arquivos reais por caso")
+    parser.add_argument("--json", help="Salva os resultados neste arquivo")
+    parser.add_argument("--compare", help="JSON de uma execucao anterior para comparar")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Piora percentual considerada regressao")
+    parser.add_argument("--verbose", action="store_true", help="Mantem os logs INFO/DEBUG e os prints dos produtos")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    results = run_suite(args.caso or list(CASES), args.scale, args.repeat, args.fixtures_dir, quiet=not args.verbose)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.json}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
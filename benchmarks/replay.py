@@ -0,0 +1,354 @@
+"""
+Corpus de regressao: webhooks gravados reexecutados pelos handlers reais do PRODUCT_MAPPING com os
+adaptadores offline, medindo tempo e memoria de cada entrada para comparar entre commits.
+
+Formato de uma entrada (<corpus>/<entrada>/):
+    payload.json    payload do webhook (WebhookSintegreSchema), como recebido em POST /webhook
+    input/          arquivo do S3 referenciado pelo payload, com o mesmo `filename`
+    http/           respostas dos GETs da API no layout do RecordingHttpStub: <caminho da url>.json
+    expected.json   opcional: chamadas externas por tipo (s3.download, http GET, http POST, airflow, mensagens)
+                    gravadas junto com a entrada; o replay avisa quando o workflow passa a fazer outras chamadas
+
+O replay roda o workflow completo (run_payload) `--repeat` vezes apos um aquecimento e mede tempo
+(min/mediana), tempo por etapa, pico de memoria alocada (tracemalloc) e pico de RSS numa execucao extra.
+Ledger e traces vao para um diretorio temporario para nao misturar o replay com as execucoes reais.
+
+`record` monta uma entrada nova: copia o arquivo de --input (ou baixa do S3 real) e roda o produto uma vez
+com os GETs indo para a API real e gravados em http/; POST/PUT, triggers e mensagens continuam nos stand-ins
+offline, entao nada e publicado.
+
+Uso:
+    python benchmarks/replay.py run [--corpus DIR] [--entrada NOME ...] [--repeat 3]
+                                    [--json saida.json] [--compare baseline.json] [--threshold 10]
+    python benchmarks/replay.py record PAYLOAD --nome ENTRADA [--corpus DIR] [--input ARQUIVO]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from parsers import _git_revision, compare  # noqa: E402
+
+DEFAULT_CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+PAYLOAD_FILE = "payload.json"
+INPUT_DIR = "input"
+HTTP_DIR = "http"
+EXPECTED_FILE = "expected.json"
+
+
+def list_entries(corpus_dir: Path) -> List[str]:
+    if not corpus_dir.is_dir():
+        return []
+    return sorted(entry.name for entry in corpus_dir.iterdir() if (entry / PAYLOAD_FILE).is_file())
+
+
+def load_payload(entry_dir: Path) -> dict:
+    with open(entry_dir / PAYLOAD_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def call_counts(calls: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Chamadas registradas pelo CallRecorder agrupadas por tipo; HTTP e separado por metodo.
+    """
+    counts = Counter(
+        f"http {call['method']}" if call["kind"] == "http" else call["kind"] for call in calls
+    )
+    return dict(sorted(counts.items()))
+
+
+@contextmanager
+def isolated_settings(tmp: str, **overrides: Any) -> Iterator[None]:
+    """
+    Aponta ledger, traces, cache de artefatos e demais settings informados para o diretorio temporario,
+    restaurando ao sair.
+    """
+    from app.settings import settings
+
+    values = {
+        "LEDGER_DB": os.path.join(tmp, "ledger.sqlite"),
+        "TRACING_FILE": os.path.join(tmp, "traces.jsonl"),
+        "ARTIFACT_CACHE_DIR": os.path.join(tmp, "artifacts"),
+        "OFFLINE_RECORD_FILE": None,
+        **overrides,
+    }
+    previous = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+class StageCollector:
+    """
+    Observador de etapas que guarda o tempo de parede de cada etapa finalizada.
+    """
+
+    def __init__(self):
+        self.wall_times: Dict[str, List[float]] = {}
+
+    def __call__(self, product: Any, event: str, metrics: Any):
+        from app.pipeline import STAGE_FINISHED
+
+        if event == STAGE_FINISHED and metrics.wall_time is not None:
+            self.wall_times.setdefault(metrics.name, []).append(metrics.wall_time)
+
+    def medians(self) -> Dict[str, float]:
+        return {name: statistics.median(times) for name, times in self.wall_times.items()}
+
+
+def run_entry_once(payload_data: dict) -> List[Dict[str, Any]]:
+    """
+    Executa o workflow do payload no perfil offline (com os settings OFFLINE_* correntes) e devolve as
+    chamadas externas registradas.
+    """
+    from app.adapters import build_profile, use_profile
+    from app.runner import run_payload
+    from app.schema import WebhookSintegreSchema
+
+    profile = build_profile("offline", latency={})
+    with use_profile(profile):
+        # run_payload sanitiza payload.nome, entao cada execucao parte de um payload novo
+        run_payload(WebhookSintegreSchema(**payload_data))
+    return profile.recorder.calls
+
+
+def replay_entry(entry_dir: Path, repeat: int, tmp: str) -> dict:
+    from app.pipeline import add_stage_listener, remove_stage_listener
+    from app.resources import RssSampler
+
+    result: Dict[str, Any] = {"case": entry_dir.name}
+    try:
+        payload_data = load_payload(entry_dir)
+    except (OSError, ValueError) as e:
+        return {**result, "error": f"{PAYLOAD_FILE} invalido: {e}"}
+    result["produto"] = payload_data.get("nome")
+
+    overrides = {
+        "OFFLINE_S3_DIR": str(entry_dir / INPUT_DIR),
+        "OFFLINE_HTTP_FIXTURES": str(entry_dir / HTTP_DIR),
+        # Cache proprio por entrada: a execucao fria baixa do S3 local e as repeticoes usam o cache
+        "ARTIFACT_CACHE_DIR": os.path.join(tmp, "artifacts", entry_dir.name),
+    }
+    collector = StageCollector()
+    with isolated_settings(tmp, **overrides):
+        try:
+            start = time.perf_counter()
+            calls = run_entry_once(payload_data)
+            cold = time.perf_counter() - start
+
+            add_stage_listener(collector)
+            try:
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    run_entry_once(payload_data)
+                    times.append(time.perf_counter() - start)
+            finally:
+                remove_stage_listener(collector)
+
+            tracemalloc.start()
+            try:
+                with RssSampler(0.05) as rss:
+                    run_entry_once(payload_data)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        except Exception as e:
+            return {**result, "error": f"{type(e).__name__}: {e}"}
+
+    counts = call_counts(calls)
+    result.update({
+        "repeat": repeat,
+        "cold_s": cold,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "peak_mb": peak / 1024 ** 2,
+        "rss_peak_mb": rss.peak / 1024 ** 2,
+        "stages": collector.medians(),
+        "calls": counts,
+    })
+    expected_path = entry_dir / EXPECTED_FILE
+    if expected_path.is_file():
+        with open(expected_path, encoding="utf-8") as f:
+            expected = json.load(f).get("calls", {})
+        if expected != counts:
+            result["calls_mismatch"] = {"expected": expected, "actual": counts}
+    return result
+
+
+def run_corpus(corpus_dir: Path, names: List[str], repeat: int, quiet: bool = True) -> List[dict]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="replay-corpus-") as tmp:
+        for name in names:
+            # Alguns produtos usam print por item; a saida vai para /dev/null para nao poluir o relatorio
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+                results.append(replay_entry(corpus_dir / name, repeat, tmp))
+            _print_result(results[-1])
+    return results
+
+
+def _print_result(result: dict):
+    if "error" in result:
+        print(f"{result['case']:<32} erro: {result['error']}")
+        return
+    stages = " ".join(f"{name}={seconds * 1000:.0f}" for name, seconds in result["stages"].items())
+    print(
+        f"{result['case']:<32} {result['median_s'] * 1000:>10.1f} ms (min {result['min_s'] * 1000:.1f},"
+        f" frio {result['cold_s'] * 1000:.1f}) {result['peak_mb']:>8.1f} MB alocados"
+        f" {result['rss_peak_mb']:>8.1f} MB RSS  etapas(ms): {stages or '-'}"
+    )
+    if "calls_mismatch" in result:
+        mismatch = result["calls_mismatch"]
+        print(f"{'':<32} chamadas diferentes do expected.json: esperado {mismatch['expected']}, obtido {mismatch['actual']}")
+
+
+class CapturingHttp:
+    """
+    Stand-in de gravacao: GETs vao para a API real e a resposta e salva no layout do RecordingHttpStub;
+    os demais metodos ficam no stub, sem publicar nada.
+    """
+
+    def __init__(self, stub: Any):
+        self.stub = stub
+        self.recorder = stub.recorder
+
+    def fixture_path(self, url: str) -> Path:
+        return self.stub.fixture_path(url)
+
+    def _capture(self, url: str, **kwargs: Any):
+        import requests
+
+        response = requests.get(url, **kwargs)
+        if response.ok:
+            fixture = self.fixture_path(response.url)
+            fixture.parent.mkdir(parents=True, exist_ok=True)
+            fixture.write_bytes(response.content)
+        self.recorder.record("http", method="GET", url=response.url, status=response.status_code, request_bytes=0)
+        return response
+
+    def request(self, method: str, url: str, **kwargs: Any):
+        if method.upper() != "GET":
+            return self.stub.request(method, url, **kwargs)
+        return self._capture(url, **{k: v for k, v in kwargs.items() if k in ("params", "headers", "timeout", "auth")})
+
+    def handle_httpx(self, request: Any):
+        import httpx
+
+        if request.method.upper() != "GET":
+            return self.stub.handle_httpx(request)
+        response = self._capture(str(request.url), headers=dict(request.headers))
+        return httpx.Response(
+            response.status_code, content=response.content,
+            headers={"Content-Type": response.headers.get("Content-Type", "application/json")},
+        )
+
+
+def record_entry(payload_source: str, name: str, corpus_dir: Path, input_file: Optional[str]) -> Path:
+    from app.adapters import build_profile, use_profile
+    from main import load_payload as parse_payload
+
+    payload_data = parse_payload(payload_source)
+    entry_dir = corpus_dir / name
+    if entry_dir.exists():
+        raise FileExistsError(f"Entrada {entry_dir} ja existe")
+    input_dir = entry_dir / INPUT_DIR
+    input_dir.mkdir(parents=True)
+    with open(entry_dir / PAYLOAD_FILE, "w", encoding="utf-8") as f:
+        json.dump(payload_data, f, indent=2, ensure_ascii=False, default=str)
+
+    if input_file:
+        shutil.copyfile(input_file, input_dir / payload_data["filename"])
+    else:
+        from app.adapters.live import LiveS3
+
+        LiveS3().download_from_s3(payload_data["webhookId"], payload_data["filename"], str(input_dir))
+
+    with tempfile.TemporaryDirectory(prefix="replay-record-") as tmp:
+        with isolated_settings(tmp, OFFLINE_S3_DIR=str(input_dir), OFFLINE_HTTP_FIXTURES=str(entry_dir / HTTP_DIR)):
+            profile = build_profile("offline", latency={})
+            profile.http = CapturingHttp(profile.http)
+            with use_profile(profile):
+                from app.runner import run_payload
+                from app.schema import WebhookSintegreSchema
+
+                run_payload(WebhookSintegreSchema(**payload_data))
+
+    counts = call_counts(profile.recorder.calls)
+    with open(entry_dir / EXPECTED_FILE, "w", encoding="utf-8") as f:
+        json.dump({"recorded_at": datetime.now().isoformat(), "calls": counts}, f, indent=2, ensure_ascii=False)
+    print(f"Entrada {entry_dir} gravada: {counts}")
+    return entry_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay do corpus de regressao de webhooks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Reexecuta as entradas do corpus e mede tempo e memoria")
+    run_parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS_DIR, help="Diretorio do corpus")
+    run_parser.add_argument("--entrada", nargs="*", help="Entradas a executar (padrao: todas)")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Execucoes medidas por entrada, apos o aquecimento")
+    run_parser.add_argument("--json", help="Salva os resultados neste arquivo")
+    run_parser.add_argument("--compare", help="JSON de uma execucao anterior para comparar")
+    run_parser.add_argument("--threshold", type=float, default=10.0, help="Piora percentual considerada regressao")
+    run_parser.add_argument("--verbose", action="store_true", help="Mantem os logs INFO/DEBUG e os prints dos produtos")
+
+    record_parser = subparsers.add_parser("record", help="Grava uma entrada nova no corpus")
+    record_parser.add_argument("payload", help="Arquivo JSON, JSON inline ou dict Python do payload")
+    record_parser.add_argument("--nome", required=True, help="Nome da entrada (diretorio no corpus)")
+    record_parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS_DIR, help="Diretorio do corpus")
+    record_parser.add_argument("--input", help="Arquivo de entrada local; sem ele o arquivo e baixado do S3")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record_entry(args.payload, args.nome, args.corpus, args.input)
+        return
+
+    names = args.entrada or list_entries(args.corpus)
+    if not names:
+        print(f"Nenhuma entrada em {args.corpus}")
+        sys.exit(1)
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    results = run_corpus(args.corpus, names, args.repeat, quiet=not args.verbose)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "corpus": str(args.corpus),
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.json}")
+    regression = bool(args.compare) and compare(results, args.compare, args.threshold)
+    if regression or any("error" in r or "calls_mismatch" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
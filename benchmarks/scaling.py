@@ -0,0 +1,199 @@
+"""
+Curvas de escala dos parsers: mede tempo e pico de memoria para tamanhos crescentes de entrada sintetica
+(benchmarks/parser_fixtures.py) e estima o expoente de crescimento pela inclinacao log-log, para que um
+comportamento quadratico apareca antes de o ONS aumentar os arquivos (mais anos no vazoes.dat, mais usinas
+no renovaveis.dat, mais subbacias, mais paginas de PDF).
+
+Cada ponto usa o mesmo caso e a mesma medicao de benchmarks/parsers.py; o tamanho e dado na unidade natural
+da entrada e convertido no `scale` do gerador. Expoente perto de 1 e linear; a partir de SUPERLINEAR_EXPONENT
+o caso e sinalizado.
+
+Uso:
+    python benchmarks/scaling.py [--curva NOME ...] [--sizes 10,20,40] [--repeat 3]
+                                 [--plot curvas.png] [--json saida.json]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from parsers import CASES, DEFAULT_FIXTURES_DIR, _git_revision, run_case  # noqa: E402
+
+SUPERLINEAR_EXPONENT = 1.5
+
+
+@dataclass(frozen=True)
+class Curve:
+    case: str
+    unit: str
+    # Tamanho que corresponde a scale=1 no gerador do caso
+    base: float
+    sizes: Tuple[float, ...]
+
+
+CURVES: Dict[str, Curve] = {curve.case: curve for curve in (
+    Curve("vazoes_binary", "anos", 20, (5, 10, 20, 40, 95)),
+    Curve("deck_dessem_renovaveis", "usinas", 100, (50, 100, 200, 400, 800)),
+    Curve("acompanhamento_hidrologico", "subbacias", 12, (6, 12, 24, 48)),
+    Curve("arquivos_modelo_pdp", "subbacias", 118, (30, 60, 118, 236, 472)),
+    Curve("limites_intercambio", "paginas", 20, (5, 10, 20, 40, 80)),
+)}
+
+
+def growth_exponent(points: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """
+    Inclinacao da reta de minimos quadrados de log(y) x log(x): ~1 linear, ~2 quadratico.
+    """
+    points = [(x, y) for x, y in points if x > 0 and y and y > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(x) for x, _ in points]
+    ys = [math.log(y) for _, y in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def run_curve(curve: Curve, sizes: Sequence[float], repeat: int, tmp: str, fixtures_dir: Path, quiet: bool = True) -> dict:
+    points = []
+    for size in sizes:
+        workdir = os.path.join(tmp, f"{curve.case}-{size:g}")
+        os.makedirs(workdir)
+        # Alguns parsers usam print por item; a saida vai para /dev/null para nao poluir o relatorio
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull if quiet else sys.stdout):
+            result = run_case(CASES[curve.case], workdir, size / curve.base, repeat, fixtures_dir)
+        points.append({"size": size, **result})
+        _print_point(curve, points[-1])
+    measured = [p for p in points if "median_s" in p]
+    return {
+        "case": curve.case,
+        "unit": curve.unit,
+        "points": points,
+        "time_exponent": growth_exponent([(p["size"], p["median_s"]) for p in measured]),
+        "memory_exponent": growth_exponent([(p["size"], p["peak_mb"]) for p in measured]),
+    }
+
+
+def _print_point(curve: Curve, point: dict):
+    label = f"{curve.case} {point['size']:g} {curve.unit}"
+    if "skipped" in point:
+        print(f"{label:<44} pulado: {point['skipped']}")
+    elif "error" in point:
+        print(f"{label:<44} erro: {point['error']}")
+    else:
+        print(f"{label:<44} {point['median_s'] * 1000:>10.1f} ms {point['peak_mb']:>8.1f} MB {point['rows'] or 0:>10} linhas")
+
+
+def _print_exponents(results: List[dict]):
+    def fmt(exponent: Optional[float]) -> str:
+        return f"{exponent:.2f}" if exponent is not None else "-"
+
+    print(f"\n{'curva':<28} {'expoente tempo':>15} {'expoente memoria':>17}")
+    for result in results:
+        time_exp, memory_exp = result["time_exponent"], result["memory_exponent"]
+        flag = "  <-- superlinear" if max(time_exp or 0, memory_exp or 0) >= SUPERLINEAR_EXPONENT else ""
+        print(f"{result['case']:<28} {fmt(time_exp):>15} {fmt(memory_exp):>17}{flag}")
+
+
+def plot(results: List[dict], path: str):
+    """
+    Uma linha por curva com tempo e memoria x tamanho em escala log-log, com retas de referencia O(n) e O(n^2)
+    a partir do primeiro ponto.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import NullFormatter
+
+    fig, axes = plt.subplots(len(results), 2, figsize=(11, 3.2 * len(results)), squeeze=False)
+    for row, result in zip(axes, results):
+        measured = [p for p in result["points"] if "median_s" in p]
+        for ax, metric, label, exponent in (
+            (row[0], "median_s", "tempo (s)", result["time_exponent"]),
+            (row[1], "peak_mb", "pico de memoria (MB)", result["memory_exponent"]),
+        ):
+            ax.set_title(f"{result['case']} - expoente {exponent:.2f}" if exponent is not None else result["case"], fontsize=9)
+            ax.set_xlabel(result["unit"])
+            ax.set_ylabel(label)
+            if not measured:
+                reason = next((p.get("error") or p.get("skipped") for p in result["points"]), "")
+                ax.text(0.5, 0.5, f"sem medicoes\n{reason}", ha="center", va="center", fontsize=8, wrap=True, transform=ax.transAxes)
+                continue
+            xs = [p["size"] for p in measured]
+            ys = [p[metric] for p in measured]
+            ax.loglog(xs, ys, "o-", label="medido")
+            if ys[0] > 0:
+                for power, style in ((1, ":"), (2, "--")):
+                    ax.loglog(xs, [ys[0] * (x / xs[0]) ** power for x in xs], style, color="gray", label=f"O(n^{power})")
+            # Os proprios tamanhos como marcas do eixo x, sem os rotulos de potencia de 10 sobrepostos
+            ax.set_xticks(xs, [f"{x:g}" for x in xs], minor=False)
+            ax.xaxis.set_minor_formatter(NullFormatter())
+            ax.legend(fontsize=7)
+            ax.grid(True, which="both", alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path, dpi=110)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Curvas de tempo e memoria x tamanho da entrada dos parsers")
+    parser.add_argument("--curva", nargs="*", choices=sorted(CURVES), help="Curvas a executar (padrao: todas)")
+    parser.add_argument("--sizes", help="Tamanhos separados por virgula, na unidade da curva (padrao: os da curva)")
+    parser.add_argument("--repeat", type=int, default=3, help="Execucoes medidas por ponto, apos o aquecimento")
+    parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR, help="Diretorio com arquivos reais por caso")
+    parser.add_argument("--plot", help="Salva o grafico (PNG/SVG/PDF, pela extensao) neste arquivo; requer matplotlib")
+    parser.add_argument("--json", help="Salva os resultados neste arquivo")
+    parser.add_argument("--verbose", action="store_true", help="Mantem os logs INFO/DEBUG e os prints dos produtos")
+    args = parser.parse_args()
+
+    from app.adapters import build_profile, use_profile
+    from app.settings import settings
+
+    sizes = [float(size) for size in args.sizes.split(",")] if args.sizes else None
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-scaling-") as tmp:
+        settings.OFFLINE_HTTP_FIXTURES = str(Path(tmp) / "http")
+        settings.OFFLINE_S3_DIR = str(Path(tmp) / "s3")
+        with use_profile(build_profile("offline", latency={})):
+            for name in args.curva or list(CURVES):
+                curve = CURVES[name]
+                results.append(run_curve(curve, sizes or curve.sizes, args.repeat, tmp, args.fixtures_dir, quiet=not args.verbose))
+    _print_exponents(results)
+
+    if args.plot:
+        try:
+            plot(results, args.plot)
+            print(f"\nGrafico salvo em {args.plot}")
+        except ImportError:
+            print("\nmatplotlib nao instalado; grafico nao gerado")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados salvos em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
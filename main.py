@@ -1,31 +1,230 @@
+import ast
+import json
+import os
 import sys
-from middle.utils import setup_logger
-from app.constants import PRODUCT_MAPPING
+import argparse
+from datetime import datetime
+from app.logs import get_logger
 from app.schema import WebhookSintegreSchema
-from middle.utils import sanitize_string
-from app.webhook_products_interface import WebhookProductsInterface
+from app.idempotency import run_payload_once
+from app.metrics import export_cli_metrics
 
-logger = setup_logger()
+logger = get_logger(__name__)
 
 
 def webhook_handler(payload: WebhookSintegreSchema):
-    payload.nome = sanitize_string(payload.nome, space_char="_")
-    product_handler: WebhookProductsInterface | None = PRODUCT_MAPPING[payload.nome]
-    if not product_handler:
-        logger.error(f"Produto {payload.nome} nao encontrado no mapeamento")
-        raise ValueError("Produto nao mapeado")
-    product_handler = PRODUCT_MAPPING[payload.nome](payload)
-    result = product_handler.run_workflow()
-    return result
+    return run_payload_once(payload)
+
+
+def run_worker(args: argparse.Namespace):
+    from app.constants import PRODUCT_MAPPING
+    from app.metrics import start_periodic_export
+    from app.profiling import start_continuous_profiler
+    from app.settings import settings
+    from app.worker import SpoolQueue, StdinQueue, Worker
+
+    # O worker e residente: paga o import de todos os produtos uma unica vez na subida
+    PRODUCT_MAPPING.preload()
+    start_periodic_export(settings.METRICS_EXPORT_INTERVAL)
+    start_continuous_profiler()
+    queue = SpoolQueue(args.spool, poll_interval=args.poll_interval) if args.spool else StdinQueue(poll_interval=args.poll_interval)
+    Worker(queue, webhook_handler, workers=args.workers).run()
+
+
+def run_backfill(args: argparse.Namespace):
+    from contextlib import nullcontext
+    from app.backfill import build_payload, list_webhook_objects, run_backfill, suppress_side_effects
+    from app.constants import PRODUCT_MAPPING
+    from app.runner import run_payload
+
+    if not PRODUCT_MAPPING.get(args.product):
+        raise ValueError(f"Produto {args.product} sem handler no PRODUCT_MAPPING")
+    start = datetime.strptime(args.date_from, "%Y-%m-%d")
+    end = datetime.strptime(args.date_to, "%Y-%m-%d").replace(hour=23, minute=59, second=59)
+    objects = list_webhook_objects(args.product, start, end)
+    logger.info(f"{len(objects)} arquivo(s) de {args.product} encontrados entre {args.date_from} e {args.date_to}")
+    payloads = [build_payload(obj, args.data_produto_format) for obj in objects]
+    if args.dry_run:
+        for payload in payloads:
+            print(payload.model_dump_json())
+        return
+    # Reprocessamento proposital: nao passa pela deduplicacao por webhookId
+    with suppress_side_effects() if args.no_side_effects else nullcontext():
+        summary = run_backfill(payloads, run_payload, workers=args.workers)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+def run_batch(args: argparse.Namespace):
+    from app.worker import run_ndjson_batch
+
+    stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with stream:
+        summary = run_ndjson_batch(stream, webhook_handler, parallel=args.parallel)
+    logger.info(f"Lote finalizado: {summary['succeeded']} ok, {summary['failed']} com falha de {summary['total']}")
+    if summary["failed"]:
+        sys.exit(1)
+
+
+def run_ledger(args: argparse.Namespace):
+    import time
+    from app.ledger import get_ledger
+
+    ledger = get_ledger()
+    since = time.time() - args.days * 86400
+    if args.query == "slowest":
+        rows = ledger.slowest(since, args.limit, args.produto)
+        lines = [
+            f"{datetime.fromtimestamp(r['started_at']):%Y-%m-%d %H:%M:%S}  {r['produto']:<40} {r['duration']:>9.2f}s"
+            f"  {r['status']:<9} {r['rows_posted']:>8} linhas  {r['webhook_id']}"
+            + ("  " + ", ".join(f"{s['name']}={s['wall_time']}s" for s in r["stages"]) if r["stages"] else "")
+            + (f"  erro: {r['error']}" if r["error"] else "")
+            for r in rows
+        ]
+    elif args.query == "p95":
+        rows = ledger.duration_percentiles(since, args.produto)
+        fmt = lambda v: f"{v:>9.2f}s" if v is not None else f"{'-':>10}"
+        lines = [
+            f"{r['produto']:<40} {r['runs']:>6} execucoes {r['failed']:>4} falhas  p50 {fmt(r['p50'])}  p95 {fmt(r['p95'])}  max {fmt(r['max'])}"
+            for r in rows
+        ]
+    elif args.query == "freshness":
+        from app.freshness import summarize
+
+        rows = summarize(ledger.freshness_rows(args.produto, since=since))
+        fmt = lambda v: f"{v:>8.0f}s" if v is not None else f"{'-':>9}"
+        lines = []
+        for r in rows:
+            lines.append(f"{r['produto']} ({r['runs']} execucoes)")
+            for name in ("arrival_to_ingest", "arrival_to_notify", "publish_to_ingest", "publish_to_notify"):
+                target = name.rsplit("_", 1)[-1]
+                slo = (
+                    f"  SLO {fmt(r['slo_' + target])}  {r['breaches_' + target]} acima"
+                    if name.startswith("arrival") and r["slo_" + target] is not None else ""
+                )
+                lines.append(f"  {name:<18} p50 {fmt(r[name]['p50'])}  p95 {fmt(r[name]['p95'])}{slo}")
+    else:
+        rows = ledger.runs_per_hour(since, args.produto)
+        lines = [
+            f"{r['hour']}  {r['produto']:<40} {r['runs']:>5} execucoes {r['failed']:>4} falhas {r['busy_seconds']:>9.1f}s ocupado"
+            for r in rows
+        ]
+    print(json.dumps(rows, indent=2, ensure_ascii=False, default=str) if args.json else "\n".join(lines))
+
+
+def load_payload(text: str) -> dict:
+    """
+    Payload como arquivo .json, JSON inline ou literal de dict Python (o formato aceito pela chamada direta).
+    """
+    if os.path.isfile(text):
+        with open(text, encoding="utf-8") as f:
+            return json.load(f)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return ast.literal_eval(text)
+
+
+def run_profile(args: argparse.Namespace):
+    from app.adapters import build_profile, get_profile, use_profile
+    from app.profiling import ProfileSession
+    from app.runner import run_payload
+
+    payload = WebhookSintegreSchema(**load_payload(args.payload))
+    profile = build_profile(args.adapters) if args.adapters else get_profile()
+    output_dir = args.output or os.path.join(
+        "/tmp/tasks-webhook-ons/profiles", f"{payload.nome}-{datetime.now():%Y%m%d-%H%M%S}"
+    )
+    # Sem deduplicacao: o objetivo e repetir a mesma execucao quantas vezes for preciso
+    session = ProfileSession(use_cprofile=not args.sampler, interval=args.interval, top=args.top)
+    try:
+        with use_profile(profile), session:
+            run_payload(payload)
+    finally:
+        paths = session.write(output_dir)
+        print(session.summary())
+        logger.info("Perfil gravado em " + ", ".join(paths.values()))
+
+
+def build_profile_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py --profile", description="Executa um payload sob profiling e grava pstats, pilhas e resumo por etapa",
+    )
+    parser.add_argument("payload", help="Arquivo .json ou payload inline (JSON ou dict Python)")
+    parser.add_argument("--output", help="Diretorio de saida (padrao: /tmp/tasks-webhook-ons/profiles/<produto>-<data>)")
+    parser.add_argument("--sampler", action="store_true", help="Apenas amostragem de pilhas, sem cProfile (overhead menor)")
+    parser.add_argument("--interval", type=float, default=0.005, help="Intervalo de amostragem das pilhas, em segundos")
+    parser.add_argument("--top", type=int, default=15, help="Funcoes listadas por etapa no resumo")
+    parser.add_argument("--adapters", choices=["live", "offline"], help="Perfil de adaptadores (padrao: ADAPTERS_PROFILE)")
+    parser.set_defaults(func=run_profile)
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Tasks do webhook ONS")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    worker_parser = subparsers.add_parser(
+        "worker", aliases=["serve"],
+        help="Processo residente que consome payloads de um diretorio ou da entrada padrao",
+    )
+    worker_parser.add_argument("--spool", help="Diretorio monitorado com um payload *.json por arquivo (padrao: stdin)")
+    worker_parser.add_argument("--workers", type=int, default=1, help="Quantidade de payloads processados em paralelo")
+    worker_parser.add_argument("--poll-interval", type=float, default=1.0, help="Intervalo de varredura do diretorio, em segundos")
+    worker_parser.set_defaults(func=run_worker)
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="Processa um lote de payloads NDJSON, escrevendo uma linha JSON de resultado por payload",
+    )
+    batch_parser.add_argument("--input", default="-", help="Arquivo NDJSON com um payload por linha (padrao: stdin)")
+    batch_parser.add_argument("--parallel", type=int, default=1, help="Quantidade de payloads processados em paralelo")
+    batch_parser.set_defaults(func=run_batch)
+
+    backfill_parser = subparsers.add_parser(
+        "backfill", help="Reprocessa em paralelo os arquivos de um produto ja recebidos no S3",
+    )
+    backfill_parser.add_argument("--product", required=True, help="Chave do PRODUCT_MAPPING")
+    backfill_parser.add_argument("--from", dest="date_from", required=True, help="Data inicial (YYYY-MM-DD)")
+    backfill_parser.add_argument("--to", dest="date_to", required=True, help="Data final (YYYY-MM-DD)")
+    backfill_parser.add_argument("--workers", type=int, default=1, help="Quantidade de arquivos processados em paralelo")
+    backfill_parser.add_argument("--no-side-effects", action="store_true", help="Nao envia WhatsApp/e-mail nem dispara dags")
+    backfill_parser.add_argument("--data-produto-format", default="%d/%m/%Y", help="Formato do dataProduto sintetico (ex.: %%m/%%Y para decks mensais)")
+    backfill_parser.add_argument("--dry-run", action="store_true", help="Apenas lista os payloads que seriam processados")
+    backfill_parser.set_defaults(func=run_backfill)
+
+    ledger_parser = subparsers.add_parser("ledger", help="Consultas ao ledger das execucoes (LEDGER_DB)")
+    ledger_parser.add_argument(
+        "query", choices=["slowest", "p95", "per-hour", "freshness"],
+        help="Execucoes mais lentas, p95 por produto, execucoes por hora ou frescor por produto",
+    )
+    ledger_parser.add_argument("--days", type=float, default=7, help="Janela consultada, em dias")
+    ledger_parser.add_argument("--produto", help="Filtra pela chave do produto")
+    ledger_parser.add_argument("--limit", type=int, default=20, help="Quantidade de execucoes em slowest")
+    ledger_parser.add_argument("--json", action="store_true", help="Saida em JSON")
+    ledger_parser.set_defaults(func=run_ledger)
+    return parser
+
+
+COMMANDS = {"worker", "serve", "batch", "backfill", "ledger"}
 
 if __name__ == "__main__":
     logger.info("Iniciando aplicacao webhook ONS")
-    if len(sys.argv) >= 1:
-        payload = sys.argv[1]
-        payload = eval(payload)
-        webhook_handler(WebhookSintegreSchema(**payload))
-        logger.info(f"Payload: {payload}")
-    else:
-        raise ValueError("Payload nao fornecido corretamente")    
-    
-    logger.info("Aplicacao finalizada com sucesso")
\ No newline at end of file
+    try:
+        if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+            args = build_parser().parse_args()
+            args.func(args)
+        elif len(sys.argv) > 1 and sys.argv[1] == "--profile":
+            args = build_profile_parser().parse_args(sys.argv[2:])
+            args.func(args)
+        elif len(sys.argv) >= 1:
+            payload = sys.argv[1]
+            payload = eval(payload)
+            webhook_handler(WebhookSintegreSchema(**payload))
+            logger.info(f"Payload: {payload}")
+        else:
+            raise ValueError("Payload nao fornecido corretamente")
+    finally:
+        # Tambem exporta quando o workflow falha, para a falha aparecer nas metricas
+        export_cli_metrics()
+
+    logger.info("Aplicacao finalizada com sucesso")
@@ -0,0 +1,10 @@
+#!/bin/bash
+# Sobe o worker residente: os payloads passam a ser entregues como arquivos *.json em $spool_dir
+spool_dir="${1:-$(pwd)/spool}"
+workers="${2:-2}"
+container_name="task-webhook-ons-worker"
+mkdir -p "$spool_dir"
+docker rm -f $container_name 2>/dev/null
+docker run -d --restart unless-stopped --name $container_name \
+    -v "$spool_dir":/spool \
+    task-webhook-ons:latest worker --spool /spool --workers "$workers"